@@ -0,0 +1,465 @@
+"""
+Motor de Agregação do Estoque - Nexum Supply Chain
+Calcula todas as métricas do relatório de analise_dados.py de uma só vez.
+
+Cada coluna é percorrida uma única vez: colunas inteiras (contagens de peças)
+viram um histograma (`bincount`), do qual saem soma, positivos, zeros, média,
+desvio, quartis, máximo e até o limite do top-K; colunas texto passam por um
+único `factorize`, que dá categorias, contagens e nulos. Isso substitui as
+dezenas de varreduras independentes (`sum`, `> 0`, `describe`, `nlargest`...).
+"""
+
+import heapq
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_QUANTIDADE = [
+    'saldo_manut', 'provid_compras', 'recebimento_esperado', 'transito_manut',
+    'stage_manut', 'recepcao_manut', 'pendente_ri', 'pecas_teste_kit', 'pecas_teste',
+    'fornecedor_reparo', 'laboratorio', 'wr', 'wrcr', 'stage_wr',
+]
+COLUNAS_INTEIRAS = ['tipo'] + COLUNAS_QUANTIDADE
+COLUNAS_DECIMAIS = ['cmm', 'coef_perda']
+COLUNAS_NUMERICAS = COLUNAS_INTEIRAS + COLUNAS_DECIMAIS
+
+COLUNAS_TOP_CRITICOS = ['codigo', 'abc', 'cmm', 'saldo_manut', 'provid_compras']
+COLUNAS_TOP_COMPRAS = ['codigo', 'abc', 'tipo', 'saldo_manut', 'provid_compras']
+TOP_K = 10
+
+# Produto crítico: CMM acima deste limite e estoque zerado
+CMM_CRITICO = 1
+
+ROTULOS_FLUXO = {
+    'Estoque Disponível': ['saldo_manut'],
+    'Compras Provisionadas': ['provid_compras'],
+    'Recebimento Esperado': ['recebimento_esperado'],
+    'Em Trânsito': ['transito_manut'],
+    'Em Stage': ['stage_manut'],
+    'Em Recepção': ['recepcao_manut'],
+    'Em Testes': ['pecas_teste_kit', 'pecas_teste'],
+    'Em Reparo': ['fornecedor_reparo', 'laboratorio'],
+    'WR Total': ['wr'],
+}
+
+def indices_maiores(valores: np.ndarray, k: int) -> np.ndarray:
+    """Equivalente a `nlargest(k)` (keep='first') sobre um array: maiores valores, empates pela ordem original."""
+    if k <= 0 or len(valores) == 0:
+        return np.empty(0, dtype=np.intp)
+    if len(valores) > k:
+        limite = np.partition(valores, len(valores) - k)[len(valores) - k]
+        acima = np.flatnonzero(valores > limite)
+        empatados = np.flatnonzero(valores == limite)[:k - len(acima)]
+        candidatos = np.concatenate([acima, empatados])
+    else:
+        candidatos = np.arange(len(valores))
+    return candidatos[np.lexsort((candidatos, -valores[candidatos]))]
+
+# Colunas inteiras não negativas com máximo até este valor são resumidas por histograma
+LIMITE_HISTOGRAMA = 1 << 24
+
+def _quantis_histograma(acumulado: np.ndarray, n: int, quantis) -> List[float]:
+    """Quantis com interpolação linear (como `np.percentile`) a partir do histograma acumulado."""
+    resultado = []
+    for q in quantis:
+        posicao = (n - 1) * q
+        baixo, alto = int(np.floor(posicao)), int(np.ceil(posicao))
+        v_baixo = int(np.searchsorted(acumulado, baixo, side='right'))
+        v_alto = int(np.searchsorted(acumulado, alto, side='right'))
+        resultado.append(v_baixo + (posicao - baixo) * (v_alto - v_baixo))
+    return resultado
+
+def _estatisticas_vazias() -> Dict[str, float]:
+    return {'count': 0.0, 'mean': np.nan, 'std': np.nan, 'min': np.nan,
+            '25%': np.nan, '50%': np.nan, '75%': np.nan, 'max': np.nan}
+
+def _resumo_histograma(valores: np.ndarray, minimo: int, maximo: int) -> Dict:
+    """Resumo completo de uma coluna inteira não negativa a partir de um único `bincount`."""
+    histograma = np.bincount(valores, minlength=maximo + 1)
+    n = len(valores)
+    niveis = np.flatnonzero(histograma)
+    frequencias = histograma[niveis]
+    # Somatórios em inteiros do Python: exatos mesmo para colunas grandes
+    soma = int(np.dot(niveis.astype(object), frequencias.astype(object))) if len(niveis) else 0
+    soma_quadrados = int(np.dot((niveis.astype(object)) ** 2, frequencias.astype(object))) if len(niveis) else 0
+    media = soma / n
+    variancia = (soma_quadrados - soma * soma / n) / (n - 1) if n > 1 else np.nan
+    q25, q50, q75 = _quantis_histograma(np.cumsum(histograma), n, (0.25, 0.5, 0.75))
+    return {
+        'soma': soma,
+        'positivos': n - int(histograma[0]),
+        'zeros': int(histograma[0]),
+        'frequencias': dict(zip(niveis.tolist(), frequencias.tolist())),
+        'estatisticas': {
+            'count': float(n), 'mean': media, 'std': float(np.sqrt(max(variancia, 0.0))) if n > 1 else np.nan,
+            'min': float(minimo), '25%': float(q25), '50%': float(q50), '75%': float(q75), 'max': float(maximo),
+        },
+    }
+
+def _resumo_generico(valores: np.ndarray) -> Dict:
+    """Resumo de uma coluna numérica qualquer (decimais, negativos ou com nulos)."""
+    validos = valores[~np.isnan(valores)] if valores.dtype.kind == 'f' else valores
+    n = len(validos)
+    resumo = {
+        'soma': validos.sum().item() if n else 0,
+        'positivos': int((validos > 0).sum()),
+        'zeros': int((validos == 0).sum()),
+        'frequencias': None,
+        'estatisticas': _estatisticas_vazias(),
+    }
+    if n:
+        q25, q50, q75 = np.percentile(validos, [25, 50, 75]).tolist()
+        resumo['estatisticas'] = {
+            'count': float(n), 'mean': float(validos.mean()), 'std': float(validos.std(ddof=1)) if n > 1 else np.nan,
+            'min': float(validos.min()), '25%': q25, '50%': q50, '75%': q75, 'max': float(validos.max()),
+        }
+    return resumo
+
+def resumir_coluna(valores: np.ndarray) -> Dict:
+    """Soma, contagens de positivos/zeros e estatísticas do describe() de uma coluna."""
+    if valores.dtype.kind in 'iu' and len(valores):
+        minimo, maximo = int(valores.min()), int(valores.max())
+        if minimo >= 0 and maximo <= LIMITE_HISTOGRAMA:
+            return _resumo_histograma(valores, minimo, maximo)
+    if len(valores) == 0:
+        return {'soma': 0, 'positivos': 0, 'zeros': 0, 'frequencias': None, 'estatisticas': _estatisticas_vazias()}
+    return _resumo_generico(valores)
+
+def _limite_top_k(frequencias: Dict[int, int], k: int):
+    """Menor valor que ainda pode estar entre os k maiores, lido do histograma."""
+    acumulado = 0
+    for valor in sorted(frequencias, reverse=True):
+        acumulado += frequencias[valor]
+        if acumulado >= k:
+            return valor
+    return None
+
+def _registros(df: pd.DataFrame, indices: np.ndarray, colunas: List[str]) -> List[Dict]:
+    """Linhas selecionadas como dicts, com o índice original em 'indice'."""
+    selecao = df.iloc[indices][colunas]
+    return [{'indice': indice, **registro} for indice, registro in zip(selecao.index.tolist(), selecao.to_dict('records'))]
+
+def _fatorar(serie: pd.Series):
+    """Uma única passada de hash: categorias, contagem por categoria e nulos."""
+    codigos, categorias = pd.factorize(serie)
+    contagens = np.bincount(codigos[codigos >= 0], minlength=len(categorias))
+    return categorias, contagens, int((codigos < 0).sum())
+
+def calcular_relatorio(df: pd.DataFrame, top_k: int = TOP_K) -> Dict:
+    """Calcula todas as métricas do relatório de estoque a partir do DataFrame."""
+    colunas = {coluna: df[coluna].to_numpy() for coluna in COLUNAS_NUMERICAS}
+    resumos = {coluna: resumir_coluna(valores) for coluna, valores in colunas.items()}
+
+    nulos = {}
+    categoricas = {}
+    for coluna in df.columns:
+        if coluna in colunas:
+            valores = colunas[coluna]
+            nulos[coluna] = int(np.isnan(valores).sum()) if valores.dtype.kind == 'f' else 0
+        else:
+            categoricas[coluna] = _fatorar(df[coluna])
+            nulos[coluna] = categoricas[coluna][2]
+
+    saldo = colunas['saldo_manut']
+    compras = colunas['provid_compras']
+    cmm = colunas['cmm'].astype(np.float64, copy=False)
+
+    criticos = np.flatnonzero((cmm > CMM_CRITICO) & (saldo == 0))
+    top_criticos = criticos[indices_maiores(cmm[criticos], top_k)]
+
+    # O histograma de provid_compras dá o limite do top-K: basta uma comparação por linha
+    frequencias_compras = resumos['provid_compras']['frequencias']
+    limite = _limite_top_k(frequencias_compras, top_k) if frequencias_compras else None
+    candidatos = np.flatnonzero(compras >= limite) if limite is not None else np.arange(len(compras))
+    valores_compras = np.nan_to_num(compras[candidatos].astype(np.float64), nan=-np.inf)
+    top_compras = candidatos[indices_maiores(valores_compras, top_k)]
+
+    categorias_abc, contagens_abc, _ = categoricas['abc']
+    ordem_abc = np.argsort(-contagens_abc, kind='stable')
+    frequencias_tipo = resumos['tipo']['frequencias']
+    if frequencias_tipo is None:
+        frequencias_tipo = {k: int(v) for k, v in df['tipo'].value_counts().items()}
+
+    somas = {coluna: resumo['soma'] for coluna, resumo in resumos.items()}
+    return {
+        'total_registros': len(df),
+        'total_colunas': len(df.columns),
+        'produtos_unicos': len(categoricas['codigo'][0]),
+        'dtypes': {coluna: str(tipo) for coluna, tipo in df.dtypes.items()},
+        'estatisticas': {coluna: resumos[coluna]['estatisticas'] for coluna in df.columns if coluna in resumos},
+        'abc': {str(categorias_abc[i]): int(contagens_abc[i]) for i in ordem_abc},
+        'tipo': dict(sorted(frequencias_tipo.items(), key=lambda item: -item[1])),
+        'somas': somas,
+        'positivos': {coluna: resumo['positivos'] for coluna, resumo in resumos.items()},
+        'zeros': {coluna: resumo['zeros'] for coluna, resumo in resumos.items()},
+        'coef_perda_acima_1': int((colunas['coef_perda'] > 1).sum()),
+        'criticos_total': int(len(criticos)),
+        'top_criticos': _registros(df, top_criticos, COLUNAS_TOP_CRITICOS),
+        'top_compras': _registros(df, top_compras, COLUNAS_TOP_COMPRAS),
+        'nulos': nulos,
+        'fluxo_total': {rotulo: sum(somas[c] for c in colunas_fluxo) for rotulo, colunas_fluxo in ROTULOS_FLUXO.items()},
+    }
+
+# ============================================================================
+# AGREGAÇÃO EM BLOCOS (OUT-OF-CORE)
+# ============================================================================
+
+# Níveis distintos mantidos exatamente por coluna antes de comprimir a distribuição
+LIMITE_NIVEIS_EXATOS = 100_000
+
+def _quantis_ponderados(valores: np.ndarray, pesos: np.ndarray, quantis) -> List[float]:
+    """Quantis com interpolação linear sobre valores ordenados com multiplicidade."""
+    n = int(pesos.sum())
+    acumulado = np.cumsum(pesos)
+    resultado = []
+    for q in quantis:
+        posicao = (n - 1) * q
+        baixo, alto = int(np.floor(posicao)), int(np.ceil(posicao))
+        v_baixo = float(valores[np.searchsorted(acumulado, baixo, side='right')])
+        v_alto = float(valores[np.searchsorted(acumulado, alto, side='right')])
+        resultado.append(v_baixo + (posicao - baixo) * (v_alto - v_baixo))
+    return resultado
+
+class ResumoNumerico:
+    """Agregados mescláveis de uma coluna numérica.
+
+    Soma, contagens, mínimo/máximo e média/variância (Welford, mesclada pela
+    fórmula de Chan) são exatos. A distribuição para os quartis é exata enquanto
+    a coluna tiver até `limite_niveis` valores distintos; acima disso vira um
+    resumo de centróides de peso igual (quantis aproximados, memória limitada).
+    """
+
+    def __init__(self, limite_niveis: int = LIMITE_NIVEIS_EXATOS):
+        self.limite_niveis = limite_niveis
+        self.n = 0
+        self.soma = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = None
+        self.maximo = None
+        self.positivos = 0
+        self.zeros = 0
+        self.pontos: Dict[float, int] = {}
+        self.exato = True
+
+    def adicionar(self, valores: np.ndarray):
+        if valores.dtype.kind == 'f':
+            valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return
+        parcial = ResumoNumerico(self.limite_niveis)
+        parcial.n = len(valores)
+        parcial.soma = valores.sum().item()
+        parcial.media = parcial.soma / parcial.n
+        parcial.m2 = float(np.square(valores - parcial.media).sum())
+        parcial.minimo = valores.min().item()
+        parcial.maximo = valores.max().item()
+        parcial.positivos = int((valores > 0).sum())
+        parcial.zeros = int((valores == 0).sum())
+        if valores.dtype.kind in 'iu' and parcial.minimo >= 0 and parcial.maximo <= LIMITE_HISTOGRAMA:
+            histograma = np.bincount(valores)
+            niveis = np.flatnonzero(histograma)
+            frequencias = histograma[niveis]
+        else:
+            niveis, frequencias = np.unique(valores, return_counts=True)
+        parcial.pontos = dict(zip(niveis.tolist(), frequencias.tolist()))
+        self.mesclar(parcial)
+
+    def mesclar(self, outro: 'ResumoNumerico'):
+        if outro.n == 0:
+            return
+        if self.n == 0:
+            self.media, self.m2 = outro.media, outro.m2
+            self.minimo, self.maximo = outro.minimo, outro.maximo
+        else:
+            total = self.n + outro.n
+            delta = outro.media - self.media
+            self.media += delta * outro.n / total
+            self.m2 += outro.m2 + delta * delta * self.n * outro.n / total
+            self.minimo = min(self.minimo, outro.minimo)
+            self.maximo = max(self.maximo, outro.maximo)
+        self.n += outro.n
+        self.soma += outro.soma
+        self.positivos += outro.positivos
+        self.zeros += outro.zeros
+        self.exato = self.exato and outro.exato
+        for valor, peso in outro.pontos.items():
+            self.pontos[valor] = self.pontos.get(valor, 0) + peso
+        if len(self.pontos) > self.limite_niveis:
+            self._comprimir()
+
+    def _comprimir(self):
+        """Reduz a distribuição a `limite_niveis // 2` centróides de peso aproximadamente igual."""
+        valores = np.array(sorted(self.pontos), dtype=np.float64)
+        pesos = np.array([self.pontos[v] for v in sorted(self.pontos)], dtype=np.float64)
+        grupos_total = max(1, self.limite_niveis // 2)
+        acumulado = np.cumsum(pesos)
+        grupos = np.minimum(((acumulado - pesos / 2) / acumulado[-1] * grupos_total).astype(np.int64), grupos_total - 1)
+        peso_grupo = np.bincount(grupos, weights=pesos, minlength=grupos_total)
+        soma_grupo = np.bincount(grupos, weights=pesos * valores, minlength=grupos_total)
+        usados = peso_grupo > 0
+        centroides = soma_grupo[usados] / peso_grupo[usados]
+        self.pontos = dict(zip(centroides.tolist(), np.rint(peso_grupo[usados]).astype(np.int64).tolist()))
+        self.exato = False
+
+    def estatisticas(self) -> Dict[str, float]:
+        """Mesmo conteúdo de `Series.describe()`."""
+        if self.n == 0:
+            return _estatisticas_vazias()
+        ordenados = sorted(self.pontos)
+        q25, q50, q75 = _quantis_ponderados(
+            np.array(ordenados, dtype=np.float64),
+            np.array([self.pontos[v] for v in ordenados], dtype=np.int64),
+            (0.25, 0.5, 0.75),
+        )
+        return {
+            'count': float(self.n), 'mean': float(self.media),
+            'std': float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else np.nan,
+            'min': float(self.minimo), '25%': q25, '50%': q50, '75%': q75, 'max': float(self.maximo),
+        }
+
+class ItemTop:
+    """Entrada dos heaps de top-K; compara só por (valor, -linha), como `nlargest(keep='first')`."""
+
+    __slots__ = ('valor', 'indice', 'registro')
+
+    def __init__(self, valor, indice: int, registro: Dict):
+        self.valor = valor
+        self.indice = indice
+        self.registro = registro
+
+    def __lt__(self, outro: 'ItemTop') -> bool:
+        return (self.valor, -self.indice) < (outro.valor, -outro.indice)
+
+    def __getstate__(self):
+        return (self.valor, self.indice, self.registro)
+
+    def __setstate__(self, estado):
+        self.valor, self.indice, self.registro = estado
+
+def _empurrar_top(heap: List, item: ItemTop, k: int):
+    if len(heap) < k:
+        heapq.heappush(heap, item)
+    elif heap[0] < item:
+        heapq.heapreplace(heap, item)
+
+def _dtype_mesclado(atual: str, novo: str) -> str:
+    if atual == novo:
+        return atual
+    try:
+        return str(np.promote_types(atual, novo))
+    except TypeError:
+        return 'object'
+
+class AgregadoEstoque:
+    """Agregados mescláveis do relatório de estoque, alimentados bloco a bloco.
+
+    Memória limitada pelo tamanho do bloco: guarda apenas contadores, resumos
+    numéricos, heaps de top-K e o conjunto de códigos distintos (que cresce com
+    o catálogo, não com o número de linhas).
+    """
+
+    def __init__(self, top_k: int = TOP_K, limite_niveis: int = LIMITE_NIVEIS_EXATOS):
+        self.top_k = top_k
+        self.total_registros = 0
+        self.colunas: List[str] = []
+        self.dtypes: Dict[str, str] = {}
+        self.codigos = set()
+        self.abc: Counter = Counter()
+        self.tipo: Counter = Counter()
+        self.nulos: Counter = Counter()
+        self.numericas = {coluna: ResumoNumerico(limite_niveis) for coluna in COLUNAS_NUMERICAS}
+        self.coef_perda_acima_1 = 0
+        self.criticos_total = 0
+        # Heaps de ItemTop: a raiz é o candidato mais fraco
+        self.top_criticos: List = []
+        self.top_compras: List = []
+
+    def _empurrar(self, heap: List, valores: np.ndarray, df: pd.DataFrame, posicoes: np.ndarray, colunas: List[str]):
+        selecao = df.iloc[posicoes]
+        registros = selecao[colunas].to_dict('records')
+        for valor, indice, registro in zip(valores[posicoes].tolist(), selecao.index.tolist(), registros):
+            _empurrar_top(heap, ItemTop(valor, indice, {'indice': indice, **registro}), self.top_k)
+
+    def adicionar_bloco(self, df: pd.DataFrame) -> 'AgregadoEstoque':
+        """Incorpora um bloco do CSV (o índice do bloco deve ser o número global da linha)."""
+        if not self.colunas:
+            self.colunas = list(df.columns)
+        for coluna, tipo in df.dtypes.items():
+            self.dtypes[coluna] = _dtype_mesclado(self.dtypes.get(coluna, str(tipo)), str(tipo))
+        self.total_registros += len(df)
+        self.nulos.update({coluna: int(n) for coluna, n in df.isna().sum().items()})
+        self.codigos.update(df['codigo'].dropna().unique().tolist())
+        self.abc.update({str(k): int(v) for k, v in df['abc'].value_counts(sort=False).items()})
+        self.tipo.update({int(k): int(v) for k, v in df['tipo'].value_counts(sort=False).items()})
+
+        for coluna, resumo in self.numericas.items():
+            resumo.adicionar(df[coluna].to_numpy())
+
+        cmm = df['cmm'].to_numpy(dtype=np.float64)
+        saldo = df['saldo_manut'].to_numpy()
+        compras = np.nan_to_num(df['provid_compras'].to_numpy(dtype=np.float64), nan=-np.inf)
+        self.coef_perda_acima_1 += int((df['coef_perda'].to_numpy(dtype=np.float64) > 1).sum())
+
+        criticos = np.flatnonzero((cmm > CMM_CRITICO) & (saldo == 0))
+        self.criticos_total += len(criticos)
+        self._empurrar(self.top_criticos, cmm, df, criticos[indices_maiores(cmm[criticos], self.top_k)], COLUNAS_TOP_CRITICOS)
+        candidatos = indices_maiores(compras, self.top_k)
+        self._empurrar(self.top_compras, compras, df, candidatos[compras[candidatos] > -np.inf], COLUNAS_TOP_COMPRAS)
+        return self
+
+    def mesclar(self, outro: 'AgregadoEstoque') -> 'AgregadoEstoque':
+        """Combina com os agregados de outro bloco ou arquivo."""
+        if not self.colunas:
+            self.colunas = list(outro.colunas)
+        for coluna, tipo in outro.dtypes.items():
+            self.dtypes[coluna] = _dtype_mesclado(self.dtypes.get(coluna, tipo), tipo)
+        self.total_registros += outro.total_registros
+        self.nulos.update(outro.nulos)
+        self.codigos |= outro.codigos
+        self.abc.update(outro.abc)
+        self.tipo.update(outro.tipo)
+        for coluna, resumo in self.numericas.items():
+            resumo.mesclar(outro.numericas[coluna])
+        self.coef_perda_acima_1 += outro.coef_perda_acima_1
+        self.criticos_total += outro.criticos_total
+        for heap, outro_heap in ((self.top_criticos, outro.top_criticos), (self.top_compras, outro.top_compras)):
+            for item in outro_heap:
+                _empurrar_top(heap, item, self.top_k)
+        return self
+
+    @staticmethod
+    def _ordenar_top(heap: List) -> List[Dict]:
+        return [item.registro for item in sorted(heap, reverse=True)]
+
+    def relatorio(self) -> Dict:
+        """Relatório no mesmo formato de `calcular_relatorio`."""
+        somas = {coluna: resumo.soma for coluna, resumo in self.numericas.items()}
+        return {
+            'total_registros': self.total_registros,
+            'total_colunas': len(self.colunas),
+            'produtos_unicos': len(self.codigos),
+            'dtypes': {coluna: self.dtypes[coluna] for coluna in self.colunas},
+            'estatisticas': {coluna: self.numericas[coluna].estatisticas() for coluna in self.colunas if coluna in self.numericas},
+            'abc': dict(sorted(self.abc.items(), key=lambda item: -item[1])),
+            'tipo': dict(sorted(self.tipo.items(), key=lambda item: (-item[1], item[0]))),
+            'somas': somas,
+            'positivos': {coluna: resumo.positivos for coluna, resumo in self.numericas.items()},
+            'zeros': {coluna: resumo.zeros for coluna, resumo in self.numericas.items()},
+            'coef_perda_acima_1': self.coef_perda_acima_1,
+            'criticos_total': self.criticos_total,
+            'top_criticos': self._ordenar_top(self.top_criticos),
+            'top_compras': self._ordenar_top(self.top_compras),
+            'nulos': {coluna: self.nulos.get(coluna, 0) for coluna in self.colunas},
+            'fluxo_total': {rotulo: sum(somas[c] for c in colunas) for rotulo, colunas in ROTULOS_FLUXO.items()},
+            'quantis_exatos': all(resumo.exato for resumo in self.numericas.values()),
+        }
+
+def agregar_csv(caminho: str, tamanho_bloco: int = 500_000) -> AgregadoEstoque:
+    """Lê o CSV em blocos de `tamanho_bloco` linhas, com memória limitada ao bloco."""
+    agregado = AgregadoEstoque()
+    for bloco in pd.read_csv(caminho, delimiter=';', chunksize=tamanho_bloco):
+        agregado.adicionar_bloco(bloco)
+    return agregado
@@ -1,9 +1,12 @@
 import os
 import json
+import time
+import argparse
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from telemetria_agente import RastroCiclo, extrair_uso_tokens
 
 # --- Configuração de Ambiente e Dados ---
 
@@ -17,32 +20,13 @@ except ImportError:
     def obter_sugestoes_compra() -> List[Dict]:
         """Contingência de dados local."""
         # Se for para o Hackathon/Teste, é crucial que este CSV esteja formatado corretamente.
-        import pandas as pd
+        # As colunas do CSV ficam em cache (invalidado por mtime/tamanho), então
+        # ciclos repetidos não voltam a fazer o parsing do arquivo.
+        from contingencia_dados import sugestoes_compra
         CSV_PATH = "dados_hackathon.csv"
         MAX_CRITICOS = 5
         try:
-            df = pd.read_csv(CSV_PATH, delimiter=';')
-            
-            # Recálculo de 'quantidade_a_comprar' e filtro de críticos
-            df['quantidade_a_comprar'] = ((df['cmm'] * 2) - df['saldo_manut'] - df['provid_compras']).clip(lower=0)
-            
-            criticos = df[df['quantidade_a_comprar'] > 0].copy()
-            
-            # Mapeamento para o formato esperado pelo prompt do Gemini
-            dados_sp = pd.DataFrame({
-                'codigo': criticos['codigo'],
-                'abc': criticos['abc'], # Mantido, mas não usado pelo Gemini neste prompt
-                'estoque_atual': criticos['saldo_manut'],
-                # IMPORTANTE: Para a regra INVESTIGAR, é bom incluir um estoque_maximo.
-                # Como não está no CSV, vou forçar um valor alto para itens A/B de alto CMM.
-                'estoque_maximo': criticos.apply(lambda row: 500 if row['cmm'] > 0.8 else 100, axis=1), 
-                'cmm': criticos['cmm'],
-                'compras_em_andamento': criticos['provid_compras'],
-                'quantidade_a_comprar': criticos['quantidade_a_comprar'],
-            })
-            
-            # Prioriza os X com maior CMM
-            return dados_sp.nlargest(MAX_CRITICOS, 'cmm').to_dict('records')
+            return sugestoes_compra(CSV_PATH, MAX_CRITICOS)
         except FileNotFoundError:
             print("ERRO: Arquivo dados_hackathon.csv não encontrado.")
             return []
@@ -71,8 +55,10 @@ def percepcao_critica_db_call() -> List[Dict]:
         
     return obter_sugestoes_compra()
 
-def raciocinar_e_planejar_real(dados_criticos: List[Dict]) -> str:
+def raciocinar_e_planejar_real(dados_criticos: List[Dict], metricas: Optional[Dict] = None) -> str:
     """Envia dados ao Gemini para gerar o plano de compra."""
+    metricas = metricas if metricas is not None else {}
+    metricas['itens_entrada'] = len(dados_criticos)
     if not client:
         return json.dumps({"erro": "Cliente Gemini não inicializado."})
     
@@ -138,14 +124,21 @@ Gere o plano de ação rigoroso em JSON, listando os itens na ordem de prioridad
         config=config
     )
     
+    metricas['prompt_chars'] = len(instrucao_sistema) + len(prompt_usuario)
+    metricas['resposta_chars'] = len(response.text or "")
+    metricas.update(extrair_uso_tokens(response))
+
     print("✅ RACIOCÍNIO CONCLUÍDO.")
     return response.text
 
-def executar_plano_real(plano_json: str):
+def executar_plano_real(plano_json: str, metricas: Optional[Dict] = None):
     """Processa a saída e simula a execução no ERP."""
+    metricas = metricas if metricas is not None else {}
+    metricas['acoes_saida'] = 0
     try:
         plano = json.loads(plano_json)
     except json.JSONDecodeError:
+        metricas['json_invalido'] = True
         print("\n❌ ERRO: A resposta do Agente não é um JSON válido.")
         return
 
@@ -169,24 +162,159 @@ def executar_plano_real(plano_json: str):
         
         if "ENVIAR ORDEM DE COMPRA" in acao:
             print(f"   [ORDEM CRIADA]: {codigo} -> QTD: {qtd:.0f} | Status: {acao}.")
+            metricas['ordens'] = metricas.get('ordens', 0) + 1
         elif "INVESTIGAR" in acao:
             print(f"   [ALERTA ENVIADO]: {codigo} -> Status: {acao}.")
+            metricas['alertas'] = metricas.get('alertas', 0) + 1
         else:
             print(f"   [MONITORAR]: {codigo} -> Ação: {acao}.")
+            metricas['monitorados'] = metricas.get('monitorados', 0) + 1
+        metricas['acoes_saida'] += 1
 
     print("==================================================")
     print("✅ CICLO DO AGENTE DE IA CONCLUÍDO.")
     print("==================================================")
 
+def executar_ciclo() -> Optional[Dict]:
+    """Executa um ciclo completo percepção→raciocínio→execução e o registra no ledger."""
+    rastro = RastroCiclo(modo='completo')
+    try:
+        with rastro.fase('percepcao') as m:
+            dados_criticos = percepcao_critica_db_call()
+            m['itens_saida'] = len(dados_criticos)
+
+        if not dados_criticos:
+            print("Nenhuma sugestão de compra encontrada. O Agente não gerou ações.")
+            return None
+
+        with rastro.fase('raciocinio') as m:
+            plano_json = raciocinar_e_planejar_real(dados_criticos, m)
+        with rastro.fase('execucao') as m:
+            executar_plano_real(plano_json, m)
+    finally:
+        registro = rastro.registrar()
+    return registro
+
+
+# --- Modo Daemon (Percepção por Delta) ---
+
+# Entradas que, se mudarem, exigem uma nova decisão do Agente para o item.
+CAMPOS_DELTA = ('estoque_atual', 'cmm', 'compras_em_andamento')
+INTERVALO_DAEMON_PADRAO = int(os.getenv("AGENTE_INTERVALO_SEGUNDOS", "300"))
+
+class EstadoAgente:
+    """Snapshot da última percepção e decisões vigentes, indexados por código."""
+
+    def __init__(self):
+        self.snapshot: Dict[str, Tuple] = {}
+        self.decisoes: Dict[str, Dict] = {}
+
+    @staticmethod
+    def _entradas(item: Dict) -> Tuple:
+        return tuple(item.get(campo) for campo in CAMPOS_DELTA)
+
+    def podar(self, dados_criticos: List[Dict]):
+        """Descarta itens que saíram do conjunto crítico."""
+        presentes = {item.get('codigo') for item in dados_criticos}
+        for codigo in list(self.snapshot):
+            if codigo not in presentes:
+                self.snapshot.pop(codigo, None)
+                self.decisoes.pop(codigo, None)
+
+    def separar_delta(self, dados_criticos: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Separa os itens com entradas alteradas dos que seguem iguais ao último ciclo."""
+        alterados, inalterados = [], []
+        for item in dados_criticos:
+            codigo = item.get('codigo')
+            if codigo in self.decisoes and self.snapshot.get(codigo) == self._entradas(item):
+                inalterados.append(item)
+            else:
+                alterados.append(item)
+        return alterados, inalterados
+
+    def registrar(self, dados_alterados: List[Dict], plano_delta) -> None:
+        """Guarda as novas decisões e o snapshot dos itens que as receberam."""
+        if not isinstance(plano_delta, list):
+            return
+        por_codigo = {item.get('codigo'): item for item in dados_alterados}
+        for decisao in plano_delta:
+            codigo = decisao.get('codigo')
+            # Itens sem decisão não entram no snapshot e são reenviados no próximo ciclo
+            if codigo in por_codigo:
+                self.decisoes[codigo] = decisao
+                self.snapshot[codigo] = self._entradas(por_codigo[codigo])
+
+    def plano_vigente(self, dados_criticos: List[Dict]) -> List[Dict]:
+        """Plano completo (novas + anteriores), na ordem de prioridade CMM > quantidade."""
+        ordenados = sorted(
+            dados_criticos,
+            key=lambda item: (-(item.get('cmm') or 0), -(item.get('quantidade_a_comprar') or 0))
+        )
+        return [self.decisoes[item['codigo']] for item in ordenados if item.get('codigo') in self.decisoes]
+
+def executar_ciclo_delta(estado: EstadoAgente) -> List[Dict]:
+    """Executa um ciclo enviando ao raciocínio apenas os itens alterados desde o anterior."""
+    rastro = RastroCiclo(modo='daemon')
+    try:
+        with rastro.fase('percepcao') as m:
+            dados_criticos = percepcao_critica_db_call()
+            estado.podar(dados_criticos)
+            alterados, inalterados = estado.separar_delta(dados_criticos)
+            m.update(itens_saida=len(dados_criticos), alterados=len(alterados), mantidos=len(inalterados))
+        print(f"🔁 DELTA: {len(alterados)} item(ns) alterado(s), {len(inalterados)} decisão(ões) mantida(s).")
+
+        if not alterados:
+            print("Nenhuma mudança desde o último ciclo. O Agente não gerou novas ações.")
+            return estado.plano_vigente(dados_criticos)
+
+        with rastro.fase('raciocinio') as m:
+            plano_json = raciocinar_e_planejar_real(alterados, m)
+        with rastro.fase('execucao') as m:
+            # Apenas as decisões novas são executadas; as mantidas já foram executadas antes
+            executar_plano_real(plano_json, m)
+            try:
+                estado.registrar(alterados, json.loads(plano_json))
+            except json.JSONDecodeError:
+                pass
+
+        return estado.plano_vigente(dados_criticos)
+    finally:
+        rastro.registrar()
+
+def executar_daemon(intervalo_segundos: int = INTERVALO_DAEMON_PADRAO, max_ciclos: Optional[int] = None):
+    """Executa ciclos do Agente continuamente, a cada `intervalo_segundos`."""
+    estado = EstadoAgente()
+    ciclo = 0
+    print(f"⏱️ DAEMON: ciclos a cada {intervalo_segundos}s (Ctrl+C para encerrar).")
+    try:
+        while max_ciclos is None or ciclo < max_ciclos:
+            inicio = time.monotonic()
+            ciclo += 1
+            print(f"\n--- Ciclo {ciclo} ---")
+            try:
+                plano = executar_ciclo_delta(estado)
+                print(f"📋 Plano vigente: {len(plano)} item(ns).")
+            except Exception as e:
+                # Itens do ciclo com falha não entram no snapshot e são reprocessados depois
+                print(f"❌ ERRO NO CICLO {ciclo}: {e}")
+
+            if max_ciclos is not None and ciclo >= max_ciclos:
+                break
+            time.sleep(max(0.0, intervalo_segundos - (time.monotonic() - inicio)))
+    except KeyboardInterrupt:
+        print("\n👋 DAEMON encerrado.")
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agente de IA de compras da Nexum.")
+    parser.add_argument("--daemon", action="store_true", help="Executa ciclos continuamente, processando apenas itens alterados.")
+    parser.add_argument("--intervalo", type=int, default=INTERVALO_DAEMON_PADRAO, help="Segundos entre ciclos no modo daemon.")
+    parser.add_argument("--ciclos", type=int, default=None, help="Número máximo de ciclos no modo daemon.")
+    args = parser.parse_args()
+
     if not client:
         print("Agente de IA não pode ser executado devido a erro de inicialização.")
+    elif args.daemon:
+        executar_daemon(args.intervalo, args.ciclos)
     else:
-        dados_criticos_reais = percepcao_critica_db_call()
-        
-        if dados_criticos_reais:
-            plano_json_real = raciocinar_e_planejar_real(dados_criticos_reais)
-            executar_plano_real(plano_json_real)
-        else:
-            print("Nenhuma sugestão de compra encontrada. O Agente não gerou ações.")
\ No newline at end of file
+        executar_ciclo()
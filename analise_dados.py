@@ -1,116 +1,126 @@
+import argparse
+
 import pandas as pd
-import numpy as np
-
-# Carregar dados
-df = pd.read_csv('dados_hackathon.csv', delimiter=';')
-
-print("=" * 80)
-print("📊 ANÁLISE DOS DADOS DE SUPPLY CHAIN")
-print("=" * 80)
-
-# Informações básicas
-print("\n1️⃣ INFORMAÇÕES GERAIS:")
-print(f"   Total de registros: {len(df)}")
-print(f"   Total de colunas: {len(df.columns)}")
-print(f"   Total de produtos únicos: {df['codigo'].nunique()}")
-
-# Estrutura das colunas
-print("\n2️⃣ ESTRUTURA DAS COLUNAS:")
-print(df.dtypes)
-
-# Estatísticas descritivas
-print("\n3️⃣ ESTATÍSTICAS DOS DADOS NUMÉRICOS:")
-print(df.describe())
-
-# Análise por classificação ABC
-print("\n4️⃣ DISTRIBUIÇÃO POR CLASSIFICAÇÃO ABC:")
-print(df['abc'].value_counts())
-print(f"\n   A (Alto valor): {(df['abc'] == 'A').sum()} itens")
-print(f"   B (Médio valor): {(df['abc'] == 'B').sum()} itens")
-print(f"   C (Baixo valor): {(df['abc'] == 'C').sum()} itens")
-
-# Análise por tipo
-print("\n5️⃣ DISTRIBUIÇÃO POR TIPO:")
-print(df['tipo'].value_counts())
-
-# Análise de estoque
-print("\n6️⃣ ANÁLISE DE ESTOQUE:")
-print(f"   Saldo total em manutenção: {df['saldo_manut'].sum()}")
-print(f"   Produtos com estoque > 0: {(df['saldo_manut'] > 0).sum()}")
-print(f"   Produtos com estoque = 0: {(df['saldo_manut'] == 0).sum()}")
-print(f"   Média de estoque: {df['saldo_manut'].mean():.2f}")
-print(f"   Mediana de estoque: {df['saldo_manut'].median():.2f}")
-
-# Análise de compras
-print("\n7️⃣ ANÁLISE DE COMPRAS:")
-print(f"   Total previsto em compras: {df['provid_compras'].sum()}")
-print(f"   Produtos com compras previstas: {(df['provid_compras'] > 0).sum()}")
-print(f"   Total em recebimento esperado: {df['recebimento_esperado'].sum()}")
-
-# Análise de trânsito/movimentação
-print("\n8️⃣ ANÁLISE DE MOVIMENTAÇÃO:")
-print(f"   Em trânsito (manutenção): {df['transito_manut'].sum()}")
-print(f"   Em stage (manutenção): {df['stage_manut'].sum()}")
-print(f"   Em recepção (manutenção): {df['recepcao_manut'].sum()}")
-print(f"   Pendente RI: {df['pendente_ri'].sum()}")
-
-# Análise de peças em teste
-print("\n9️⃣ ANÁLISE DE TESTES:")
-print(f"   Peças em teste (kit): {df['pecas_teste_kit'].sum()}")
-print(f"   Peças em teste: {df['pecas_teste'].sum()}")
-
-# Análise de reparos
-print("\n🔟 ANÁLISE DE REPAROS:")
-print(f"   Em fornecedor para reparo: {df['fornecedor_reparo'].sum()}")
-print(f"   Em laboratório: {df['laboratorio'].sum()}")
-
-# Análise WR (Work Request)
-print("\n1️⃣1️⃣ ANÁLISE DE WR (Work Request):")
-print(f"   Total WR: {df['wr'].sum()}")
-print(f"   Total WRCR: {df['wrcr'].sum()}")
-print(f"   Em stage WR: {df['stage_wr'].sum()}")
-
-# Análise CMM e Coeficiente de Perda
-print("\n1️⃣2️⃣ ANÁLISE DE CRITICIDADE:")
-print(f"   CMM médio: {df['cmm'].mean():.2f}")
-print(f"   CMM máximo: {df['cmm'].max():.2f}")
-print(f"   Coeficiente de perda médio: {df['coef_perda'].mean():.4f}")
-print(f"   Produtos com coef_perda = 0: {(df['coef_perda'] == 0).sum()}")
-print(f"   Produtos com coef_perda > 1: {(df['coef_perda'] > 1).sum()}")
-
-# Identificar produtos críticos (alto CMM + baixo estoque)
-print("\n1️⃣3️⃣ PRODUTOS CRÍTICOS (CMM > 1 E ESTOQUE = 0):")
-criticos = df[(df['cmm'] > 1) & (df['saldo_manut'] == 0)]
-print(f"   Total: {len(criticos)} produtos")
-if len(criticos) > 0:
-    print("\n   Top 10 mais críticos:")
-    print(criticos.nlargest(10, 'cmm')[['codigo', 'abc', 'cmm', 'saldo_manut', 'provid_compras']])
-
-# Produtos com alta demanda de compra
-print("\n1️⃣4️⃣ PRODUTOS COM MAIOR DEMANDA DE COMPRA:")
-print(df.nlargest(10, 'provid_compras')[['codigo', 'abc', 'tipo', 'saldo_manut', 'provid_compras']])
-
-# Análise de valores nulos
-print("\n1️⃣5️⃣ ANÁLISE DE DADOS FALTANTES:")
-print(df.isnull().sum())
-
-# Resumo do fluxo logístico total
-print("\n1️⃣6️⃣ RESUMO DO FLUXO LOGÍSTICO TOTAL:")
-fluxo_total = {
-    'Estoque Disponível': df['saldo_manut'].sum(),
-    'Compras Provisionadas': df['provid_compras'].sum(),
-    'Recebimento Esperado': df['recebimento_esperado'].sum(),
-    'Em Trânsito': df['transito_manut'].sum(),
-    'Em Stage': df['stage_manut'].sum(),
-    'Em Recepção': df['recepcao_manut'].sum(),
-    'Em Testes': df['pecas_teste_kit'].sum() + df['pecas_teste'].sum(),
-    'Em Reparo': df['fornecedor_reparo'].sum() + df['laboratorio'].sum(),
-    'WR Total': df['wr'].sum(),
-}
-
-for key, value in fluxo_total.items():
-    print(f"   {key}: {value}")
-
-print("\n" + "=" * 80)
-print("✅ ANÁLISE CONCLUÍDA!")
-print("=" * 80)
+
+from agregacao_estoque import agregar_csv, calcular_relatorio
+
+def imprimir_relatorio(r):
+    """Renderiza no console o relatório calculado por agregacao_estoque."""
+    somas = r['somas']
+    positivos = r['positivos']
+    zeros = r['zeros']
+    stats = r['estatisticas']
+
+    print("=" * 80)
+    print("📊 ANÁLISE DOS DADOS DE SUPPLY CHAIN")
+    print("=" * 80)
+
+    # Informações básicas
+    print("\n1️⃣ INFORMAÇÕES GERAIS:")
+    print(f"   Total de registros: {r['total_registros']}")
+    print(f"   Total de colunas: {r['total_colunas']}")
+    print(f"   Total de produtos únicos: {r['produtos_unicos']}")
+
+    # Estrutura das colunas
+    print("\n2️⃣ ESTRUTURA DAS COLUNAS:")
+    print(pd.Series(r['dtypes'], dtype=object))
+
+    # Estatísticas descritivas
+    print("\n3️⃣ ESTATÍSTICAS DOS DADOS NUMÉRICOS:")
+    print(pd.DataFrame(stats))
+    if not r.get('quantis_exatos', True):
+        print("   (quartis aproximados: distribuição comprimida na leitura em blocos)")
+
+    # Análise por classificação ABC
+    print("\n4️⃣ DISTRIBUIÇÃO POR CLASSIFICAÇÃO ABC:")
+    print(pd.Series(r['abc'], name='count').rename_axis('abc'))
+    print(f"\n   A (Alto valor): {r['abc'].get('A', 0)} itens")
+    print(f"   B (Médio valor): {r['abc'].get('B', 0)} itens")
+    print(f"   C (Baixo valor): {r['abc'].get('C', 0)} itens")
+
+    # Análise por tipo
+    print("\n5️⃣ DISTRIBUIÇÃO POR TIPO:")
+    print(pd.Series(r['tipo'], name='count').rename_axis('tipo'))
+
+    # Análise de estoque
+    print("\n6️⃣ ANÁLISE DE ESTOQUE:")
+    print(f"   Saldo total em manutenção: {somas['saldo_manut']}")
+    print(f"   Produtos com estoque > 0: {positivos['saldo_manut']}")
+    print(f"   Produtos com estoque = 0: {zeros['saldo_manut']}")
+    print(f"   Média de estoque: {stats['saldo_manut']['mean']:.2f}")
+    print(f"   Mediana de estoque: {stats['saldo_manut']['50%']:.2f}")
+
+    # Análise de compras
+    print("\n7️⃣ ANÁLISE DE COMPRAS:")
+    print(f"   Total previsto em compras: {somas['provid_compras']}")
+    print(f"   Produtos com compras previstas: {positivos['provid_compras']}")
+    print(f"   Total em recebimento esperado: {somas['recebimento_esperado']}")
+
+    # Análise de trânsito/movimentação
+    print("\n8️⃣ ANÁLISE DE MOVIMENTAÇÃO:")
+    print(f"   Em trânsito (manutenção): {somas['transito_manut']}")
+    print(f"   Em stage (manutenção): {somas['stage_manut']}")
+    print(f"   Em recepção (manutenção): {somas['recepcao_manut']}")
+    print(f"   Pendente RI: {somas['pendente_ri']}")
+
+    # Análise de peças em teste
+    print("\n9️⃣ ANÁLISE DE TESTES:")
+    print(f"   Peças em teste (kit): {somas['pecas_teste_kit']}")
+    print(f"   Peças em teste: {somas['pecas_teste']}")
+
+    # Análise de reparos
+    print("\n🔟 ANÁLISE DE REPAROS:")
+    print(f"   Em fornecedor para reparo: {somas['fornecedor_reparo']}")
+    print(f"   Em laboratório: {somas['laboratorio']}")
+
+    # Análise WR (Work Request)
+    print("\n1️⃣1️⃣ ANÁLISE DE WR (Work Request):")
+    print(f"   Total WR: {somas['wr']}")
+    print(f"   Total WRCR: {somas['wrcr']}")
+    print(f"   Em stage WR: {somas['stage_wr']}")
+
+    # Análise CMM e Coeficiente de Perda
+    print("\n1️⃣2️⃣ ANÁLISE DE CRITICIDADE:")
+    print(f"   CMM médio: {stats['cmm']['mean']:.2f}")
+    print(f"   CMM máximo: {stats['cmm']['max']:.2f}")
+    print(f"   Coeficiente de perda médio: {stats['coef_perda']['mean']:.4f}")
+    print(f"   Produtos com coef_perda = 0: {zeros['coef_perda']}")
+    print(f"   Produtos com coef_perda > 1: {r['coef_perda_acima_1']}")
+
+    # Identificar produtos críticos (alto CMM + baixo estoque)
+    print("\n1️⃣3️⃣ PRODUTOS CRÍTICOS (CMM > 1 E ESTOQUE = 0):")
+    print(f"   Total: {r['criticos_total']} produtos")
+    if r['criticos_total'] > 0:
+        print("\n   Top 10 mais críticos:")
+        print(pd.DataFrame(r['top_criticos']).set_index('indice').rename_axis(None))
+
+    # Produtos com alta demanda de compra
+    print("\n1️⃣4️⃣ PRODUTOS COM MAIOR DEMANDA DE COMPRA:")
+    print(pd.DataFrame(r['top_compras']).set_index('indice').rename_axis(None))
+
+    # Análise de valores nulos
+    print("\n1️⃣5️⃣ ANÁLISE DE DADOS FALTANTES:")
+    print(pd.Series(r['nulos']))
+
+    # Resumo do fluxo logístico total
+    print("\n1️⃣6️⃣ RESUMO DO FLUXO LOGÍSTICO TOTAL:")
+    for key, value in r['fluxo_total'].items():
+        print(f"   {key}: {value}")
+
+    print("\n" + "=" * 80)
+    print("✅ ANÁLISE CONCLUÍDA!")
+    print("=" * 80)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relatório de análise dos dados de supply chain.")
+    parser.add_argument("arquivo", nargs="?", default="dados_hackathon.csv", help="CSV de estoque (separador ';').")
+    parser.add_argument("--bloco", type=int, default=None,
+                        help="Lê o CSV em blocos de N linhas (memória limitada ao bloco, para arquivos maiores que a RAM).")
+    args = parser.parse_args()
+
+    if args.bloco:
+        imprimir_relatorio(agregar_csv(args.arquivo, args.bloco).relatorio())
+    else:
+        # Carregar dados
+        df = pd.read_csv(args.arquivo, delimiter=';')
+        imprimir_relatorio(calcular_relatorio(df))
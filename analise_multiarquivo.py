@@ -0,0 +1,184 @@
+"""
+Análise de Múltiplos Arquivos de Estoque - Nexum Supply Chain
+Agrega vários extratos no formato de dados_hackathon.csv (um por depósito por dia)
+em paralelo, gerando relatórios por arquivo, por depósito e global.
+
+Os agregados de cada arquivo ficam em cache pelo hash do conteúdo, pelo
+tamanho do bloco e pela versão do código de agregação, então reexecuções só
+processam arquivos novos ou alterados (ou todos, se o código mudou).
+
+Uso:
+    python analise_multiarquivo.py extratos/
+    python analise_multiarquivo.py "extratos/*/2025-10-*.csv" --processos 8
+"""
+
+import os
+import re
+import glob
+import pickle
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import agregacao_estoque
+from agregacao_estoque import AgregadoEstoque, agregar_csv
+from analise_dados import imprimir_relatorio
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'agregados')
+# Incrementar quando o formato de AgregadoEstoque mudar, para invalidar o cache
+VERSAO_AGREGADO = 1
+TAMANHO_BLOCO = 500_000
+
+def listar_arquivos(entradas: List[str]) -> List[str]:
+    """Expande diretórios (recursivamente) e globs em uma lista ordenada de CSVs."""
+    arquivos = set()
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            arquivos.update(glob.glob(os.path.join(entrada, '**', '*.csv'), recursive=True))
+        else:
+            arquivos.update(glob.glob(entrada, recursive=True))
+    return sorted(os.path.abspath(a) for a in arquivos if os.path.isfile(a))
+
+def deposito_do_arquivo(caminho: str, padrao: Optional[str] = None) -> str:
+    """Identifica o depósito do extrato.
+
+    Com `padrao`, usa o grupo nomeado `deposito` da regex aplicada ao caminho.
+    Sem padrão: `<deposito>/<data>.csv` usa o nome da pasta, e
+    `<deposito>_<data>.csv` usa o prefixo do nome do arquivo.
+    """
+    if padrao:
+        encontrado = re.search(padrao, caminho.replace(os.sep, '/'))
+        if encontrado:
+            return encontrado.group('deposito')
+    nome = os.path.splitext(os.path.basename(caminho))[0]
+    if '_' in nome:
+        return nome.split('_', 1)[0]
+    return os.path.basename(os.path.dirname(caminho)) or nome
+
+def hash_arquivo(caminho: str, tamanho_leitura: int = 1 << 20) -> str:
+    """SHA-256 do conteúdo do arquivo."""
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for parte in iter(lambda: f.read(tamanho_leitura), b''):
+            h.update(parte)
+    return h.hexdigest()
+
+def _versao_codigo() -> str:
+    """Hash do código-fonte que calcula os agregados: qualquer mudança nele invalida o cache."""
+    return hash_arquivo(agregacao_estoque.__file__)[:12]
+
+VERSAO_CODIGO = _versao_codigo()
+
+def _caminho_cache(hash_conteudo: str, tamanho_bloco: int = TAMANHO_BLOCO) -> str:
+    # Resumos aproximados (histogramas, top-k) podem variar com a divisão em blocos
+    return os.path.join(CACHE_DIR, f"v{VERSAO_AGREGADO}-{VERSAO_CODIGO}-b{tamanho_bloco}-{hash_conteudo}.pkl")
+
+def agregar_arquivo(caminho: str, tamanho_bloco: int = TAMANHO_BLOCO) -> Tuple[str, AgregadoEstoque, bool]:
+    """Agrega um arquivo, reaproveitando o cache quando o conteúdo já foi processado.
+
+    Retorna (caminho, agregado, veio_do_cache). Executado nos processos do pool.
+    """
+    cache = _caminho_cache(hash_arquivo(caminho), tamanho_bloco)
+    try:
+        with open(cache, 'rb') as f:
+            agregado, em_cache = pickle.load(f), True
+    except (FileNotFoundError, pickle.UnpicklingError, EOFError, AttributeError):
+        agregado, em_cache = agregar_csv(caminho, tamanho_bloco), False
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temporario = f"{cache}.{os.getpid()}.tmp"
+        with open(temporario, 'wb') as f:
+            pickle.dump(agregado, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, cache)
+    return caminho, agregado, em_cache
+
+def nomes_relativos(arquivos: List[str]) -> Dict[str, str]:
+    """Caminho de cada arquivo relativo à pasta comum a todos."""
+    raiz = os.path.commonpath(arquivos) if len(arquivos) > 1 else os.path.dirname(arquivos[0])
+    return {caminho: os.path.relpath(caminho, raiz) for caminho in arquivos}
+
+def analisar_arquivos(arquivos: List[str], processos: Optional[int] = None, padrao_deposito: Optional[str] = None,
+                      tamanho_bloco: int = TAMANHO_BLOCO) -> Dict:
+    """Agrega os arquivos em paralelo e mescla por arquivo, por depósito e global."""
+    por_arquivo: Dict[str, AgregadoEstoque] = {}
+    do_cache = 0
+    with ProcessPoolExecutor(max_workers=processos or os.cpu_count()) as pool:
+        futuros = [pool.submit(agregar_arquivo, caminho, tamanho_bloco) for caminho in arquivos]
+        for futuro in as_completed(futuros):
+            caminho, agregado, em_cache = futuro.result()
+            por_arquivo[caminho] = agregado
+            do_cache += em_cache
+
+    nomes = nomes_relativos(arquivos)
+    por_deposito: Dict[str, AgregadoEstoque] = {}
+    global_ = AgregadoEstoque()
+    for caminho in arquivos:
+        # Nos relatórios mesclados, os tops indicam de qual arquivo veio cada linha
+        for heap in (por_arquivo[caminho].top_criticos, por_arquivo[caminho].top_compras):
+            for item in heap:
+                item.registro['arquivo'] = nomes[caminho]
+        deposito = deposito_do_arquivo(caminho, padrao_deposito)
+        por_deposito.setdefault(deposito, AgregadoEstoque()).mesclar(por_arquivo[caminho])
+        global_.mesclar(por_arquivo[caminho])
+
+    return {
+        'arquivos': {nomes[caminho]: por_arquivo[caminho].relatorio() for caminho in arquivos},
+        'depositos': {deposito: agregado.relatorio() for deposito, agregado in sorted(por_deposito.items())},
+        'global': global_.relatorio(),
+        'processados': len(arquivos) - do_cache,
+        'do_cache': do_cache,
+    }
+
+def _linha_resumo(nome: str, r: Dict) -> str:
+    return (f"   {nome:<40}{r['total_registros']:>12}{r['produtos_unicos']:>10}"
+            f"{r['somas']['saldo_manut']:>14}{r['criticos_total']:>10}")
+
+def imprimir_resumos(resultado: Dict):
+    cabecalho = f"   {'':<40}{'Registros':>12}{'SKUs':>10}{'Saldo':>14}{'Críticos':>10}"
+
+    print("=" * 90)
+    print(f"📁 ANÁLISE DE {len(resultado['arquivos'])} ARQUIVOS "
+          f"({resultado['processados']} processados, {resultado['do_cache']} do cache)")
+    print("=" * 90)
+
+    print("\n📄 POR ARQUIVO:")
+    print(cabecalho)
+    for nome, r in resultado['arquivos'].items():
+        print(_linha_resumo(nome, r))
+
+    print("\n🏭 POR DEPÓSITO:")
+    print(cabecalho)
+    for deposito, r in resultado['depositos'].items():
+        print(_linha_resumo(deposito, r))
+    print()
+
+def _padrao_deposito(texto: str) -> str:
+    """Valida --padrao-deposito na leitura dos argumentos (erro de uso, não IndexError no meio da análise)."""
+    try:
+        padrao = re.compile(texto)
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"regex inválida: {e}")
+    if 'deposito' not in padrao.groupindex:
+        raise argparse.ArgumentTypeError("a regex precisa do grupo nomeado (?P<deposito>...)")
+    return texto
+
+def main():
+    parser = argparse.ArgumentParser(description="Análise paralela de múltiplos extratos de estoque.")
+    parser.add_argument("entradas", nargs="+", help="Diretórios ou globs de arquivos CSV.")
+    parser.add_argument("--processos", type=int, default=None, help="Processos do pool (padrão: todos os núcleos).")
+    parser.add_argument("--padrao-deposito", default=None, type=_padrao_deposito,
+                        help="Regex com o grupo (?P<deposito>...) para extrair o depósito do caminho.")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO, help="Linhas por bloco na leitura de cada arquivo.")
+    args = parser.parse_args()
+
+    arquivos = listar_arquivos(args.entradas)
+    if not arquivos:
+        print("❌ Nenhum arquivo CSV encontrado.")
+        return
+
+    resultado = analisar_arquivos(arquivos, args.processos, args.padrao_deposito, args.bloco)
+    imprimir_resumos(resultado)
+    imprimir_relatorio(resultado['global'])
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,65 @@
-from flask import Flask, request, jsonify
+import os
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 import stock
-# sales e worker seriam importados aqui também se fossem refatorados
+import sales
+from sessao import gerenciador_sessoes
+# worker seria importado aqui também se fosse refatorado
 
 app = Flask(__name__)
 CORS(app)
 
+# Com SESSAO_OBRIGATORIA=1 as rotas /api/* exigem token de sessão (desligado por padrão; ver README)
+SESSAO_OBRIGATORIA = os.getenv('SESSAO_OBRIGATORIA', '0') == '1'
+ROTAS_PUBLICAS = {'/api/login'}
+
+@app.before_request
+def validar_sessao():
+    """Valida o token "Authorization: Bearer <token>" em memória e expõe o usuário em g.usuario."""
+    g.usuario = None
+    cabecalho = request.headers.get('Authorization', '')
+    if cabecalho.startswith('Bearer '):
+        g.usuario = gerenciador_sessoes().validar(cabecalho[7:])
+
+    if (SESSAO_OBRIGATORIA and g.usuario is None and request.method != 'OPTIONS'
+            and request.path.startswith('/api/') and request.path not in ROTAS_PUBLICAS):
+        return jsonify({"error": "Invalid or expired session token"}), 401
+
 @app.route('/', methods=['GET'])
 def home():
     return jsonify({"status": "Nexum API (JSON version) is running!"}), 200
 
+# --- Rotas de Autenticação ---
+
+@app.route('/api/login', methods=['POST'])
+def login():
+    """Endpoint de login: valida email/senha uma vez e emite um token de sessão."""
+    # Importado aqui: o gerenciador depende do driver ODBC, que só o login usa
+    try:
+        from user_manager import GerenciadorUsuarios
+    except ImportError:
+        return jsonify({"error": "Login unavailable: ODBC driver (pyodbc) is not installed"}), 503
+
+    data = request.json or {}
+    sucesso, mensagem, usuario = GerenciadorUsuarios().autenticar_usuario(
+        data.get('email'), data.get('senha'), request.remote_addr)
+    if not sucesso:
+        return jsonify({"error": mensagem}), 401
+    sessoes = gerenciador_sessoes()
+    token = sessoes.emitir(usuario['id'], usuario['funcao'])
+    return jsonify({"token": token, "expires_in": sessoes.validade, "funcao": usuario['funcao']}), 200
+
 # --- Rotas de Produtos ---
 
 @app.route('/api/products', methods=['GET'])
 def get_all_products():
-    """Endpoint para listar todos os produtos."""
-    products = stock.service_get_all_products()
+    """Endpoint para listar os produtos (?abc=A&tipo=20&limit=100&offset=0 filtram no backend)."""
+    products = stock.service_get_all_products(
+        abc=request.args.get('abc'),
+        tipo=request.args.get('tipo', type=int),
+        limit=request.args.get('limit', type=int),
+        offset=request.args.get('offset', 0, type=int),
+    )
     return jsonify(products)
 
 @app.route('/api/products/<int:product_id>', methods=['GET'])
@@ -54,6 +98,72 @@ def get_stock_alerts():
     alerts = stock.service_check_stock_alerts()
     return jsonify(alerts)
 
+@app.route('/api/stock/summary', methods=['GET'])
+def get_stock_summary():
+    """Endpoint com os totais do estoque e a quebra por classe ABC."""
+    return jsonify(stock.service_stock_summary())
+
+# --- Rotas de Vendas ---
+
+@app.route('/api/sales/bulk', methods=['POST'])
+def create_sales_bulk():
+    """Endpoint de ingestão em lote: arquivo CSV/JSON (campo 'arquivo') ou array JSON no corpo."""
+    arquivo = request.files.get('arquivo')
+    if arquivo is not None:
+        content, filename = arquivo.read(), arquivo.filename or ''
+    else:
+        content, filename = request.get_json(silent=True), ''
+        if not isinstance(content, list):
+            return jsonify({"error": "Send a JSON array of sales or a file in the 'arquivo' field"}), 400
+    report = sales.service_create_sales_bulk(content, filename)
+    return jsonify(report), 201 if report['inseridas'] else 400
+
+# --- Rotas de Vendas: agregados por período ---
+
+def _periodo_vendas():
+    """Parâmetros ?inicio=DD/MM/AAAA&fim=DD/MM/AAAA ou ?dias=N (últimos N dias até fim/hoje)."""
+    return {
+        'start_date': request.args.get('inicio'),
+        'end_date': request.args.get('fim'),
+        'days': request.args.get('dias', type=int),
+    }
+
+@app.route('/api/sales/summary', methods=['GET'])
+def get_sales_summary():
+    """Endpoint com quantidade e valor total de vendas no período."""
+    try:
+        return jsonify(sales.service_sales_total(**_periodo_vendas()))
+    except ValueError:
+        return jsonify({"error": "Invalid date, use DD/MM/AAAA"}), 400
+
+@app.route('/api/sales/daily', methods=['GET'])
+def get_sales_daily():
+    """Endpoint com a série diária de vendas no período."""
+    try:
+        return jsonify(sales.service_sales_daily(**_periodo_vendas()))
+    except ValueError:
+        return jsonify({"error": "Invalid date, use DD/MM/AAAA"}), 400
+
+@app.route('/api/sales/monthly', methods=['GET'])
+def get_sales_monthly():
+    """Endpoint com a série mensal de vendas no período."""
+    try:
+        return jsonify(sales.service_sales_monthly(**_periodo_vendas()))
+    except ValueError:
+        return jsonify({"error": "Invalid date, use DD/MM/AAAA"}), 400
+
+# --- Rotas de Funcionários ---
+
+@app.route('/api/workers/cache/metrics', methods=['GET'])
+def get_worker_cache_metrics():
+    """Acertos/faltas do cache de perfis e funções dos funcionários neste processo."""
+    # Importado aqui pelo mesmo motivo do login: worker depende do driver ODBC
+    try:
+        import worker
+    except ImportError:
+        return jsonify({"error": "Workers unavailable: ODBC driver (pyodbc) is not installed"}), 503
+    return jsonify(worker.service_get_cache_metrics()), 200
+
 # --- Execução da Aplicação ---
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
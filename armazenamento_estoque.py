@@ -0,0 +1,461 @@
+"""
+Armazenamento do Estoque - Nexum Supply Chain
+Interface única para o serviço de produtos (stock.py) e para o cmm publicado
+pelo motor de demanda (sales.py), com três backends:
+
+    json     database.json + catálogo colunar compartilhado (snapshot_catalogo.py)
+    sqlite   arquivo SQLite local com a tabela supply_chain.produtos_estoque
+    odbc     Azure SQL (supply_chain.produtos_estoque, create_table.sql) via pyodbc
+
+Filtros, agregações e itens críticos são resolvidos pelo próprio backend (WHERE/
+GROUP BY no SQL, máscaras sobre as colunas no JSON), sem carregar todos os
+produtos no Python. Escolha por ESTOQUE_BACKEND (padrão: json).
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+import database
+from catalogo import CHAVES_PADRAO
+from agregacao_estoque import COLUNAS_INTEIRAS, COLUNAS_DECIMAIS, CMM_CRITICO
+from pool_conexoes import pool_compartilhado
+from snapshot_catalogo import LeitorSnapshot
+
+ESTOQUE_BACKEND = os.getenv('ESTOQUE_BACKEND', 'json')
+ESTOQUE_SQLITE = os.getenv('ESTOQUE_SQLITE', 'supply_chain.db')
+
+# Fator da sugestão de compra: compra-se o que faltar para 1,5 mês de consumo
+FATOR_SUGESTAO = 1.5
+
+class ArmazenamentoEstoque:
+    """Operações do serviço de produtos; cada backend implementa todas."""
+
+    nome = ''
+
+    def listar(self, abc: Optional[str] = None, tipo: Optional[int] = None,
+               limite: Optional[int] = None, deslocamento: int = 0) -> List[Dict]:
+        """Produtos na ordem de cadastro, opcionalmente filtrados por classe ABC e tipo."""
+        raise NotImplementedError
+
+    def obter(self, produto_id: int) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def criar(self, produto: Dict) -> int:
+        """Cadastra o produto e retorna o id atribuído."""
+        raise NotImplementedError
+
+    def remover(self, produto_id: int) -> bool:
+        raise NotImplementedError
+
+    def cmm_por_codigo(self, codigos: List[str]) -> Dict[str, float]:
+        """cmm atual dos produtos com esses códigos (códigos sem produto ficam de fora)."""
+        raise NotImplementedError
+
+    def atualizar_cmm(self, valores: Dict[str, float]):
+        """Grava {codigo: cmm} calculado pelo motor de demanda (demanda.py); códigos sem produto são ignorados."""
+        raise NotImplementedError
+
+    def sugestoes_compra(self) -> List[Dict]:
+        """Produtos com cmm * FATOR_SUGESTAO acima do saldo, com a quantidade a comprar."""
+        raise NotImplementedError
+
+    def alertas(self) -> List[Dict]:
+        """Produtos críticos: saldo zerado e cmm acima de CMM_CRITICO."""
+        raise NotImplementedError
+
+    def resumo(self) -> Dict:
+        """Totais do estoque e quebra por classe ABC (como vw_dashboard_executivo e vw_analise_abc)."""
+        raise NotImplementedError
+
+    def fechar(self):
+        pass
+
+def _sugestao(codigo, estoque_atual, cmm, necessidade) -> Dict:
+    return {
+        "codigo": codigo,
+        "estoque_atual": estoque_atual,
+        "cmm": cmm,
+        "quantidade_a_comprar": round(necessidade)
+    }
+
+def _montar_resumo(total, estoque, compras, sem_estoque, criticos, soma_cmm, por_abc) -> Dict:
+    """por_abc: [(abc, quantidade, estoque, sem_estoque, soma_cmm)]."""
+    return {
+        'total_produtos': int(total),
+        'estoque_total': int(estoque or 0),
+        'compras_provisionadas': int(compras or 0),
+        'produtos_sem_estoque': int(sem_estoque or 0),
+        'produtos_criticos': int(criticos or 0),
+        'cmm_medio': round(float(soma_cmm or 0) / total, 4) if total else 0.0,
+        'por_abc': [{
+            'abc': abc,
+            'quantidade_produtos': int(quantidade),
+            'estoque_total': int(estoque_abc or 0),
+            'produtos_sem_estoque': int(sem_estoque_abc or 0),
+            'cmm_medio': round(float(soma_cmm_abc or 0) / quantidade, 4) if quantidade else 0.0,
+        } for abc, quantidade, estoque_abc, sem_estoque_abc, soma_cmm_abc in por_abc],
+    }
+
+# ============================================================================
+# JSON (database.json + catálogo colunar)
+# ============================================================================
+
+class ArmazenamentoJSON(ArmazenamentoEstoque):
+    """database.json; leituras sobre o catálogo colunar mapeado, escritas regravando o arquivo."""
+
+    nome = 'json'
+
+    def __init__(self):
+        self._leitor = None
+
+    def _salvar(self, dados: Dict):
+        database.save_data(dados)
+        self._leitor_snapshot().publicar_atual(dados.get("products", []))
+
+    def _leitor_snapshot(self) -> LeitorSnapshot:
+        # DB_FILE é lido a cada chamada: scripts e benchmarks podem apontá-lo para outro arquivo
+        if self._leitor is None or self._leitor.caminho_db != database.DB_FILE:
+            self._leitor = LeitorSnapshot(database.DB_FILE)
+        return self._leitor
+
+    def catalogo(self):
+        """Catálogo colunar (catalogo.Catalogo) com os produtos atuais."""
+        return self._leitor_snapshot().catalogo(lambda: database.load_data().get("products", []))
+
+    def listar(self, abc=None, tipo=None, limite=None, deslocamento=0):
+        if abc is None and tipo is None and limite is None and not deslocamento:
+            return database.load_data().get("products", [])
+        catalogo = self.catalogo()
+        mascara = np.ones(len(catalogo.posicoes_regulares()), dtype=bool)
+        if abc is not None:
+            codigos = [i for i, classe in enumerate(catalogo.vocabulario_abc) if classe == abc]
+            mascara &= np.isin(catalogo.colunas['abc'], codigos)
+        if tipo is not None:
+            mascara &= catalogo.colunas['tipo'] == tipo
+        posicoes = catalogo.posicoes_regulares()[mascara].tolist()
+        posicoes += [posicao for posicao, p in catalogo.irregulares().items()
+                     if (abc is None or p.get('abc') == abc) and (tipo is None or p.get('tipo') == tipo)]
+        posicoes.sort()
+        fim = None if limite is None else deslocamento + limite
+        return catalogo.para_dicts(posicoes[deslocamento:fim])
+
+    def obter(self, produto_id):
+        produto = self.catalogo().por_id(produto_id)
+        return dict(produto) if produto is not None else None
+
+    def criar(self, produto):
+        dados = database.load_data()
+        produtos = dados.setdefault("products", [])
+        # Pega o maior ID atual e adiciona 1 para o novo produto
+        produto['id'] = max([p.get("id", 0) for p in produtos]) + 1 if produtos else 1
+        produtos.append(produto)
+        self._salvar(dados)
+        return produto['id']
+
+    def remover(self, produto_id):
+        dados = database.load_data()
+        produtos = dados.get("products", [])
+        for produto in produtos:
+            if produto.get("id") == produto_id:
+                produtos.remove(produto)
+                self._salvar(dados)
+                return True
+        return False
+
+    def cmm_por_codigo(self, codigos):
+        codigos = set(codigos)
+        return {p['codigo']: p.get('cmm') for p in database.load_data().get("products", []) if p.get('codigo') in codigos}
+
+    def atualizar_cmm(self, valores):
+        dados = database.load_data()
+        alterado = False
+        for produto in dados.get("products", []):
+            cmm = valores.get(produto.get('codigo'))
+            if cmm is not None:
+                produto['cmm'] = cmm
+                alterado = True
+        if alterado:
+            self._salvar(dados)
+
+    def sugestoes_compra(self):
+        catalogo = self.catalogo()
+        posicoes = catalogo.posicoes_regulares()
+        cmm = catalogo.decimal('cmm')
+        saldo = catalogo.colunas['saldo_manut']
+        necessidade = cmm * FATOR_SUGESTAO - saldo
+        linhas = np.flatnonzero(necessidade > 0)
+        encontrados = list(zip(posicoes[linhas].tolist(),
+                               map(_sugestao, catalogo.valores('codigo', linhas), saldo[linhas].tolist(),
+                                   cmm[linhas].tolist(), necessidade[linhas].tolist())))
+        for posicao, p in catalogo.irregulares().items():
+            necessidade_irregular = (p.get('cmm', 0) * FATOR_SUGESTAO) - p.get('saldo_manut', 0)
+            if necessidade_irregular > 0:
+                encontrados.append((posicao, _sugestao(p.get('codigo'), p.get('saldo_manut'), p.get('cmm'),
+                                                       necessidade_irregular)))
+        encontrados.sort(key=lambda item: item[0])
+        return [sugestao for _, sugestao in encontrados]
+
+    def alertas(self):
+        catalogo = self.catalogo()
+        criticos = (catalogo.colunas['saldo_manut'] == 0) & (catalogo.decimal('cmm') > CMM_CRITICO)
+        encontrados = catalogo.posicoes_regulares()[criticos].tolist()
+        encontrados += [posicao for posicao, p in catalogo.irregulares().items()
+                        if p.get('saldo_manut', 0) == 0 and p.get('cmm', 0) > CMM_CRITICO]
+        return catalogo.para_dicts(sorted(encontrados))
+
+    def resumo(self):
+        catalogo = self.catalogo()
+        saldo = catalogo.colunas['saldo_manut'].astype(np.int64)
+        compras = catalogo.colunas['provid_compras'].astype(np.int64)
+        cmm = np.nan_to_num(catalogo.decimal('cmm'))
+        abc = np.asarray(catalogo.colunas['abc'], dtype=np.int64)
+        sem_estoque = saldo == 0
+        classes = len(catalogo.vocabulario_abc)
+        por_classe = [np.bincount(abc, minlength=classes), np.bincount(abc, weights=saldo, minlength=classes),
+                      np.bincount(abc, weights=sem_estoque, minlength=classes),
+                      np.bincount(abc, weights=cmm, minlength=classes)]
+        grupos = {classe: [int(q), int(e), int(s), float(c)]
+                  for classe, q, e, s, c in zip(catalogo.vocabulario_abc, *(v.tolist() for v in por_classe))}
+        totais = [len(saldo), int(saldo.sum()), int(compras.sum()), int(sem_estoque.sum()),
+                  int((sem_estoque & (cmm > CMM_CRITICO)).sum()), float(cmm.sum())]
+
+        for p in catalogo.irregulares().values():
+            saldo_p, cmm_p = p.get('saldo_manut') or 0, p.get('cmm') or 0
+            zerado = saldo_p == 0
+            for i, valor in enumerate([1, saldo_p, p.get('provid_compras') or 0, zerado,
+                                       zerado and cmm_p > CMM_CRITICO, cmm_p]):
+                totais[i] += valor
+            grupo = grupos.setdefault(p.get('abc'), [0, 0, 0, 0.0])
+            for i, valor in enumerate([1, saldo_p, zerado, cmm_p]):
+                grupo[i] += valor
+        return _montar_resumo(*totais, [(classe, *grupos[classe]) for classe in sorted(grupos, key=str)])
+
+# ============================================================================
+# SQL (SQLite local e Azure SQL via ODBC)
+# ============================================================================
+
+COLUNAS_PRODUTO = [chave for chave in CHAVES_PADRAO if chave != 'id']
+_SELECT_PRODUTO = f"SELECT {', '.join(CHAVES_PADRAO)} FROM supply_chain.produtos_estoque"
+
+class ArmazenamentoSQL(ArmazenamentoEstoque):
+    """Tabela supply_chain.produtos_estoque em uma conexão DB-API (parâmetros '?')."""
+
+    def __init__(self, nome_pool: str, fabrica: Callable):
+        self.pool = pool_compartilhado(nome_pool, fabrica)
+
+    # Diferenças de dialeto
+    def _paginar(self, sql: str, params: list, limite, deslocamento):
+        raise NotImplementedError
+
+    def _inserir(self, cursor, colunas: List[str], valores: list) -> int:
+        raise NotImplementedError
+
+    def _consultar(self, sql: str, params=()) -> List[tuple]:
+        with self.pool.conexao() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def _produto(linha) -> Dict:
+        produto = dict(zip(CHAVES_PADRAO, linha))
+        for chave in COLUNAS_DECIMAIS:
+            if produto[chave] is not None:
+                produto[chave] = float(produto[chave])  # DECIMAL chega como Decimal no pyodbc
+        return produto
+
+    def listar(self, abc=None, tipo=None, limite=None, deslocamento=0):
+        condicoes, params = ["ativo = 1"], []
+        if abc is not None:
+            condicoes.append("abc = ?")
+            params.append(abc)
+        if tipo is not None:
+            condicoes.append("tipo = ?")
+            params.append(tipo)
+        sql = f"{_SELECT_PRODUTO} WHERE {' AND '.join(condicoes)} ORDER BY id"
+        if limite is not None or deslocamento:
+            sql = self._paginar(sql, params, limite, deslocamento)
+        return [self._produto(linha) for linha in self._consultar(sql, params)]
+
+    def obter(self, produto_id):
+        linhas = self._consultar(f"{_SELECT_PRODUTO} WHERE id = ? AND ativo = 1", [produto_id])
+        return self._produto(linhas[0]) if linhas else None
+
+    def criar(self, produto):
+        colunas = [coluna for coluna in COLUNAS_PRODUTO if produto.get(coluna) is not None]
+        with self.pool.conexao() as conn:
+            cursor = conn.cursor()
+            try:
+                produto_id = self._inserir(cursor, colunas, [produto[coluna] for coluna in colunas])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        produto['id'] = produto_id
+        return produto_id
+
+    def remover(self, produto_id):
+        with self.pool.conexao() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("DELETE FROM supply_chain.produtos_estoque WHERE id = ?", [produto_id])
+                removidos = cursor.rowcount
+                conn.commit()
+            finally:
+                cursor.close()
+        return removidos > 0
+
+    def cmm_por_codigo(self, codigos):
+        codigos, valores = list(codigos), {}
+        # Em fatias: o SQL Server aceita no máximo 2100 parâmetros por comando
+        for i in range(0, len(codigos), 1000):
+            fatia = codigos[i:i + 1000]
+            linhas = self._consultar("SELECT codigo, cmm FROM supply_chain.produtos_estoque "
+                                     f"WHERE codigo IN ({', '.join('?' * len(fatia))})", fatia)
+            valores.update((codigo, float(cmm)) for codigo, cmm in linhas)
+        return valores
+
+    def atualizar_cmm(self, valores):
+        if not valores:
+            return
+        with self.pool.conexao() as conn:
+            cursor = conn.cursor()
+            try:
+                if hasattr(cursor, 'fast_executemany'):
+                    cursor.fast_executemany = True
+                cursor.executemany("UPDATE supply_chain.produtos_estoque SET cmm = ? WHERE codigo = ?",
+                                   [(cmm, codigo) for codigo, cmm in valores.items()])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def sugestoes_compra(self):
+        linhas = self._consultar(
+            "SELECT codigo, saldo_manut, cmm, cmm * ? - saldo_manut FROM supply_chain.produtos_estoque "
+            "WHERE ativo = 1 AND cmm * ? - saldo_manut > 0 ORDER BY id",
+            [FATOR_SUGESTAO, FATOR_SUGESTAO])
+        return [_sugestao(codigo, saldo, float(cmm), float(necessidade)) for codigo, saldo, cmm, necessidade in linhas]
+
+    def alertas(self):
+        # Mesmo predicado do índice filtrado IX_produtos_estoque_criticos
+        linhas = self._consultar(f"{_SELECT_PRODUTO} WHERE saldo_manut = 0 AND cmm > {CMM_CRITICO} AND ativo = 1 "
+                                 "ORDER BY id")
+        return [self._produto(linha) for linha in linhas]
+
+    def resumo(self):
+        totais = self._consultar(
+            "SELECT COUNT(*), SUM(CAST(saldo_manut AS BIGINT)), SUM(CAST(provid_compras AS BIGINT)), "
+            "SUM(CASE WHEN saldo_manut = 0 THEN 1 ELSE 0 END), "
+            "SUM(CASE WHEN saldo_manut = 0 AND cmm > ? THEN 1 ELSE 0 END), SUM(cmm) "
+            "FROM supply_chain.produtos_estoque WHERE ativo = 1", [CMM_CRITICO])[0]
+        por_abc = self._consultar(
+            "SELECT abc, COUNT(*), SUM(CAST(saldo_manut AS BIGINT)), SUM(CASE WHEN saldo_manut = 0 THEN 1 ELSE 0 END), SUM(cmm) "
+            "FROM supply_chain.produtos_estoque WHERE ativo = 1 GROUP BY abc ORDER BY abc")
+        return _montar_resumo(*totais, [tuple(linha) for linha in por_abc])
+
+    def fechar(self):
+        self.pool.fechar()
+
+# Mesma forma de supply_chain.produtos_estoque (create_table.sql), com os índices usados pelas consultas
+SQLITE_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS supply_chain.produtos_estoque ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " codigo TEXT NOT NULL UNIQUE,"
+    " abc TEXT NOT NULL CHECK (abc IN ('A', 'B', 'C')),"
+    " tipo INTEGER NOT NULL CHECK (tipo IN (10, 19, 20)),"
+    + "".join(f" {coluna} INTEGER NOT NULL DEFAULT 0," for coluna in COLUNAS_INTEIRAS if coluna != 'tipo')
+    + " cmm REAL NOT NULL DEFAULT 0 CHECK (cmm >= 0),"
+    " coef_perda REAL NOT NULL DEFAULT 0 CHECK (coef_perda >= 0),"
+    " data_criacao TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,"
+    " data_atualizacao TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,"
+    " ativo INTEGER NOT NULL DEFAULT 1,"
+    " CHECK (saldo_manut >= 0))",
+    "CREATE INDEX IF NOT EXISTS supply_chain.IX_produtos_estoque_abc ON produtos_estoque(abc, tipo)",
+    "CREATE INDEX IF NOT EXISTS supply_chain.IX_produtos_estoque_tipo ON produtos_estoque(tipo)",
+    "CREATE INDEX IF NOT EXISTS supply_chain.IX_produtos_estoque_criticos ON produtos_estoque(id) "
+    f"WHERE saldo_manut = 0 AND cmm > {CMM_CRITICO}",
+]
+
+class ArmazenamentoSQLite(ArmazenamentoSQL):
+    """Arquivo SQLite anexado como schema supply_chain (substituto local do Azure SQL)."""
+
+    nome = 'sqlite'
+
+    def __init__(self, caminho: str = ESTOQUE_SQLITE):
+        self.caminho = os.path.abspath(caminho)
+        super().__init__(f'estoque_sqlite:{self.caminho}', self._conectar)
+
+    def _conectar(self):
+        conn = sqlite3.connect(':memory:', timeout=60, check_same_thread=False)
+        conn.execute("ATTACH DATABASE ? AS supply_chain", (self.caminho,))
+        for comando in SQLITE_SCHEMA:
+            conn.execute(comando)
+        conn.commit()
+        return conn
+
+    def _paginar(self, sql, params, limite, deslocamento):
+        params.extend([-1 if limite is None else limite, deslocamento])
+        return f"{sql} LIMIT ? OFFSET ?"
+
+    def _inserir(self, cursor, colunas, valores):
+        cursor.execute(f"INSERT INTO supply_chain.produtos_estoque ({', '.join(colunas)}) "
+                       f"VALUES ({', '.join('?' * len(colunas))})", valores)
+        return cursor.lastrowid
+
+class ArmazenamentoODBC(ArmazenamentoSQL):
+    """Azure SQL via pyodbc; por padrão usa a conexão configurada em user_manager (AZURE_SQL_*)."""
+
+    nome = 'odbc'
+
+    def __init__(self, fabrica: Optional[Callable] = None):
+        if fabrica is None:
+            from user_manager import get_connection as fabrica
+        super().__init__('estoque_odbc', fabrica)
+
+    def _paginar(self, sql, params, limite, deslocamento):
+        params.append(deslocamento)
+        if limite is None:
+            return f"{sql} OFFSET ? ROWS"
+        params.append(limite)
+        return f"{sql} OFFSET ? ROWS FETCH NEXT ? ROWS ONLY"
+
+    def _inserir(self, cursor, colunas, valores):
+        cursor.execute(f"INSERT INTO supply_chain.produtos_estoque ({', '.join(colunas)}) OUTPUT INSERTED.id "
+                       f"VALUES ({', '.join('?' * len(colunas))})", valores)
+        return int(cursor.fetchone()[0])
+
+# ============================================================================
+# Backend do processo
+# ============================================================================
+
+BACKENDS = {'json': ArmazenamentoJSON, 'sqlite': ArmazenamentoSQLite, 'odbc': ArmazenamentoODBC}
+
+_armazenamento: Optional[ArmazenamentoEstoque] = None
+_armazenamento_lock = threading.Lock()
+
+def criar_armazenamento(nome: str = ESTOQUE_BACKEND, **opcoes) -> ArmazenamentoEstoque:
+    try:
+        classe = BACKENDS[nome]
+    except KeyError:
+        raise ValueError(f"Backend de estoque desconhecido: {nome} (opções: {', '.join(BACKENDS)})") from None
+    return classe(**opcoes)
+
+def armazenamento_estoque() -> ArmazenamentoEstoque:
+    """Backend único por processo, escolhido por ESTOQUE_BACKEND."""
+    global _armazenamento
+    with _armazenamento_lock:
+        if _armazenamento is None:
+            _armazenamento = criar_armazenamento()
+        return _armazenamento
@@ -0,0 +1,82 @@
+"""
+Benchmark do relatório de analise_dados.py
+Compara as varreduras independentes por coluna do script original com o motor
+de agregação (agregacao_estoque.calcular_relatorio) sobre o mesmo DataFrame.
+
+Uso: python benchmarks/bench_agregacao.py [linhas]   (padrão: 10.000.000)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agregacao_estoque import calcular_relatorio
+from dados_sinteticos import gerar_dataframe
+
+def relatorio_original(df):
+    """Mesmas métricas, calculadas como no analise_dados.py original (referência)."""
+    r = {
+        'total': len(df), 'unicos': df['codigo'].nunique(), 'describe': df.describe(),
+        'abc': df['abc'].value_counts(), 'tipo': df['tipo'].value_counts(),
+        'a': (df['abc'] == 'A').sum(), 'b': (df['abc'] == 'B').sum(), 'c': (df['abc'] == 'C').sum(),
+        'saldo': df['saldo_manut'].sum(), 'saldo_pos': (df['saldo_manut'] > 0).sum(),
+        'saldo_zero': (df['saldo_manut'] == 0).sum(), 'saldo_media': df['saldo_manut'].mean(),
+        'saldo_mediana': df['saldo_manut'].median(), 'compras': df['provid_compras'].sum(),
+        'compras_pos': (df['provid_compras'] > 0).sum(),
+    }
+    for coluna in ['recebimento_esperado', 'transito_manut', 'stage_manut', 'recepcao_manut', 'pendente_ri',
+                   'pecas_teste_kit', 'pecas_teste', 'fornecedor_reparo', 'laboratorio', 'wr', 'wrcr', 'stage_wr']:
+        r[coluna] = df[coluna].sum()
+    r.update({
+        'cmm_media': df['cmm'].mean(), 'cmm_max': df['cmm'].max(), 'coef_media': df['coef_perda'].mean(),
+        'coef_zero': (df['coef_perda'] == 0).sum(), 'coef_acima': (df['coef_perda'] > 1).sum(),
+    })
+    criticos = df[(df['cmm'] > 1) & (df['saldo_manut'] == 0)]
+    r['criticos'] = len(criticos)
+    r['top_criticos'] = criticos.nlargest(10, 'cmm')[['codigo', 'abc', 'cmm', 'saldo_manut', 'provid_compras']]
+    r['top_compras'] = df.nlargest(10, 'provid_compras')[['codigo', 'abc', 'tipo', 'saldo_manut', 'provid_compras']]
+    r['nulos'] = df.isnull().sum()
+    r['fluxo'] = {
+        'Estoque Disponível': df['saldo_manut'].sum(), 'Compras Provisionadas': df['provid_compras'].sum(),
+        'Recebimento Esperado': df['recebimento_esperado'].sum(), 'Em Trânsito': df['transito_manut'].sum(),
+        'Em Stage': df['stage_manut'].sum(), 'Em Recepção': df['recepcao_manut'].sum(),
+        'Em Testes': df['pecas_teste_kit'].sum() + df['pecas_teste'].sum(),
+        'Em Reparo': df['fornecedor_reparo'].sum() + df['laboratorio'].sum(), 'WR Total': df['wr'].sum(),
+    }
+    return r
+
+def medir(funcao, df, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(df)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    print(f"🔄 Gerando {linhas} linhas sintéticas...")
+    df = gerar_dataframe(linhas)
+
+    t_original, original = medir(relatorio_original, df)
+    t_motor, motor = medir(calcular_relatorio, df)
+
+    conferem = (
+        int(original['saldo']) == motor['somas']['saldo_manut']
+        and int(original['criticos']) == motor['criticos_total']
+        and original['top_compras']['codigo'].tolist() == [r['codigo'] for r in motor['top_compras']]
+        and {k: int(v) for k, v in original['fluxo'].items()} == motor['fluxo_total']
+    )
+
+    print("=" * 70)
+    print(f"⏱️  RELATÓRIO DE ESTOQUE - {linhas} linhas")
+    print("=" * 70)
+    print(f"   Varreduras por coluna (original): {t_original * 1000:10.1f} ms")
+    print(f"   Motor de agregação:               {t_motor * 1000:10.1f} ms")
+    print(f"   Speedup:                          {t_original / t_motor:10.2f}x")
+    print(f"   Métricas conferem: {'✅' if conferem else '❌'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark dos backends de estoque (armazenamento_estoque.py)
+Roda as mesmas operações do serviço de produtos contra cada backend, sobre o
+mesmo catálogo sintético, e confere que todos devolvem o mesmo resultado:
+
+    json     database.json + catálogo colunar mapeado
+    sqlite   arquivo SQLite local (supply_chain.produtos_estoque + índices)
+    odbc     Azure SQL, só com --odbc (usa AZURE_SQL_*; a tabela deve estar carregada
+             com os mesmos produtos: python database/insert_data.py)
+
+Uso: python benchmarks/bench_armazenamento.py [skus] [--odbc]   (padrão: 200.000)
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from bench_catalogo import gerar_json
+
+def preparar(skus, pasta):
+    """Grava o database.json sintético e o mesmo conteúdo no SQLite (em lote)."""
+    import database
+    from armazenamento_estoque import ArmazenamentoSQLite, COLUNAS_PRODUTO
+
+    database.DB_FILE = os.path.join(pasta, 'database.json')
+    with open(database.DB_FILE, 'w', encoding='utf-8') as f:
+        f.write(gerar_json(skus))
+    produtos = database.load_data()['products']
+
+    sqlite = ArmazenamentoSQLite(os.path.join(pasta, 'estoque.db'))
+    with sqlite.pool.conexao() as conn:
+        conn.executemany(
+            f"INSERT INTO supply_chain.produtos_estoque (id, {', '.join(COLUNAS_PRODUTO)}) "
+            f"VALUES ({', '.join('?' * (len(COLUNAS_PRODUTO) + 1))})",
+            ([p['id']] + [p[coluna] for coluna in COLUNAS_PRODUTO] for p in produtos))
+        conn.commit()
+        conn.execute("ANALYZE supply_chain")
+    return produtos, sqlite
+
+def operacoes(skus):
+    """(nome, função(backend)) medidas em todos os backends."""
+    meio = skus // 2
+    return [
+        ("obter(id)", lambda b: b.obter(meio)),
+        ("listar(abc='A')", lambda b: b.listar(abc='A')),
+        ("listar(tipo=19, 100 itens)", lambda b: b.listar(tipo=19, limite=100, deslocamento=meio // 10)),
+        ("sugestoes_compra()", lambda b: b.sugestoes_compra()),
+        ("alertas()", lambda b: b.alertas()),
+        ("resumo()", lambda b: b.resumo()),
+        ("criar + remover", lambda b: b.remover(b.criar({'codigo': 'BENCH-NOVO', 'abc': 'C', 'tipo': 20}))),
+    ]
+
+def medir(funcao, repeticoes=3):
+    melhor, resultado = float('inf'), None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return resultado, melhor
+
+def main():
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    skus = int(argumentos[0]) if argumentos else 200_000
+    pasta = tempfile.mkdtemp(prefix='bench_armazenamento_')
+    os.environ['CATALOGO_SNAPSHOT_DIR'] = os.path.join(pasta, 'catalogo')
+
+    from armazenamento_estoque import ArmazenamentoJSON, ArmazenamentoODBC
+
+    _, sqlite = preparar(skus, pasta)
+    backends = [ArmazenamentoJSON(), sqlite]
+    if '--odbc' in sys.argv:
+        backends.append(ArmazenamentoODBC())
+
+    print("=" * 78)
+    print(f"🗄️  BACKENDS DE ESTOQUE - {skus} SKUs")
+    print("=" * 78)
+    inicio = time.perf_counter()
+    backends[0].catalogo()
+    print(f"   json: primeira leitura (gera e publica o snapshot): {time.perf_counter() - inicio:.2f}s\n")
+
+    print(f"   {'Operação (ms)':<30}" + "".join(f"{b.nome:>12}" for b in backends) + f"{'Itens':>9}")
+    for nome, operacao in operacoes(skus):
+        resultados, tempos = [], []
+        for backend in backends:
+            resultado, segundos = medir(lambda: operacao(backend), repeticoes=1 if nome.startswith('criar') else 3)
+            resultados.append(resultado)
+            tempos.append(segundos)
+        assert all(r == resultados[0] for r in resultados), f"Resultados diferentes em {nome}"
+        itens = len(resultados[0]) if isinstance(resultados[0], list) else '-'
+        print(f"   {nome:<30}" + "".join(f"{t * 1000:>12.1f}" for t in tempos) + f"{itens:>9}")
+
+    for backend in backends:
+        backend.fechar()
+    shutil.rmtree(pasta, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
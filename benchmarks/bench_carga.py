@@ -0,0 +1,75 @@
+"""
+Benchmark da carga em database/insert_data.py (sobre o SQLite local)
+Compara o insert_data_batch original (iterrows + executemany de 1.000 linhas com
+commit por lote) com a carga em massa (parâmetros por coluna, staging + upsert
+set-based e partições em paralelo).
+
+Uso: python benchmarks/bench_carga.py [linhas] [workers]   (padrão: 1.000.000 e 4)
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'database'))
+
+from insert_data import bulk_load, connect_to_sqlite
+from dados_sinteticos import gerar_dataframe
+
+def insert_original(conn, df, batch_size=1000):
+    """Implementação anterior de insert_data_batch (referência)."""
+    cursor = conn.cursor()
+    insert_query = """
+    INSERT INTO supply_chain.produtos_estoque (
+        codigo, abc, tipo, saldo_manut, provid_compras, recebimento_esperado,
+        transito_manut, stage_manut, recepcao_manut, pendente_ri,
+        pecas_teste_kit, pecas_teste, fornecedor_reparo, laboratorio,
+        wr, wrcr, stage_wr, cmm, coef_perda
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    inteiras = ['tipo', 'saldo_manut', 'provid_compras', 'recebimento_esperado', 'transito_manut',
+                'stage_manut', 'recepcao_manut', 'pendente_ri', 'pecas_teste_kit', 'pecas_teste',
+                'fornecedor_reparo', 'laboratorio', 'wr', 'wrcr', 'stage_wr']
+    for i in range(0, len(df), batch_size):
+        batch_data = []
+        for _, row in df.iloc[i:i + batch_size].iterrows():
+            batch_data.append((row['codigo'], row['abc'], *[int(row[c]) for c in inteiras],
+                               float(row['cmm']), float(row['coef_perda'])))
+        cursor.executemany(insert_query, batch_data)
+        conn.commit()
+    cursor.close()
+    return len(df)
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    pasta = tempfile.mkdtemp(prefix='bench_carga_')
+    df = gerar_dataframe(linhas)
+
+    print("=" * 70)
+    print(f"⏱️  CARGA NO SQLITE LOCAL - {linhas} linhas")
+    print("=" * 70)
+
+    conn = connect_to_sqlite(os.path.join(pasta, 'original.db'))
+    inicio = time.perf_counter()
+    insert_original(conn, df)
+    t_original = time.perf_counter() - inicio
+    conn.close()
+
+    caminho = os.path.join(pasta, 'massa.db')
+    massa = bulk_load(df, lambda: connect_to_sqlite(caminho), workers=workers)
+    reexecucao = bulk_load(df, lambda: connect_to_sqlite(caminho), workers=workers)
+
+    print()
+    for nome, segundos in [
+        ("Original (iterrows, commit a cada 1.000)", t_original),
+        (f"Carga em massa ({workers} partições)", massa['seconds']),
+        ("Reexecução (upsert sobre a tabela cheia)", reexecucao['seconds']),
+    ]:
+        print(f"   {nome:<42}{segundos:8.2f} s {linhas / segundos:>12,.0f} linhas/s")
+    print(f"   Speedup: {t_original / massa['seconds']:.1f}x")
+
+if __name__ == "__main__":
+    main()
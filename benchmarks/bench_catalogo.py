@@ -0,0 +1,121 @@
+"""
+Benchmark do catálogo colunar (catalogo.py / stock.py)
+Compara a lista de dicts carregada do database.json (um dict Python por SKU)
+com o catálogo colunar: memória por SKU e tempo das varreduras de sugestão de
+compra e de alertas (laço por dict, como no stock.py original, vs. colunas).
+
+Uso: python benchmarks/bench_catalogo.py [skus]   (padrão: 1.000.000)
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np
+
+from catalogo import Catalogo
+from dados_sinteticos import gerar_dataframe
+
+def gerar_json(skus):
+    """database.json sintético no formato do convert_csv_to_json (id + colunas do CSV)."""
+    df = gerar_dataframe(skus)
+    registros = df.to_dict('records')
+    return json.dumps({"products": [{"id": i, **{k: (v.item() if isinstance(v, np.generic) else v)
+                                                    for k, v in r.items()}}
+                                    for i, r in enumerate(registros, start=1)], "users": [], "sales": []})
+
+def medir_memoria(funcao, *args):
+    """(resultado, bytes alocados que continuam vivos, segundos)."""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    segundos = time.perf_counter() - inicio
+    vivos, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, vivos, segundos
+
+def medir(funcao, *args, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return resultado, melhor
+
+def sugestoes_dicts(produtos):
+    """Varredura do stock.py original (referência)."""
+    sugestoes = []
+    for p in produtos:
+        necessidade = (p.get('cmm', 0) * 1.5) - p.get('saldo_manut', 0)
+        if necessidade > 0:
+            sugestoes.append({"codigo": p.get('codigo'), "estoque_atual": p.get('saldo_manut'),
+                              "cmm": p.get('cmm'), "quantidade_a_comprar": round(necessidade)})
+    return sugestoes
+
+def alertas_dicts(produtos):
+    return [p for p in produtos if p.get('saldo_manut', 0) == 0 and p.get('cmm', 0) > 1]
+
+def criticos_dicts(produtos):
+    return sum(1 for p in produtos if p.get('saldo_manut', 0) == 0 and p.get('cmm', 0) > 1)
+
+def criticos_colunas(catalogo):
+    return int(((catalogo.colunas['saldo_manut'] == 0) & (catalogo.decimal('cmm') > 1)).sum())
+
+def sugestoes_colunas(catalogo):
+    """Mesma varredura do stock.py atual, sobre as colunas."""
+    cmm = catalogo.decimal('cmm')
+    saldo = catalogo.colunas['saldo_manut']
+    necessidade = cmm * 1.5 - saldo
+    linhas = np.flatnonzero(necessidade > 0)
+    return [{"codigo": codigo, "estoque_atual": estoque, "cmm": valor_cmm, "quantidade_a_comprar": round(n)}
+            for codigo, estoque, valor_cmm, n in zip(catalogo.valores('codigo', linhas), saldo[linhas].tolist(),
+                                                     cmm[linhas].tolist(), necessidade[linhas].tolist())]
+
+def alertas_colunas(catalogo):
+    criticos = (catalogo.colunas['saldo_manut'] == 0) & (catalogo.decimal('cmm') > 1)
+    return catalogo.para_dicts(catalogo.posicoes_regulares()[criticos])
+
+def main():
+    skus = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    conteudo = gerar_json(skus)
+
+    print("=" * 78)
+    print(f"📦 CATÁLOGO DE PRODUTOS - {skus} SKUs")
+    print("=" * 78)
+
+    produtos, mem_dicts, t_carga = medir_memoria(lambda: json.loads(conteudo)["products"])
+    catalogo, mem_colunas, t_catalogo = medir_memoria(Catalogo, produtos)
+    assert catalogo.irregulares() == {}
+
+    # Tempos de montagem medidos com o tracemalloc ativo (mais lentos que o normal)
+    print(f"   {'':<28}{'Memória (MB)':>14}{'Bytes/SKU':>12}{'Montagem (s)':>14}")
+    print(f"   {'Lista de dicts (json)':<28}{mem_dicts / 2**20:>14.1f}{mem_dicts / skus:>12.0f}{t_carga:>14.2f}")
+    print(f"   {'Catálogo colunar':<28}{mem_colunas / 2**20:>14.1f}{mem_colunas / skus:>12.0f}{t_catalogo:>14.2f}")
+    print(f"   (nbytes das colunas: {catalogo.nbytes / skus:.0f} bytes/SKU; "
+          f"redução: {mem_dicts / mem_colunas:.1f}x)\n")
+
+    print(f"   {'Varredura':<28}{'Dicts (s)':>12}{'Colunas (s)':>13}{'Speedup':>10}{'Itens':>9}")
+    for nome, funcao_dicts, funcao_colunas in [
+        ("Sugestão de compra", sugestoes_dicts, sugestoes_colunas),
+        ("Alertas de estoque", alertas_dicts, alertas_colunas),
+        ("Contagem de críticos", criticos_dicts, criticos_colunas),
+    ]:
+        esperado, t_dicts = medir(funcao_dicts, produtos)
+        obtido, t_colunas = medir(funcao_colunas, catalogo)
+        assert obtido == esperado, nome
+        itens = obtido if isinstance(obtido, int) else len(obtido)
+        print(f"   {nome:<28}{t_dicts:>12.3f}{t_colunas:>13.3f}{t_dicts / t_colunas:>9.1f}x{itens:>9}")
+
+    linha = catalogo[skus // 2]
+    print(f"\n   Visão de linha: {linha['codigo']} cmm={linha['cmm']} saldo={linha['saldo_manut']} "
+          f"(dict(linha) == original: {dict(linha) == produtos[skus // 2]})")
+
+if __name__ == "__main__":
+    main()
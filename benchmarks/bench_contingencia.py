@@ -0,0 +1,69 @@
+"""
+Benchmark da percepção de contingência do Agente de IA
+Compara a leitura original (read_csv + apply por linha a cada chamada) com a
+camada de dados em cache de contingencia_dados.py.
+
+Uso: python benchmarks/bench_contingencia.py [linhas]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import contingencia_dados
+from dados_sinteticos import gerar_csv
+
+def sugestoes_original(csv_path, max_criticos=5):
+    """Implementação anterior de obter_sugestoes_compra (referência)."""
+    df = pd.read_csv(csv_path, delimiter=';')
+    df['quantidade_a_comprar'] = ((df['cmm'] * 2) - df['saldo_manut'] - df['provid_compras']).clip(lower=0)
+    criticos = df[df['quantidade_a_comprar'] > 0].copy()
+    dados_sp = pd.DataFrame({
+        'codigo': criticos['codigo'],
+        'abc': criticos['abc'],
+        'estoque_atual': criticos['saldo_manut'],
+        'estoque_maximo': criticos.apply(lambda row: 500 if row['cmm'] > 0.8 else 100, axis=1),
+        'cmm': criticos['cmm'],
+        'compras_em_andamento': criticos['provid_compras'],
+        'quantidade_a_comprar': criticos['quantidade_a_comprar'],
+    })
+    return dados_sp.nlargest(max_criticos, 'cmm').to_dict('records')
+
+def medir(funcao, *args, repeticoes=1):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    pasta = tempfile.mkdtemp(prefix='bench_contingencia_')
+    csv_path = gerar_csv(os.path.join(pasta, 'dados.csv'), linhas)
+    contingencia_dados.CACHE_DIR = os.path.join(pasta, 'cache')
+
+    print("=" * 70)
+    print(f"⏱️  PERCEPÇÃO DE CONTINGÊNCIA - {linhas} linhas")
+    print("=" * 70)
+
+    t_original, esperado = medir(sugestoes_original, csv_path)
+    t_frio, obtido = medir(contingencia_dados.sugestoes_compra, csv_path)
+    contingencia_dados._memoria.clear()
+    t_morno, _ = medir(contingencia_dados.sugestoes_compra, csv_path)
+    t_quente, _ = medir(contingencia_dados.sugestoes_compra, csv_path, repeticoes=20)
+
+    print(f"   Original (read_csv + apply):      {t_original * 1000:10.1f} ms")
+    print(f"   Cache frio (parse + grava .npz):  {t_frio * 1000:10.1f} ms")
+    print(f"   Cache em disco (.npz):            {t_morno * 1000:10.1f} ms")
+    print(f"   Cache em memória:                 {t_quente * 1000:10.1f} ms")
+    print(f"   Speedup (memória vs original):    {t_original / t_quente:10.0f}x")
+    print(f"   Resultados idênticos: {'✅' if obtido == esperado else '❌'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark do conversor CSV -> JSON
+Compara o convert_csv_to_json.py original (pandas + to_dict + indent=4) com o
+conversor em streaming, medindo tempo, linhas/s, pico de memória e tamanho da saída.
+Cada medição roda em um processo separado para o pico de memória ser isolado.
+
+Uso: python benchmarks/bench_conversao.py [linhas] [linhas_original]
+     (padrão: 5.000.000 no streaming e 1.000.000 no original)
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from dados_sinteticos import gerar_csv
+
+def converter_original(csv_path, saida):
+    """Implementação anterior de convert_csv_to_json.py (referência)."""
+    import pandas as pd
+    df_products = pd.read_csv(csv_path, delimiter=';')
+    df_products.reset_index(inplace=True)
+    df_products.rename(columns={'index': 'id'}, inplace=True)
+    df_products['id'] = df_products['id'] + 1
+    products_list = df_products.to_dict(orient='records')
+    db_data = {"products": products_list, "users": [], "sales": []}
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(db_data, f, ensure_ascii=False, indent=4)
+    return len(products_list)
+
+def pico_memoria_mb():
+    """Pico de memória residente do processo (VmHWM; não herda o pico do processo pai)."""
+    with open('/proc/self/status') as f:
+        for linha in f:
+            if linha.startswith('VmHWM:'):
+                return int(linha.split()[1]) / 1024
+    return float('nan')
+
+def _medir_no_processo(modo, csv_path, saida):
+    """Executado no processo filho: converte e imprime as métricas em JSON."""
+    inicio = time.perf_counter()
+    if modo == 'original':
+        total = converter_original(csv_path, saida)
+    else:
+        from convert_csv_to_json import converter
+        total = converter(csv_path, saida, modo)
+    duracao = time.perf_counter() - inicio
+    print(json.dumps({
+        'linhas': total,
+        'segundos': duracao,
+        'pico_mb': pico_memoria_mb(),
+        'saida_mb': os.path.getsize(saida) / 2**20,
+    }))
+
+def medir(modo, csv_path, saida):
+    processo = subprocess.run([sys.executable, __file__, '--medir', modo, csv_path, saida],
+                              capture_output=True, text=True, check=True)
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+def imprimir(nome, m):
+    print(f"   {nome:<22}{m['linhas']:>11}{m['segundos']:>10.1f}{m['linhas'] / m['segundos']:>14,.0f}"
+          f"{m['pico_mb']:>11.0f}{m['saida_mb']:>11.0f}")
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    linhas_original = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    pasta = tempfile.mkdtemp(prefix='bench_conversao_')
+    csv_grande = gerar_csv(os.path.join(pasta, 'dados.csv'), linhas)
+    csv_original = gerar_csv(os.path.join(pasta, 'dados_original.csv'), linhas_original)
+
+    print("=" * 80)
+    print("⏱️  CONVERSÃO CSV -> JSON")
+    print("=" * 80)
+    print(f"   {'':<22}{'Linhas':>11}{'Tempo (s)':>10}{'Linhas/s':>14}{'Pico (MB)':>11}{'Saída (MB)':>11}")
+
+    imprimir('Original (indent=4)', medir('original', csv_original, os.path.join(pasta, 'original.json')))
+    imprimir('Streaming JSON', medir('json', csv_original, os.path.join(pasta, 'pequeno.json')))
+    imprimir('Streaming JSON', medir('json', csv_grande, os.path.join(pasta, 'grande.json')))
+    imprimir('Streaming NDJSON', medir('ndjson', csv_grande, os.path.join(pasta, 'grande.ndjson')))
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == '--medir':
+        _medir_no_processo(*sys.argv[2:])
+    else:
+        main()
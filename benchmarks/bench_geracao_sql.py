@@ -0,0 +1,79 @@
+"""
+Benchmark do gerador de arquivos de carga (database/generate_inserts.py)
+Compara o script original (f-strings por linha dentro de iterrows, um único .sql)
+com a geração vetorizada em shards paralelos, nos formatos INSERT e bcp.
+
+Uso: python benchmarks/bench_geracao_sql.py [linhas] [shards]   (padrão: 500.000 e núcleos da CPU)
+"""
+
+import os
+import sys
+import glob
+import time
+import tempfile
+import contextlib
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'database'))
+
+import pandas as pd
+
+from generate_inserts import generate_insert_statements
+from dados_sinteticos import gerar_csv
+
+def gerar_original(csv_path, output_path):
+    """Laço principal do generate_insert_statements original (referência)."""
+    df = pd.read_csv(csv_path, delimiter=';')
+    inteiras = ['tipo', 'saldo_manut', 'provid_compras', 'recebimento_esperado', 'transito_manut',
+                'stage_manut', 'recepcao_manut', 'pendente_ri', 'pecas_teste_kit', 'pecas_teste',
+                'fornecedor_reparo', 'laboratorio', 'wr', 'wrcr', 'stage_wr']
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write("BEGIN TRANSACTION;\nGO\n\n")
+        for i in range(0, len(df), 1000):
+            f.write("INSERT INTO supply_chain.produtos_estoque\n    (...)\nVALUES\n")
+            values = []
+            for _, row in df.iloc[i:i + 1000].iterrows():
+                codigo = row['codigo'].replace("'", "''")
+                numeros = ", ".join(f"{int(row[c])}" for c in inteiras)
+                values.append(f"    ('{codigo}', '{row['abc']}', {numeros}, {row['cmm']}, {row['coef_perda']})")
+            f.write(",\n".join(values))
+            f.write(";\nGO\n\n")
+        f.write("COMMIT TRANSACTION;\nGO\n")
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        funcao(*args)
+    return time.perf_counter() - inicio
+
+def tamanho_mb(padrao):
+    return sum(os.path.getsize(p) for p in glob.glob(padrao)) / 2**20
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    shards = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    pasta = tempfile.mkdtemp(prefix='bench_geracao_sql_')
+    csv_path = gerar_csv(os.path.join(pasta, 'dados.csv'), linhas)
+
+    print("=" * 70)
+    print(f"⏱️  GERAÇÃO DE ARQUIVOS DE CARGA - {linhas} linhas, {shards} shard(s)")
+    print("=" * 70)
+
+    resultados = [
+        ("Original (iterrows, 1 arquivo)",
+         medir(gerar_original, csv_path, os.path.join(pasta, 'original.sql')),
+         tamanho_mb(os.path.join(pasta, 'original.sql'))),
+        ("INSERTs vetorizados em shards",
+         medir(generate_insert_statements, csv_path, os.path.join(pasta, 'insert.sql'), shards, 'sql'),
+         tamanho_mb(os.path.join(pasta, 'insert*.sql'))),
+        ("bcp (.dat + .fmt) em shards",
+         medir(generate_insert_statements, csv_path, os.path.join(pasta, 'carga.sql'), shards, 'bcp'),
+         tamanho_mb(os.path.join(pasta, 'carga*.*'))),
+    ]
+    t_original = resultados[0][1]
+    print(f"   {'':<34}{'Tempo (s)':>10}{'Saída (MB)':>12}{'Speedup':>10}")
+    for nome, segundos, mb in resultados:
+        print(f"   {nome:<34}{segundos:>10.2f}{mb:>12.1f}{t_original / segundos:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
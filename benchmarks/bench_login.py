@@ -0,0 +1,78 @@
+"""
+Benchmark de logins (verificação bcrypt)
+Compara bcrypt.checkpw na thread da requisição (como era em verificar_senha)
+com o serviço de senhas (pool de processos + fila limitada), com 1, 4 e 16
+clientes simultâneos. Mede logins/s, p50/p99 de latência e rejeições por
+backpressure/timeout.
+
+Uso: python benchmarks/bench_login.py [logins_por_cliente] [rounds]   (padrão: 8 e 12)
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+
+from servico_senhas import ServicoSenhas
+from telemetria_agente import percentil
+
+SENHA = "Senha@123"
+
+def rodada(verificar, clientes, logins_por_cliente, hash_armazenado):
+    latencias, falhas = [], []
+    lock = threading.Lock()
+
+    def cliente():
+        for _ in range(logins_por_cliente):
+            inicio = time.perf_counter()
+            try:
+                ok = verificar(SENHA, hash_armazenado)
+                assert ok
+            except Exception as e:
+                with lock:
+                    falhas.append(type(e).__name__)
+                continue
+            with lock:
+                latencias.append((time.perf_counter() - inicio) * 1000)
+
+    threads = [threading.Thread(target=cliente) for _ in range(clientes)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracao = time.perf_counter() - inicio
+    return {
+        'logins_s': len(latencias) / duracao,
+        'p50_ms': percentil(latencias, 50),
+        'p99_ms': percentil(latencias, 99),
+        'falhas': len(falhas),
+    }
+
+def main():
+    logins_por_cliente = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    hash_armazenado = bcrypt.hashpw(SENHA.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+    inline = lambda senha, h: bcrypt.checkpw(senha.encode('utf-8'), h.encode('utf-8'))
+    servico = ServicoSenhas()
+    servico.verificar(SENHA, hash_armazenado)  # aquece o pool (spawn dos processos)
+
+    print("=" * 78)
+    print(f"⏱️  LOGINS - bcrypt cost {rounds}, {logins_por_cliente} logins por cliente, "
+          f"{servico.processos} processo(s), fila {servico.fila_max}")
+    print("=" * 78)
+    print(f"   {'Modo':<22}{'Clientes':>9}{'Logins/s':>11}{'p50 (ms)':>11}{'p99 (ms)':>11}{'Rejeitados':>12}")
+    for clientes in (1, 4, 16):
+        for nome, verificar in (("Na thread (original)", inline), ("Serviço de senhas", servico.verificar)):
+            r = rodada(verificar, clientes, logins_por_cliente, hash_armazenado)
+            print(f"   {nome:<22}{clientes:>9}{r['logins_s']:>11.1f}{r['p50_ms']:>11.0f}{r['p99_ms']:>11.0f}{r['falhas']:>12}")
+    print(f"\n   Métricas do serviço: {servico.metricas()}")
+    servico.encerrar()
+
+if __name__ == "__main__":
+    main()
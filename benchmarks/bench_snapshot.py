@@ -0,0 +1,144 @@
+"""
+Benchmark do snapshot compartilhado do catálogo (snapshot_catalogo.py)
+Sobe N processos worker ao mesmo tempo, cada um com o catálogo de um
+database.json sintético, de dois jeitos:
+
+    privado    cada worker lê o JSON e monta o próprio Catalogo
+    snapshot   cada worker mapeia a versão publicada (sem cópia)
+
+e soma a memória de fato usada (PSS, /proc/<pid>/smaps_rollup: páginas
+compartilhadas divididas entre os processos que as usam), descontando a de
+workers com um catálogo vazio (interpretador + NumPy/pandas). Também mede o
+custo de publicar uma versão nova e de um leitor passar a usá-la.
+
+Uso: python benchmarks/bench_snapshot.py [skus] [workers]   (padrão: 1.000.000 e 4; só Linux)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from bench_catalogo import gerar_json
+
+def memoria_de(pid):
+    """(rss, pss) do processo em kB."""
+    valores = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for linha in f:
+            campo, _, resto = linha.partition(':')
+            if campo in ('Rss', 'Pss'):
+                valores[campo] = int(resto.split()[0])
+    return valores['Rss'], valores['Pss']
+
+def tamanho_snapshot(pasta_snapshot):
+    from snapshot_catalogo import versao_publicada
+    versao = os.path.join(pasta_snapshot, versao_publicada(pasta_snapshot))
+    return sum(os.path.getsize(os.path.join(versao, nome)) for nome in os.listdir(versao))
+
+def worker(modo, caminho_db, pasta_snapshot):
+    """Carrega o catálogo, toca todas as colunas e fica vivo até o processo principal medir a memória."""
+    import gc
+    from catalogo import Catalogo
+    from snapshot_catalogo import LeitorSnapshot
+
+    inicio = time.perf_counter()
+    if modo == 'base':
+        catalogo = Catalogo([])
+    elif modo == 'privado':
+        with open(caminho_db, encoding='utf-8') as f:
+            catalogo = Catalogo(json.load(f)['products'])
+    else:
+        catalogo = LeitorSnapshot(caminho_db, pasta_snapshot).catalogo(lambda: [])
+    carga = time.perf_counter() - inicio
+    gc.collect()
+
+    inicio = time.perf_counter()
+    for coluna in catalogo.colunas.values():
+        int(coluna.sum())
+    criticos = int(((catalogo.colunas['saldo_manut'] == 0) & (catalogo.decimal('cmm') > 1)).sum())
+    catalogo.por_id(len(catalogo) // 2)
+    catalogo.para_dicts(range(0, len(catalogo), 1000))
+    varredura = time.perf_counter() - inicio
+
+    print(json.dumps({'carga': carga, 'varredura': varredura, 'criticos': criticos}), flush=True)
+    sys.stdin.readline()  # Mantém o processo vivo até todos medirem
+
+def rodar_workers(modo, workers, caminho_db, pasta_snapshot):
+    processos = [subprocess.Popen([sys.executable, os.path.abspath(__file__), '--worker', modo, caminho_db,
+                                   pasta_snapshot], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                 for _ in range(workers)]
+    # Todos vivos ao mesmo tempo: o PSS divide as páginas do snapshot entre eles
+    resultados = [json.loads(p.stdout.readline()) for p in processos]
+    resultados = [dict(r, **dict(zip(('rss', 'pss'), memoria_de(p.pid)))) for r, p in zip(resultados, processos)]
+    for p in processos:
+        p.communicate('\n')
+    return resultados
+
+def main():
+    from snapshot_catalogo import LeitorSnapshot
+
+    skus = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    pasta = tempfile.mkdtemp(prefix='bench_snapshot_')
+    caminho_db = os.path.join(pasta, 'database.json')
+    pasta_snapshot = os.path.join(pasta, 'catalogo')
+    with open(caminho_db, 'w', encoding='utf-8') as f:
+        f.write(gerar_json(skus))
+
+    # Publicação da primeira versão (o que o primeiro worker faria)
+    leitor = LeitorSnapshot(caminho_db, pasta_snapshot)
+    inicio = time.perf_counter()
+    with open(caminho_db, encoding='utf-8') as f:
+        produtos = json.load(f)['products']
+    leitor.catalogo(lambda: produtos)
+    t_publicacao = time.perf_counter() - inicio
+
+    print("=" * 78)
+    print(f"🧠 CATÁLOGO EM {workers} WORKERS - {skus} SKUs")
+    print("=" * 78)
+    base = rodar_workers('base', workers, caminho_db, pasta_snapshot)
+    rss_base = sum(r['rss'] for r in base) / 1024
+    pss_base = sum(r['pss'] for r in base) / 1024
+    print(f"   Base ({workers} workers sem catálogo): RSS {rss_base:.1f} MB, PSS {pss_base:.1f} MB\n")
+    print(f"   {'Modo':<12}{'Carga/worker (s)':>18}{'Varredura (ms)':>16}{'RSS catálogo':>15}{'PSS catálogo':>15}")
+    totais = {}
+    for modo in ('privado', 'snapshot'):
+        resultados = rodar_workers(modo, workers, caminho_db, pasta_snapshot)
+        assert len({r['criticos'] for r in resultados}) == 1
+        carga = sum(r['carga'] for r in resultados) / workers
+        varredura = sum(r['varredura'] for r in resultados) / workers * 1000
+        rss = sum(r['rss'] for r in resultados) / 1024 - rss_base
+        pss = totais[modo] = sum(r['pss'] for r in resultados) / 1024 - pss_base
+        print(f"   {modo:<12}{carga:>18.3f}{varredura:>16.1f}{rss:>12.1f} MB{pss:>12.1f} MB")
+    print(f"\n   Memória do catálogo (PSS) com {workers} workers: {totais['privado'] / totais['snapshot']:.1f}x menor "
+          f"com o snapshot; uma cópia mapeada ocupa {tamanho_snapshot(pasta_snapshot) / 2**20:.1f} MB")
+
+    # Escrita: publica uma versão nova; um leitor já aberto a enxerga na próxima chamada
+    produtos[0]['saldo_manut'] += 1
+    with open(caminho_db, 'w', encoding='utf-8') as f:
+        json.dump({"products": produtos, "users": [], "sales": []}, f)
+    escritor = LeitorSnapshot(caminho_db, pasta_snapshot)
+    inicio = time.perf_counter()
+    escritor.publicar_atual(produtos)
+    t_nova_versao = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    atualizado = leitor.catalogo(lambda: [])
+    t_troca = time.perf_counter() - inicio
+    assert atualizado[0]['saldo_manut'] == produtos[0]['saldo_manut']
+    print(f"\n   Primeira publicação (ler JSON + gerar + gravar): {t_publicacao:.2f}s")
+    print(f"   Nova versão após escrita (gerar + gravar + trocar ATUAL): {t_nova_versao:.2f}s")
+    print(f"   Leitor passando para a nova versão (stat + mmap): {t_troca * 1000:.1f}ms")
+    shutil.rmtree(pasta, ignore_errors=True)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        worker(*sys.argv[2:5])
+    else:
+        main()
@@ -0,0 +1,114 @@
+"""
+Benchmark da ingestão de vendas em lote (vendas_lote.py / sales.py)
+Sobre um SQLite local no papel do Azure SQL (tabela supply_chain.vendas), compara
+o caminho original de service_create_sale (strptime + um INSERT com commit por
+venda) com a validação por coluna + executemany em transações de 10.000 linhas.
+Também mede o serviço (sales.py) sobre o mesmo SQLite: service_create_sale com
+uma transação por venda e service_create_sales_bulk, além da consulta por
+período servida pelos agregados em memória.
+
+Uso: python benchmarks/bench_vendas_lote.py [vendas]   (padrão: 50.000)
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import date, datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import database
+import sales
+from vendas_lote import ler_vendas, validar_vendas, gravar_vendas_sql
+
+def gerar_csv(vendas, invalidas=0.01, semente=42):
+    """Exportação de PDV sintética com ~1% de linhas inválidas."""
+    aleatorio = random.Random(semente)
+    inicio = date(2024, 1, 1)
+    linhas = ["nome_venda;valor_venda;data_venda"]
+    for i in range(vendas):
+        data_venda = (inicio + timedelta(days=aleatorio.randrange(730))).strftime('%d/%m/%Y')
+        valor = f"{aleatorio.uniform(5, 5000):.2f}"
+        if aleatorio.random() < invalidas:
+            data_venda, valor = aleatorio.choice([('31/02/2025', valor), (data_venda, 'abc'), ('2025-01-01', '-3')])
+        linhas.append(f"Venda {i};{valor};{data_venda}")
+    return "\n".join(linhas) + "\n"
+
+def conectar_sqlite(caminho):
+    conn = sqlite3.connect(':memory:')
+    conn.execute(f"ATTACH DATABASE '{caminho}' AS supply_chain")
+    conn.execute("CREATE TABLE IF NOT EXISTS supply_chain.vendas "
+                 "(id INTEGER PRIMARY KEY, nome_venda TEXT, valor_venda REAL, data_venda TEXT, codigo TEXT, quantidade REAL)")
+    return conn
+
+def ingestao_original(conn, conteudo):
+    """Uma chamada de service_create_sale (versão SQL) por linha do arquivo (referência)."""
+    inseridas = 0
+    for linha in conteudo.splitlines()[1:]:
+        nome, valor, data_venda = linha.split(';')
+        try:
+            datetime.strptime(data_venda, "%d/%m/%Y")
+            valor = float(valor)
+        except ValueError:
+            continue
+        cursor = conn.cursor()
+        cursor.execute('INSERT INTO supply_chain.vendas (nome_venda, valor_venda, data_venda) VALUES (?, ?, ?)',
+                       (nome, valor, data_venda))
+        conn.commit()
+        cursor.close()
+        inseridas += 1
+    return inseridas
+
+def ingestao_lote(conn, conteudo):
+    validas, erros = validar_vendas(ler_vendas(conteudo, 'vendas.csv'))
+    return gravar_vendas_sql(conn, validas), len(erros)
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+def main():
+    vendas = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    pasta = tempfile.mkdtemp(prefix='bench_vendas_lote_')
+    conteudo = gerar_csv(vendas)
+
+    print("=" * 78)
+    print(f"⏱️  INGESTÃO DE VENDAS - {vendas} vendas (~1% inválidas)")
+    print("=" * 78)
+
+    conn = conectar_sqlite(os.path.join(pasta, 'original.db'))
+    inseridas_original, t_original = medir(ingestao_original, conn, conteudo)
+    conn.close()
+
+    conn = conectar_sqlite(os.path.join(pasta, 'lote.db'))
+    (inseridas_lote, rejeitadas), t_lote = medir(ingestao_lote, conn, conteudo)
+    conn.close()
+
+    # Serviço de vendas (sales.py) sobre outro SQLite; o cmm dos produtos vai para um database.json temporário
+    database.DB_FILE = os.path.join(pasta, 'database.json')
+    sales.VENDAS_SQLITE = os.path.join(pasta, 'servico.db')
+    amostra = min(vendas, 1000)
+    linhas_amostra = [linha.split(';') for linha in conteudo.splitlines()[1:amostra + 1]]
+    _, t_servico_unitario = medir(lambda: [sales.service_create_sale(*campos) for campos in linhas_amostra])
+    relatorio, t_servico_lote = medir(sales.service_create_sales_bulk, conteudo, 'vendas.csv')
+    total, t_total = medir(sales.service_sales_total)
+
+    print(f"   {'':<46}{'Vendas':>9}{'Tempo (s)':>11}{'Vendas/s':>12}")
+    for nome, quantidade, segundos in [
+        ("SQL: uma venda por INSERT + commit (original)", inseridas_original, t_original),
+        ("SQL: validação por coluna + lotes de 10.000", inseridas_lote, t_lote),
+        ("sales.py: service_create_sale (1 transação)", len(linhas_amostra), t_servico_unitario),
+        ("sales.py: service_create_sales_bulk", relatorio['inseridas'], t_servico_lote),
+    ]:
+        print(f"   {nome:<46}{quantidade:>9}{segundos:>11.2f}{quantidade / segundos:>12,.0f}")
+    print(f"\n   Rejeitadas com número de linha: {rejeitadas} (ex.: {relatorio['erros'][0] if relatorio['erros'] else '-'})")
+    print(f"   Speedup SQL: {t_original / t_lote:.1f}x")
+    print(f"   Total do período pelos agregados: {total['quantidade']} vendas em {t_total * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Gerador de CSV sintético no formato de dados_hackathon.csv (para benchmarks)
+Distribuições aproximadas das do arquivo real: maioria de zeros, classe C dominante.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_INTEIRAS = [
+    'saldo_manut', 'provid_compras', 'recebimento_esperado', 'transito_manut',
+    'stage_manut', 'recepcao_manut', 'pendente_ri', 'pecas_teste_kit', 'pecas_teste',
+    'fornecedor_reparo', 'laboratorio', 'wr', 'wrcr', 'stage_wr',
+]
+
+# Fração de valores > 0 e média dos valores não nulos, por coluna
+PERFIL = {
+    'saldo_manut': (0.42, 108), 'provid_compras': (0.024, 650), 'recebimento_esperado': (0.0014, 80),
+    'transito_manut': (0.069, 32), 'stage_manut': (0.036, 10), 'recepcao_manut': (0.0064, 4),
+    'pendente_ri': (0.0116, 5), 'pecas_teste_kit': (0.164, 84), 'pecas_teste': (0.022, 15),
+    'fornecedor_reparo': (0.007, 22), 'laboratorio': (0.0112, 58), 'wr': (0.085, 80),
+    'wrcr': (0.0034, 97), 'stage_wr': (0.0082, 15),
+}
+
+def gerar_dataframe(linhas: int, semente: int = 42, inicio: int = 0) -> pd.DataFrame:
+    """Gera um DataFrame sintético com as 19 colunas do CSV de estoque."""
+    rng = np.random.default_rng(semente)
+    letras = rng.integers(65, 91, size=(linhas, 4), dtype=np.uint8).view('S4').ravel().astype(str)
+    numeros = np.char.zfill(np.arange(inicio, inicio + linhas).astype(str), 7)
+    dados = {
+        'codigo': np.char.add(np.char.add(letras, '-'), numeros),
+        'abc': rng.choice(np.array(['A', 'B', 'C']), size=linhas, p=[0.004, 0.0094, 0.9866]),
+        'tipo': rng.choice(np.array([10, 19, 20]), size=linhas, p=[0.1396, 0.0906, 0.7698]),
+    }
+    for coluna in COLUNAS_INTEIRAS:
+        fracao, media = PERFIL[coluna]
+        ativos = rng.random(linhas) < fracao
+        dados[coluna] = np.where(ativos, rng.geometric(1 / media, size=linhas), 0).astype(np.int64)
+    cmm_ativo = rng.random(linhas) < 0.1
+    dados['cmm'] = np.where(cmm_ativo, np.round(rng.exponential(42, size=linhas), 2), 0.0)
+    dados['coef_perda'] = np.where(rng.random(linhas) < 0.75, 1.0, np.round(rng.random(linhas), 8))
+    return pd.DataFrame(dados)
+
+def gerar_csv(caminho: str, linhas: int, semente: int = 42, bloco: int = 1_000_000) -> str:
+    """Grava o CSV sintético em blocos (memória limitada ao tamanho do bloco)."""
+    if os.path.exists(caminho):
+        return caminho
+    with open(caminho, 'w', encoding='utf-8', newline='') as f:
+        for i, inicio in enumerate(range(0, linhas, bloco)):
+            df = gerar_dataframe(min(bloco, linhas - inicio), semente + i, inicio)
+            df.to_csv(f, sep=';', index=False, header=(i == 0))
+    return caminho
+
+if __name__ == "__main__":
+    destino = sys.argv[1] if len(sys.argv) > 1 else 'dados_sinteticos.csv'
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    print(f"✅ CSV gerado: {gerar_csv(destino, total)} ({total} linhas)")
@@ -0,0 +1,111 @@
+"""
+Cache de Usuários - Nexum Supply Chain
+Cache read-through de perfis e funções de usuários (supply_chain.usuarios).
+
+- TTL por entrada e tamanho máximo com descarte LRU.
+- Cache negativo (com TTL próprio, mais curto) para ids inexistentes.
+- Invalidação explícita por id, chamada por criação, remoção, troca de senha
+  e inativação de usuários.
+- Métricas de acerto para medir quanto tráfego sai do banco (metricas()).
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+CACHE_USUARIOS_TTL = float(os.getenv('CACHE_USUARIOS_TTL', '60'))
+CACHE_USUARIOS_TTL_NEGATIVO = float(os.getenv('CACHE_USUARIOS_TTL_NEGATIVO', '10'))
+CACHE_USUARIOS_TAMANHO = int(os.getenv('CACHE_USUARIOS_TAMANHO', '10000'))
+
+_AUSENTE = object()  # Marca de cache negativo
+
+class CacheTTL:
+    """Cache LRU limitado com TTL, cache negativo e métricas."""
+
+    def __init__(self, ttl: float = CACHE_USUARIOS_TTL, ttl_negativo: float = CACHE_USUARIOS_TTL_NEGATIVO,
+                 tamanho_max: int = CACHE_USUARIOS_TAMANHO):
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self.tamanho_max = tamanho_max
+        self._entradas: "OrderedDict[Hashable, tuple]" = OrderedDict()  # chave -> (valor, expira_em)
+        self._lock = threading.Lock()
+        # Incrementada a cada invalidação: uma carga iniciada antes não é gravada (evita valor antigo)
+        self._geracao = 0
+        self._metricas = {'acertos': 0, 'acertos_negativos': 0, 'faltas': 0, 'expiradas': 0,
+                          'descartadas_lru': 0, 'invalidacoes': 0}
+
+    def obter(self, chave: Hashable, carregar: Callable[[Hashable], Optional[object]]):
+        """Retorna o valor em cache ou carrega com `carregar(chave)` (None = inexistente)."""
+        agora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                valor, expira_em = entrada
+                if expira_em > agora:
+                    self._entradas.move_to_end(chave)
+                    if valor is _AUSENTE:
+                        self._metricas['acertos_negativos'] += 1
+                        return None
+                    self._metricas['acertos'] += 1
+                    return valor
+                del self._entradas[chave]
+                self._metricas['expiradas'] += 1
+            self._metricas['faltas'] += 1
+            geracao = self._geracao
+
+        # Carga fora do lock: uma consulta lenta não trava os acertos das outras chaves
+        valor = carregar(chave)
+
+        with self._lock:
+            if geracao == self._geracao:
+                ttl = self.ttl if valor is not None else self.ttl_negativo
+                self._entradas[chave] = (_AUSENTE if valor is None else valor, time.monotonic() + ttl)
+                self._entradas.move_to_end(chave)
+                while len(self._entradas) > self.tamanho_max:
+                    self._entradas.popitem(last=False)
+                    self._metricas['descartadas_lru'] += 1
+        return valor
+
+    def invalidar(self, chave: Hashable):
+        with self._lock:
+            self._entradas.pop(chave, None)
+            self._geracao += 1
+            self._metricas['invalidacoes'] += 1
+
+    def invalidar_negativos(self):
+        """Descarta as entradas negativas (ex.: após criar um usuário, cujo id pode estar em cache como inexistente)."""
+        with self._lock:
+            for chave in [c for c, (valor, _) in self._entradas.items() if valor is _AUSENTE]:
+                del self._entradas[chave]
+            self._geracao += 1
+            self._metricas['invalidacoes'] += 1
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._geracao += 1
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            metricas = dict(self._metricas, tamanho=len(self._entradas), tamanho_max=self.tamanho_max)
+        consultas = metricas['acertos'] + metricas['acertos_negativos'] + metricas['faltas']
+        metricas['consultas'] = consultas
+        metricas['taxa_acerto'] = round((consultas - metricas['faltas']) / consultas, 4) if consultas else 0.0
+        return metricas
+
+# --- Cache compartilhado de perfis ---
+
+_perfis = CacheTTL()
+
+def cache_perfis() -> CacheTTL:
+    """Cache de perfis (id -> {'id', 'nome', 'email', 'funcao'}) do processo."""
+    return _perfis
+
+def invalidar_usuario(usuario_id: Optional[int] = None):
+    """Gancho de invalidação: um id específico, ou as entradas negativas quando None (usuário novo)."""
+    if usuario_id is None:
+        _perfis.invalidar_negativos()
+    else:
+        _perfis.invalidar(usuario_id)
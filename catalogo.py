@@ -0,0 +1,308 @@
+"""
+Catálogo Colunar - Nexum Supply Chain
+Representação compacta dos produtos do database.json: uma coluna NumPy por
+campo em vez de um dict Python por SKU.
+
+- codigo e abc codificados por dicionário (índice int32/int8 + vocabulário);
+  o vocabulário de codigo fica em um único buffer UTF-8 com offsets.
+- Colunas inteiras em int32 e decimais (cmm, coef_perda) em float32 quando o
+  valor decimal original é recuperável arredondando o float32 a poucas casas;
+  senão a coluna fica em float64 (nada é perdido).
+- LinhaProduto é uma visão preguiçosa (Mapping) de uma linha: para quem lê,
+  continua parecendo o dict de antes (p['cmm'], p.get('codigo'), dict(p)).
+- Produtos fora do formato padrão (campos extras ou faltando, nulos em colunas
+  inteiras...) ficam guardados como dicts, sem perda.
+- gravar()/mapear() persistem o catálogo como arquivos .npy que vários
+  processos mapeiam sem cópia (ver snapshot_catalogo.py).
+"""
+
+import os
+import json
+import hashlib
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from agregacao_estoque import COLUNAS_INTEIRAS, COLUNAS_DECIMAIS
+
+CHAVES_PADRAO = ['id', 'codigo', 'abc'] + COLUNAS_INTEIRAS + COLUNAS_DECIMAIS
+INT32_MIN, INT32_MAX = int(np.iinfo(np.int32).min), int(np.iinfo(np.int32).max)
+MAX_CASAS_FLOAT32 = 6
+
+class _Textos:
+    """Vocabulário de strings em um buffer UTF-8 contínuo + offsets (sem um objeto str por item)."""
+
+    __slots__ = ('buffer', 'offsets')
+
+    def __init__(self, buffer: np.ndarray, offsets: np.ndarray):
+        self.buffer = buffer
+        self.offsets = offsets
+
+    @classmethod
+    def de_valores(cls, valores) -> "_Textos":
+        codificados = [str(v).encode('utf-8') for v in valores]
+        buffer = np.frombuffer(b''.join(codificados), dtype=np.uint8)
+        offsets = np.zeros(len(codificados) + 1, dtype=np.int32 if len(buffer) <= INT32_MAX else np.int64)
+        np.cumsum([len(c) for c in codificados], out=offsets[1:])
+        return cls(buffer, offsets)
+
+    def __getitem__(self, i: int) -> str:
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return self.buffer.nbytes + self.offsets.nbytes
+
+_CHAVES_TUPLA = tuple(CHAVES_PADRAO)
+_CHAVES_INTEIRAS = ['id'] + COLUNAS_INTEIRAS
+
+def _regular(produto: Dict) -> bool:
+    """Produto no formato padrão, representável nas colunas tipadas."""
+    if tuple(produto) != _CHAVES_TUPLA:
+        return False
+    if type(produto['codigo']) is not str or type(produto['abc']) is not str:
+        return False
+    for chave in _CHAVES_INTEIRAS:
+        valor = produto[chave]
+        if type(valor) is not int or not INT32_MIN <= valor <= INT32_MAX:
+            return False
+    for chave in COLUNAS_DECIMAIS:
+        valor = produto[chave]
+        if valor is not None and type(valor) is not float:
+            return False
+    return True
+
+def _compactar_decimal(valores: np.ndarray):
+    """
+    (coluna, casas): float32 + número de casas que reconstrói exatamente os
+    valores originais, ou float64 e None se nenhuma precisão até
+    MAX_CASAS_FLOAT32 for exata.
+    """
+    reduzidos = valores.astype(np.float32)
+    lidos = reduzidos.astype(np.float64)
+    for casas in range(MAX_CASAS_FLOAT32 + 1):
+        if np.array_equal(np.round(lidos, casas), valores, equal_nan=True):
+            return reduzidos, casas
+    return valores, None
+
+class Catalogo:
+    """Produtos em colunas tipadas, com visões de linha preguiçosas."""
+
+    def __init__(self, produtos: List[Dict]):
+        regulares = []
+        self._irregulares: Dict[int, Dict] = {}
+        posicoes_regulares = []
+        for posicao, produto in enumerate(produtos):
+            if _regular(produto):
+                regulares.append(produto)
+                posicoes_regulares.append(posicao)
+            else:
+                self._irregulares[posicao] = produto
+        self._n = len(produtos)
+        # Linha do catálogo -> linha das colunas tipadas (-1 para irregulares)
+        self._linha_coluna = np.full(self._n, -1, dtype=np.int32)
+        self._posicoes = np.array(posicoes_regulares, dtype=np.int32)
+        self._linha_coluna[self._posicoes] = np.arange(len(self._posicoes), dtype=np.int32)
+
+        self.colunas: Dict[str, np.ndarray] = {}
+        for chave in _CHAVES_INTEIRAS:
+            self.colunas[chave] = np.fromiter((p[chave] for p in regulares), dtype=np.int32, count=len(regulares))
+        self._casas: Dict[str, Optional[int]] = {}
+        for chave in COLUNAS_DECIMAIS:
+            valores = np.fromiter((np.nan if p[chave] is None else p[chave] for p in regulares),
+                                  dtype=np.float64, count=len(regulares))
+            self.colunas[chave], self._casas[chave] = _compactar_decimal(valores)
+
+        codigos, vocabulario = pd.factorize(pd.Series([p['codigo'] for p in regulares], dtype=object))
+        self.colunas['codigo'] = codigos.astype(np.int32)
+        self.vocabulario_codigo = _Textos.de_valores(vocabulario)
+        abc, vocabulario_abc = pd.factorize(pd.Series([p['abc'] for p in regulares], dtype=object))
+        self.colunas['abc'] = abc.astype(np.int8 if len(vocabulario_abc) < 128 else np.int32)
+        self.vocabulario_abc = [str(v) for v in vocabulario_abc]
+
+        self._ordem_ids: Optional[np.ndarray] = None
+        self._ids_ordenados: Optional[np.ndarray] = None
+
+    # --- Acesso por linha (compatível com a lista de dicts) ---
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, posicao: int):
+        if posicao < 0:
+            posicao += self._n
+        if not 0 <= posicao < self._n:
+            raise IndexError(posicao)
+        irregular = self._irregulares.get(posicao)
+        return irregular if irregular is not None else LinhaProduto(self, int(self._linha_coluna[posicao]))
+
+    def __iter__(self) -> Iterator[Mapping]:
+        for posicao in range(self._n):
+            yield self[posicao]
+
+    def por_id(self, produto_id) -> Optional[Mapping]:
+        """Primeiro produto com o 'id' dado (busca binária sobre os ids ordenados, montados no primeiro uso)."""
+        self._indexar_ids()
+        candidatas = [posicao for posicao, p in self._irregulares.items() if p.get('id') == produto_id]
+        if isinstance(produto_id, int) and INT32_MIN <= produto_id <= INT32_MAX:
+            i = int(np.searchsorted(self._ids_ordenados, produto_id))
+            if i < len(self._ids_ordenados) and self._ids_ordenados[i] == produto_id:
+                candidatas.append(int(self._posicoes[self._ordem_ids[i]]))
+        return self[min(candidatas)] if candidatas else None
+
+    def _indexar_ids(self):
+        if self._ordem_ids is None:
+            self._ordem_ids = np.argsort(self.colunas['id'], kind='stable').astype(np.int32)
+        if self._ids_ordenados is None:
+            self._ids_ordenados = self.colunas['id'][self._ordem_ids]
+
+    # --- Persistência (snapshot mapeável em memória) ---
+
+    def impressao(self) -> str:
+        """Hash do conteúdo (colunas, vocabulários e irregulares): catálogos iguais têm a mesma impressão."""
+        h = hashlib.blake2b(digest_size=8)
+        for chave in sorted(self.colunas):
+            coluna = np.ascontiguousarray(self.colunas[chave])
+            h.update(f"{chave}:{coluna.dtype.str}:{len(coluna)};".encode())
+            h.update(memoryview(coluna).cast('B'))
+        for array in (self._linha_coluna, self.vocabulario_codigo.buffer, self.vocabulario_codigo.offsets):
+            h.update(memoryview(np.ascontiguousarray(array)).cast('B'))
+        h.update(json.dumps([self._n, self._casas, self.vocabulario_abc, sorted(self._irregulares.items())],
+                            sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    def gravar(self, pasta: str):
+        """
+        Grava o catálogo em `pasta`: um .npy por array (mapeável sem cópia) e
+        meta.json com vocabulário abc, casas decimais e produtos irregulares.
+        """
+        self._indexar_ids()
+        os.makedirs(pasta, exist_ok=True)
+        arrays = {f'coluna_{chave}': coluna for chave, coluna in self.colunas.items()}
+        arrays.update(linha_coluna=self._linha_coluna, posicoes=self._posicoes, ordem_ids=self._ordem_ids,
+                      ids_ordenados=self._ids_ordenados,
+                      codigo_buffer=self.vocabulario_codigo.buffer, codigo_offsets=self.vocabulario_codigo.offsets)
+        for nome, array in arrays.items():
+            np.save(os.path.join(pasta, f'{nome}.npy'), np.ascontiguousarray(array), allow_pickle=False)
+        meta = {
+            'n': self._n,
+            'colunas': list(self.colunas),
+            'casas': self._casas,
+            'vocabulario_abc': self.vocabulario_abc,
+            'irregulares': [[posicao, produto] for posicao, produto in self._irregulares.items()],
+        }
+        with open(os.path.join(pasta, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def mapear(cls, pasta: str) -> "Catalogo":
+        """Abre um catálogo gravado por gravar(): arrays mapeados (somente leitura), sem cópia."""
+        with open(os.path.join(pasta, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        def carregar(nome):
+            return np.load(os.path.join(pasta, f'{nome}.npy'), mmap_mode='r', allow_pickle=False)
+
+        catalogo = cls.__new__(cls)
+        catalogo._n = meta['n']
+        catalogo.colunas = {chave: carregar(f'coluna_{chave}') for chave in meta['colunas']}
+        catalogo._casas = meta['casas']
+        catalogo.vocabulario_abc = meta['vocabulario_abc']
+        catalogo.vocabulario_codigo = _Textos(carregar('codigo_buffer'), carregar('codigo_offsets'))
+        catalogo._irregulares = {posicao: produto for posicao, produto in meta['irregulares']}
+        catalogo._linha_coluna = carregar('linha_coluna')
+        catalogo._posicoes = carregar('posicoes')
+        catalogo._ordem_ids = carregar('ordem_ids')
+        catalogo._ids_ordenados = carregar('ids_ordenados')
+        return catalogo
+
+    # --- Acesso colunar (varreduras vetorizadas) ---
+
+    def posicoes_regulares(self) -> np.ndarray:
+        """Posição no catálogo de cada linha das colunas tipadas."""
+        return self._posicoes
+
+    def irregulares(self) -> Dict[int, Dict]:
+        """{posição: dict} dos produtos guardados fora das colunas."""
+        return self._irregulares
+
+    def decimal(self, chave: str) -> np.ndarray:
+        """Coluna decimal em float64 com os valores originais (NaN onde era null)."""
+        valores = self.colunas[chave].astype(np.float64)
+        casas = self._casas[chave]
+        return valores if casas is None else np.round(valores, casas)
+
+    def codigo(self, linha_coluna: int) -> str:
+        return self.vocabulario_codigo[self.colunas['codigo'][linha_coluna]]
+
+    def valores(self, chave: str, linhas: np.ndarray) -> List:
+        """Valores Python da coluna nas linhas dadas (linhas das colunas tipadas), como na visão de linha."""
+        if chave == 'codigo':
+            return [self.vocabulario_codigo[i] for i in self.colunas['codigo'][linhas].tolist()]
+        if chave == 'abc':
+            return [self.vocabulario_abc[i] for i in self.colunas['abc'][linhas].tolist()]
+        if chave in COLUNAS_DECIMAIS:
+            decimais = self.colunas[chave][linhas].astype(np.float64)
+            if self._casas[chave] is not None:
+                decimais = np.round(decimais, self._casas[chave])
+            return [None if v != v else v for v in decimais.tolist()]
+        return self.colunas[chave][linhas].tolist()
+
+    def para_dicts(self, posicoes) -> List[Dict]:
+        """Produtos nas posições dadas como dicts, montados coluna a coluna."""
+        posicoes = np.asarray(posicoes, dtype=np.int64)
+        linhas = self._linha_coluna[posicoes]
+        regulares = linhas >= 0
+        colunas = [self.valores(chave, linhas[regulares]) for chave in CHAVES_PADRAO]
+        montados = iter(dict(zip(CHAVES_PADRAO, valores)) for valores in zip(*colunas))
+        return [next(montados) if regular else dict(self._irregulares[posicao])
+                for posicao, regular in zip(posicoes.tolist(), regulares.tolist())]
+
+    @property
+    def nbytes(self) -> int:
+        """Memória das colunas e vocabulários (sem os produtos irregulares)."""
+        return (sum(c.nbytes for c in self.colunas.values()) + self._linha_coluna.nbytes + self._posicoes.nbytes
+                + self.vocabulario_codigo.nbytes + sum(len(v) for v in self.vocabulario_abc))
+
+class LinhaProduto(Mapping):
+    """Visão de um produto do catálogo: lê as colunas sob demanda."""
+
+    __slots__ = ('_catalogo', '_linha')
+
+    def __init__(self, catalogo: Catalogo, linha: int):
+        self._catalogo = catalogo
+        self._linha = linha
+
+    def __getitem__(self, chave: str):
+        catalogo = self._catalogo
+        if chave == 'codigo':
+            return catalogo.codigo(self._linha)
+        if chave == 'abc':
+            return catalogo.vocabulario_abc[catalogo.colunas['abc'][self._linha]]
+        if chave in COLUNAS_DECIMAIS:
+            valor = float(catalogo.colunas[chave][self._linha])
+            if valor != valor:
+                return None
+            casas = catalogo._casas[chave]
+            return valor if casas is None else float(np.round(valor, casas))
+        coluna = catalogo.colunas.get(chave)
+        if coluna is None:
+            raise KeyError(chave)
+        return int(coluna[self._linha])
+
+    def __iter__(self):
+        return iter(CHAVES_PADRAO)
+
+    def __len__(self):
+        return len(CHAVES_PADRAO)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def para_dict(self) -> Dict:
+        return dict(self)
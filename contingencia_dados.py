@@ -0,0 +1,114 @@
+"""
+Camada de Dados de Contingência - Nexum Supply Chain
+Leitura rápida do CSV para o Agente de IA quando o serviço real não está disponível.
+
+O CSV é lido uma única vez com dtypes explícitos e apenas as colunas necessárias;
+as colunas já convertidas ficam em cache (.npz) e em memória, invalidadas pela
+assinatura do arquivo (mtime + tamanho).
+"""
+
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from agregacao_estoque import indices_maiores
+
+CSV_PATH = "dados_hackathon.csv"
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'contingencia')
+
+# Apenas as colunas usadas pelo Agente, com tipos explícitos (sem inferência)
+COLUNAS_DTYPES = {
+    'codigo': str,
+    'abc': str,
+    'saldo_manut': np.int64,
+    'provid_compras': np.int64,
+    'cmm': np.float64,
+}
+
+# estoque_maximo não existe no CSV: valor alto para itens de CMM alto (regra INVESTIGAR do prompt)
+CMM_ALTO = 0.8
+ESTOQUE_MAXIMO_ALTO = 500
+ESTOQUE_MAXIMO_PADRAO = 100
+
+# Cache em memória: caminho absoluto -> (assinatura, colunas)
+_memoria: Dict[str, Tuple[Tuple[int, int], Dict[str, np.ndarray]]] = {}
+
+def _assinatura(csv_path: str) -> Tuple[int, int]:
+    info = os.stat(csv_path)
+    return info.st_mtime_ns, info.st_size
+
+def _caminho_cache(csv_path: str) -> str:
+    nome = os.path.basename(csv_path)
+    return os.path.join(CACHE_DIR, f"{nome}.npz")
+
+def _ler_csv(csv_path: str) -> Dict[str, np.ndarray]:
+    df = pd.read_csv(
+        csv_path,
+        delimiter=';',
+        usecols=list(COLUNAS_DTYPES),
+        dtype=COLUNAS_DTYPES,
+        encoding='utf-8-sig',
+    )
+    return {coluna: df[coluna].to_numpy(dtype=dtype) for coluna, dtype in COLUNAS_DTYPES.items()}
+
+def _ler_cache(caminho: str, assinatura: Tuple[int, int]):
+    try:
+        with np.load(caminho, allow_pickle=False) as dados:
+            if tuple(dados['_assinatura'].tolist()) != assinatura:
+                return None
+            return {coluna: dados[coluna] for coluna in COLUNAS_DTYPES}
+    except (FileNotFoundError, KeyError, ValueError, OSError):
+        return None
+
+def _gravar_cache(caminho: str, assinatura: Tuple[int, int], colunas: Dict[str, np.ndarray]):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp.npz"
+    np.savez(temporario, _assinatura=np.array(assinatura, dtype=np.int64), **colunas)
+    os.replace(temporario, caminho)
+
+def carregar_colunas(csv_path: str = CSV_PATH) -> Dict[str, np.ndarray]:
+    """Retorna as colunas do CSV como arrays NumPy, usando o cache quando válido."""
+    chave = os.path.abspath(csv_path)
+    assinatura = _assinatura(chave)
+
+    em_memoria = _memoria.get(chave)
+    if em_memoria and em_memoria[0] == assinatura:
+        return em_memoria[1]
+
+    caminho_cache = _caminho_cache(chave)
+    colunas = _ler_cache(caminho_cache, assinatura)
+    if colunas is None:
+        colunas = _ler_csv(chave)
+        try:
+            _gravar_cache(caminho_cache, assinatura, colunas)
+        except OSError:
+            # Sem permissão de escrita: segue apenas com o cache em memória
+            pass
+
+    _memoria[chave] = (assinatura, colunas)
+    return colunas
+
+def sugestoes_compra(csv_path: str = CSV_PATH, max_criticos: int = 5) -> List[Dict]:
+    """Itens críticos no formato esperado pelo prompt do Agente, priorizados por CMM."""
+    colunas = carregar_colunas(csv_path)
+    cmm = colunas['cmm']
+    saldo = colunas['saldo_manut']
+    compras = colunas['provid_compras']
+
+    quantidade = np.clip(cmm * 2 - saldo - compras, 0, None)
+    criticos = np.flatnonzero(quantidade > 0)
+    selecionados = criticos[indices_maiores(cmm[criticos], max_criticos)]
+
+    cmm_sel = cmm[selecionados]
+    registros = {
+        'codigo': colunas['codigo'][selecionados].tolist(),
+        'abc': colunas['abc'][selecionados].tolist(),
+        'estoque_atual': saldo[selecionados].tolist(),
+        'estoque_maximo': np.where(cmm_sel > CMM_ALTO, ESTOQUE_MAXIMO_ALTO, ESTOQUE_MAXIMO_PADRAO).tolist(),
+        'cmm': cmm_sel.tolist(),
+        'compras_em_andamento': compras[selecionados].tolist(),
+        'quantidade_a_comprar': quantidade[selecionados].tolist(),
+    }
+    return [dict(zip(registros, valores)) for valores in zip(*registros.values())]
@@ -1,32 +1,347 @@
-import pandas as pd
+"""
+Conversor CSV -> JSON - Nexum Supply Chain
+Converte dados_hackathon.csv no "banco de dados" database.json em streaming:
+as linhas são lidas uma a uma e cada produto é escrito assim que convertido,
+então o uso de memória não depende do tamanho do arquivo.
+
+Formatos:
+    json    {"products":[...],"users":[],"sales":[]} compacto (lido por database.py)
+    ndjson  um produto por linha
+
+Com --sincronizar, o database.json existente é atualizado por codigo em vez de
+recriado: ids, users e sales são preservados (ver sincronizar()).
+
+Uso:
+    python convert_csv_to_json.py
+    python convert_csv_to_json.py dados.csv --saida produtos.ndjson --formato ndjson
+    python convert_csv_to_json.py extrato_do_dia.csv --sincronizar
+"""
+
+import os
+import csv
 import json
+import math
+import mmap
+import time
+import pickle
+import argparse
+from contextlib import ExitStack
+from json.encoder import encode_basestring
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from agregacao_estoque import COLUNAS_INTEIRAS, COLUNAS_DECIMAIS
+
+TAMANHO_BUFFER = 1 << 20
+
+# --- Conversão de valores (texto do CSV -> fragmento JSON) ---
+
+def _json_inteiro(valor: str) -> str:
+    if not valor:
+        return 'null'
+    try:
+        return str(int(valor))
+    except ValueError:
+        return _json_decimal(valor)
+
+def _json_decimal(valor: str) -> str:
+    if not valor:
+        return 'null'
+    numero = float(valor)
+    # NaN/Infinity não são JSON válido
+    return repr(numero) if math.isfinite(numero) else 'null'
+
+def _json_automatico(valor: str) -> str:
+    """Colunas desconhecidas: número quando possível, senão texto."""
+    if not valor:
+        return 'null'
+    try:
+        return str(int(valor))
+    except ValueError:
+        pass
+    try:
+        return _json_decimal(valor)
+    except ValueError:
+        return encode_basestring(valor)
+
+def _conversor(coluna: str) -> Callable[[str], str]:
+    if coluna in COLUNAS_INTEIRAS:
+        return _json_inteiro
+    if coluna in COLUNAS_DECIMAIS:
+        return _json_decimal
+    if coluna in ('codigo', 'abc'):
+        return encode_basestring
+    return _json_automatico
+
+def _pares(cabecalho: List[str]) -> List[Tuple[str, Callable[[str], str]]]:
+    """(chave JSON, conversor) de cada coluna do cabeçalho."""
+    return [(f"{encode_basestring(c)}:", _conversor(c)) for c in cabecalho]
+
+def _formatar_produto(id_produto: int, linha: List[str], pares) -> str:
+    campos = ','.join([chave + conv(valor) for (chave, conv), valor in zip(pares, linha)])
+    return f'{{"id":{id_produto},{campos}}}'
+
+def produtos_json(linhas: Iterator[List[str]], cabecalho: List[str], primeiro_id: int = 1) -> Iterator[str]:
+    """Gera cada produto como objeto JSON compacto, com o id atribuído na ordem de leitura."""
+    pares = _pares(cabecalho)
+    for i, linha in enumerate(linhas, start=primeiro_id):
+        yield _formatar_produto(i, linha, pares)
+
+# --- Conversão ---
+
+def converter(csv_path: str = 'dados_hackathon.csv', saida: str = 'database.json', formato: str = 'json') -> int:
+    """Converte o CSV para JSON/NDJSON em streaming. Retorna o número de produtos."""
+    total = 0
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as origem, \
+            open(saida, 'w', encoding='utf-8', buffering=TAMANHO_BUFFER) as destino:
+        leitor = csv.reader(origem, delimiter=';')
+        cabecalho = next(leitor, [])
+        produtos = produtos_json(leitor, cabecalho)
+
+        if formato == 'ndjson':
+            for produto in produtos:
+                destino.write(produto)
+                destino.write('\n')
+                total += 1
+            return total
+
+        destino.write('{"products":[')
+        for produto in produtos:
+            if total:
+                destino.write(',')
+            destino.write(produto)
+            total += 1
+        # Listas vazias para usuários e vendas
+        destino.write('],"users":[],"sales":[]}')
+    return total
+
+# --- Sincronização incremental ---
+
+VERSAO_INDICE = 1
+BOM = b'\xef\xbb\xbf'
+
+def _caminho_indice(saida: str) -> str:
+    """Índice auxiliar da sincronização: codigo -> (id, hash da linha, posição no JSON)."""
+    return f"{saida}.indice"
+
+def _campos(linha: bytes) -> List[str]:
+    texto = linha.decode('utf-8')
+    if '"' in texto:
+        return next(csv.reader([texto], delimiter=';'))
+    return texto.split(';')
+
+def _ler_linhas(csv_path: str) -> Tuple[List[str], List[bytes], np.ndarray]:
+    """Lê o CSV como bytes: cabeçalho, linhas e codigo de cada linha (sem converter valores)."""
+    with open(csv_path, 'rb') as f:
+        dados = f.read()
+    linhas = dados[len(BOM):].splitlines() if dados.startswith(BOM) else dados.splitlines()
+    cabecalho = _campos(linhas[0]) if linhas else []
+    linhas = [linha for linha in linhas[1:] if linha]
+    posicao = cabecalho.index('codigo')
+    if b'"' in dados:
+        codigos = [_campos(linha)[posicao].encode('utf-8') for linha in linhas]
+    else:
+        codigos = [linha.split(b';', posicao + 1)[posicao] for linha in linhas]
+    return cabecalho, linhas, _chaves_unicas(np.array(codigos, dtype=object))
+
+def _chaves_unicas(codigos: np.ndarray) -> np.ndarray:
+    """Codigos repetidos no CSV recebem um sufixo com a ordem de ocorrência (codigo\\x002, ...)."""
+    repetidos = pd.Series(codigos).duplicated().to_numpy()
+    if repetidos.any():
+        codigos = codigos.copy()
+        ocorrencias = pd.Series(codigos[repetidos]).groupby(codigos[repetidos]).cumcount() + 2
+        codigos[repetidos] = [c + b'\x00%d' % n for c, n in zip(codigos[repetidos], ocorrencias)]
+    return codigos
+
+def _hashes(linhas: List[bytes]) -> np.ndarray:
+    return pd.util.hash_array(np.array(linhas, dtype=object))
+
+def _ler_indice(saida: str) -> Optional[Dict]:
+    try:
+        with open(_caminho_indice(saida), 'rb') as f:
+            indice = pickle.load(f)
+    except (FileNotFoundError, pickle.UnpicklingError, EOFError):
+        return None
+    return indice if indice.get('versao') == VERSAO_INDICE else None
+
+def _indice_valido(indice: Optional[Dict], saida: str, cabecalho: List[str]) -> bool:
+    """O índice só vale se o arquivo de saída não foi regravado por outro processo (ex.: save_data)."""
+    try:
+        info = os.stat(saida)
+    except FileNotFoundError:
+        return False
+    return (indice is not None and indice['cabecalho'] == cabecalho
+            and (indice['tamanho'], indice['mtime_ns']) == (info.st_size, info.st_mtime_ns))
+
+def _gravar_indice(saida: str, indice: Dict):
+    info = os.stat(saida)
+    indice.update(versao=VERSAO_INDICE, tamanho=info.st_size, mtime_ns=info.st_mtime_ns)
+    temporario = f"{_caminho_indice(saida)}.tmp"
+    with open(temporario, 'wb') as f:
+        pickle.dump(indice, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporario, _caminho_indice(saida))
+
+def _colecoes_existentes(saida: str) -> Tuple[Dict[bytes, Dict], Dict, int]:
+    """Lê o banco atual (sem índice válido): produtos por codigo, demais coleções e próximo id."""
+    try:
+        with open(saida, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+    except FileNotFoundError:
+        dados = {}
+    produtos = dados.pop('products', [])
+    com_codigo = [p for p in produtos if 'codigo' in p and 'id' in p]
+    chaves = _chaves_unicas(np.array([str(p['codigo']).encode('utf-8') for p in com_codigo], dtype=object))
+    por_chave = dict(zip(chaves, com_codigo))
+    proximo_id = max((p.get('id', 0) for p in produtos), default=0) + 1
+    dados.setdefault('users', [])
+    dados.setdefault('sales', [])
+    return por_chave, dados, proximo_id
+
+def sincronizar(csv_path: str = 'dados_hackathon.csv', saida: str = 'database.json') -> Dict:
+    """Aplica ao banco JSON apenas as diferenças do CSV, comparando por codigo.
+
+    Mantém os ids dos produtos existentes, novos produtos recebem ids nunca
+    usados (o maior id já atribuído fica no índice, mesmo que o produto tenha
+    sido removido depois), e users/sales são preservados. Com um índice válido
+    da execução anterior, só as linhas cujo hash mudou são convertidas;
+    sequências de produtos inalterados são copiadas em bloco do arquivo
+    anterior. Sem índice (ou se o JSON foi regravado por outro processo), faz
+    uma passagem completa que compara cada produto com o atual e recria o índice.
+    """
+    cabecalho, linhas, codigos = _ler_linhas(csv_path)
+    hashes = _hashes(linhas)
+    total = len(linhas)
+    pares = _pares(cabecalho)
+    indice = _ler_indice(saida)
+    # Próximo id nunca usado, guardado mesmo quando as posições do índice não valem mais
+    proximo_id_registrado = indice['proximo_id'] if indice is not None else 1
+    if not _indice_valido(indice, saida, cabecalho) or not len(indice['codigos']):
+        indice = None
+    formatados: Dict[int, bytes] = {}
+
+    if indice is not None:
+        # Posição de cada linha no índice anterior (-1: codigo novo)
+        anteriores = pd.Index(indice['codigos']).get_indexer(codigos)
+        existentes = anteriores >= 0
+        ids = np.where(existentes, indice['ids'][anteriores], -1)
+        inalterados = existentes & (indice['hashes'][anteriores] == hashes)
+        proximo_id = indice['proximo_id']
+        removidos = len(indice['codigos']) - int(existentes.sum())
+    else:
+        produtos_existentes, outras_colecoes, proximo_id = _colecoes_existentes(saida)
+        proximo_id = max(proximo_id, proximo_id_registrado)
+        atuais = [produtos_existentes.pop(c, None) for c in codigos]
+        ids = np.array([-1 if p is None else p['id'] for p in atuais], dtype=np.int64)
+        existentes = ids >= 0
+        anteriores = np.full(total, -1)
+        # Sem o arquivo anterior indexado não há o que copiar: todas as linhas são reescritas,
+        # mas só contam como atualizadas as que mudam o produto gravado
+        inalterados = np.zeros(total, dtype=bool)
+        sem_mudanca = np.zeros(total, dtype=bool)
+        for i in np.flatnonzero(existentes).tolist():
+            formatados[i] = _formatar_produto(int(ids[i]), _campos(linhas[i]), pares).encode('utf-8')
+            sem_mudanca[i] = json.loads(formatados[i]) == atuais[i]
+        removidos = len(produtos_existentes)
+
+    if indice is not None:
+        sem_mudanca = inalterados
+    novos = np.flatnonzero(~existentes)
+    ids[novos] = np.arange(proximo_id, proximo_id + len(novos))
+    proximo_id += len(novos)
+    estatisticas = {
+        'modo': 'incremental' if indice is not None else 'completo',
+        'total': total,
+        'inseridos': len(novos),
+        'atualizados': int((existentes & ~sem_mudanca).sum()),
+        'inalterados': int(sem_mudanca.sum()),
+        'removidos': removidos,
+    }
+    if indice is not None and estatisticas['inalterados'] == total == len(indice['codigos']) \
+            and (anteriores == np.arange(total)).all():
+        return estatisticas  # Nada mudou: o arquivo atual já está correto
+
+    # Segmentos: cada linha alterada, ou sequência de inalteradas contíguas no arquivo anterior
+    continua = np.zeros(total, dtype=bool)
+    continua[1:] = inalterados[1:] & inalterados[:-1] & (anteriores[1:] == anteriores[:-1] + 1)
+    inicios_segmento = np.flatnonzero(~continua)
+    fins_segmento = np.append(inicios_segmento[1:], total)
+
+    novos_inicios = np.empty(total, dtype=np.int64)
+    novos_fins = np.empty(total, dtype=np.int64)
+    temporario = f"{saida}.{os.getpid()}.tmp"
+
+    with open(temporario, 'wb') as arquivo, ExitStack() as pilha:
+        if indice is not None:
+            with open(saida, 'rb') as f:
+                anterior = pilha.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        posicao = arquivo.write(b'{"products":[')
+        for a, b in zip(inicios_segmento.tolist(), fins_segmento.tolist()):
+            if a:
+                posicao += arquivo.write(b',')
+            if inalterados[a]:
+                # Cópia do trecho [início do produto a, fim do produto b-1] do arquivo anterior
+                posicoes_anteriores = anteriores[a:b]
+                origem = int(indice['inicios'][posicoes_anteriores[0]])
+                trecho = anterior[origem:int(indice['fins'][posicoes_anteriores[-1]])]
+                novos_inicios[a:b] = indice['inicios'][posicoes_anteriores] - origem + posicao
+                novos_fins[a:b] = indice['fins'][posicoes_anteriores] - origem + posicao
+            else:
+                trecho = formatados.pop(a, None)
+                if trecho is None:
+                    trecho = _formatar_produto(int(ids[a]), _campos(linhas[a]), pares).encode('utf-8')
+                novos_inicios[a] = posicao
+                novos_fins[a] = posicao + len(trecho)
+            posicao += arquivo.write(trecho)
+
+        sufixo = posicao
+        if indice is not None:
+            arquivo.write(anterior[indice['sufixo']:])
+        else:
+            outras = ''.join(f",{encode_basestring(chave)}:{json.dumps(valor, ensure_ascii=False, separators=(',', ':'))}"
+                             for chave, valor in outras_colecoes.items())
+            arquivo.write(f"]{outras}}}".encode('utf-8'))
+
+    os.replace(temporario, saida)
+    _gravar_indice(saida, {
+        'cabecalho': cabecalho, 'proximo_id': proximo_id, 'sufixo': sufixo,
+        'codigos': codigos, 'ids': ids, 'hashes': hashes, 'inicios': novos_inicios, 'fins': novos_fins,
+    })
+    return estatisticas
+
+def main():
+    parser = argparse.ArgumentParser(description="Converte o CSV de estoque no database.json.")
+    parser.add_argument("csv", nargs="?", default="dados_hackathon.csv", help="Arquivo CSV de origem.")
+    parser.add_argument("--saida", default=None, help="Arquivo de destino (padrão: database.json ou produtos.ndjson).")
+    parser.add_argument("--formato", choices=("json", "ndjson"), default="json")
+    parser.add_argument("--sincronizar", action="store_true",
+                        help="Atualiza o database.json existente por codigo (mantém ids, users e sales).")
+    args = parser.parse_args()
+    if args.sincronizar and args.formato != 'json':
+        parser.error("--sincronizar só é suportado com --formato json.")
+    saida = args.saida or ('database.json' if args.formato == 'json' else 'produtos.ndjson')
+
+    inicio = time.perf_counter()
+    try:
+        if args.sincronizar:
+            estatisticas = sincronizar(args.csv, saida)
+            total = estatisticas['total']
+        else:
+            total = converter(args.csv, saida, args.formato)
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{args.csv}' não encontrado.")
+        return
+    duracao = time.perf_counter() - inicio
+
+    print(f"{total} produtos convertidos em {duracao:.2f} s ({total / max(duracao, 1e-9):,.0f} linhas/s).")
+    if args.sincronizar:
+        print(f"🔄 Sincronização {estatisticas['modo']}: {estatisticas['inseridos']} inseridos, "
+              f"{estatisticas['atualizados']} atualizados, {estatisticas['removidos']} removidos, "
+              f"{estatisticas['inalterados']} inalterados.")
+        print(f"✅ Arquivo '{saida}' sincronizado com sucesso!")
+    else:
+        print(f"✅ Arquivo '{saida}' criado com sucesso!")
 
-# Carrega os dados do CSV
-try:
-    df_products = pd.read_csv('dados_hackathon.csv', delimiter=';')
-    print(f"{len(df_products)} produtos carregados do CSV.")
-except FileNotFoundError:
-    print("Erro: Arquivo 'dados_hackathon.csv' não encontrado.")
-    exit()
-
-# Adiciona um ID único para cada produto, já que não temos um no CSV
-df_products.reset_index(inplace=True)
-df_products.rename(columns={'index': 'id'}, inplace=True)
-# Começa o ID do 1 em vez do 0
-df_products['id'] = df_products['id'] + 1
-
-# Converte o DataFrame para uma lista de dicionários
-products_list = df_products.to_dict(orient='records')
-
-# Estrutura inicial do nosso "banco de dados"
-db_data = {
-    "products": products_list,
-    "users": [], # Adicionamos uma lista vazia para usuários
-    "sales": []    # E uma lista vazia para vendas
-}
-
-# Salva tudo no arquivo JSON
-with open('database.json', 'w', encoding='utf-8') as f:
-    json.dump(db_data, f, ensure_ascii=False, indent=4)
-
-print("✅ Arquivo 'database.json' criado com sucesso!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
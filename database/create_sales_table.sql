@@ -0,0 +1,72 @@
+-- ============================================================================
+-- CRIAÇÃO DAS TABELAS DE VENDAS - NEXUM SUPPLY CHAIN
+-- Database: Nexum Supply Chain Management
+-- ============================================================================
+
+-- Usar o mesmo schema supply_chain
+USE [nexum-supply-chain-db];
+GO
+
+-- ============================================================================
+-- TABELA: vendas
+-- Registro de vendas (sales.py); codigo/quantidade ligam a venda a um produto
+-- e alimentam o cmm calculado pelo motor de demanda (demanda.py)
+-- ============================================================================
+IF OBJECT_ID('supply_chain.vendas', 'U') IS NULL
+CREATE TABLE supply_chain.vendas (
+    id INT IDENTITY(1,1) PRIMARY KEY,
+    nome_venda NVARCHAR(255) NOT NULL,
+    valor_venda DECIMAL(18,2) NOT NULL,
+    data_venda DATE NOT NULL,
+
+    -- Produto vendido (opcional)
+    codigo NVARCHAR(50) NULL,
+    quantidade DECIMAL(18,4) NULL,
+
+    CONSTRAINT CK_vendas_valor CHECK (valor_venda >= 0),
+    CONSTRAINT CK_vendas_quantidade CHECK (quantidade IS NULL OR quantidade > 0)
+)
+GO
+
+-- Agregados diários (GROUP BY data_venda) e consultas por período
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_vendas_data')
+CREATE NONCLUSTERED INDEX IX_vendas_data
+ON supply_chain.vendas(data_venda)
+INCLUDE (valor_venda)
+GO
+
+-- Histórico de demanda por produto (GROUP BY codigo, data_venda)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_vendas_codigo')
+CREATE NONCLUSTERED INDEX IX_vendas_codigo
+ON supply_chain.vendas(codigo, data_venda)
+INCLUDE (quantidade)
+WHERE codigo IS NOT NULL
+GO
+
+-- ============================================================================
+-- TABELA: vendas_versao
+-- Contador único incrementado na mesma transação de toda escrita em vendas:
+-- cada processo compara com a versão dos seus agregados em memória e só os
+-- reconstrói quando outro processo gravou vendas
+-- ============================================================================
+IF OBJECT_ID('supply_chain.vendas_versao', 'U') IS NULL
+BEGIN
+    CREATE TABLE supply_chain.vendas_versao (
+        id TINYINT NOT NULL PRIMARY KEY CHECK (id = 1),
+        versao BIGINT NOT NULL
+    );
+    INSERT INTO supply_chain.vendas_versao (id, versao) VALUES (1, 0);
+END
+GO
+
+-- ============================================================================
+-- TABELA: vendas_cmm_base
+-- cmm de cada produto antes da sua primeira venda: completa a janela do motor
+-- de demanda enquanto o produto não tem um ano de histórico
+-- ============================================================================
+IF OBJECT_ID('supply_chain.vendas_cmm_base', 'U') IS NULL
+CREATE TABLE supply_chain.vendas_cmm_base (
+    codigo NVARCHAR(50) NOT NULL PRIMARY KEY,
+    cmm_base DECIMAL(10,4) NULL
+)
+GO
@@ -252,7 +252,8 @@ GO
 -- STORED PROCEDURE: Registrar Login Falho
 -- ============================================================================
 CREATE OR ALTER PROCEDURE supply_chain.sp_registrar_login_falho
-    @email NVARCHAR(255)
+    @email NVARCHAR(255),
+    @quantidade INT = 1  -- Falhas acumuladas em memória e gravadas de uma vez
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -262,7 +263,7 @@ BEGIN
     
     -- Incrementar tentativas
     UPDATE supply_chain.usuarios
-    SET tentativas_login_falhadas = tentativas_login_falhadas + 1
+    SET tentativas_login_falhadas = tentativas_login_falhadas + @quantidade
     WHERE email = @email;
     
     -- Verificar se deve bloquear (após 5 tentativas)
@@ -1,53 +1,71 @@
 """
 Gerador de Scripts SQL INSERT a partir do CSV
-Cria um arquivo .sql com todos os comandos INSERT prontos para executar
+Cria arquivos .sql com os comandos INSERT prontos para executar, ou arquivos de
+dados + arquivo de formato para carga em massa com bcp / BULK INSERT.
+
+Os registros são divididos em N shards gerados em paralelo (um processo por
+shard); cada shard pode ser executado em uma sessão separada.
+
+Uso:
+    python database/generate_inserts.py
+    python database/generate_inserts.py --shards 8
+    python database/generate_inserts.py --formato bcp
 """
 
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 
-def escape_sql_string(value):
-    """Escapa aspas simples em strings SQL"""
-    if isinstance(value, str):
-        return value.replace("'", "''")
-    return value
+from insert_data import COLUMNS, COLUMN_TYPES
+
+BATCH_SIZE = 1000  # Limite de linhas por INSERT ... VALUES do SQL Server
+STRING_COLUMNS = [col for col in COLUMNS if COLUMN_TYPES[col] is str]
+
+def load_csv(csv_path):
+    return pd.read_csv(csv_path, delimiter=';', dtype={col: str for col in STRING_COLUMNS})
+
+def shard_paths(output_path, shards, extension):
+    """Nomes dos arquivos de saída: o próprio output_path com 1 shard, sufixo _001.. com vários"""
+    base = os.path.splitext(output_path)[0]
+    if shards == 1:
+        return [f"{base}{extension}"]
+    return [f"{base}_{i:03d}{extension}" for i in range(1, shards + 1)]
+
+def split_shards(df, shards):
+    """Divide em shards contíguos, com fronteiras alinhadas aos lotes de INSERT"""
+    batches = -(-len(df) // BATCH_SIZE)
+    per_shard = max(1, -(-batches // shards)) * BATCH_SIZE
+    return [df.iloc[i:i + per_shard] for i in range(0, len(df), per_shard)] or [df]
+
+def format_values(df):
+    """Formata todas as tuplas "(...)": conversões por coluna, depois uma única junção por linha"""
+    columns = []
+    for col in COLUMNS:
+        values = df[col].astype(COLUMN_TYPES[col]).tolist()
+        if col in STRING_COLUMNS:
+            columns.append(["'" + value.replace("'", "''") + "'" for value in values])
+        else:
+            columns.append(list(map(str, values)))
+    return ["    (" + ", ".join(row) + ")" for row in zip(*columns)]
+
+def write_sql_shard(df, output_path, shard_number, total_shards, first_record):
+    """Escreve um shard de INSERTs em lotes de 1000 linhas (cada INSERT é confirmado individualmente)"""
+    values = format_values(df)
 
-def generate_insert_statements(csv_path='dados_hackathon.csv', output_path='database/insert_data.sql'):
-    """
-    Gera arquivo SQL com comandos INSERT para todos os registros do CSV
-    """
-    print("🔄 Carregando dados do CSV...")
-    df = pd.read_csv(csv_path, delimiter=';')
-    
-    total_records = len(df)
-    print(f"✅ {total_records} registros carregados")
-    
-    print(f"\n📝 Gerando script SQL...")
-    
     with open(output_path, 'w', encoding='utf-8') as f:
-        # Cabeçalho
         f.write("-- ============================================================================\n")
         f.write("-- SCRIPT DE INSERÇÃO DE DADOS - NEXUM SUPPLY CHAIN\n")
-        f.write(f"-- Total de registros: {total_records}\n")
+        f.write(f"-- Shard {shard_number} de {total_shards}: registros {first_record + 1} a {first_record + len(df)}\n")
         f.write("-- Gerado automaticamente a partir de dados_hackathon.csv\n")
         f.write("-- ============================================================================\n\n")
-        
+
         f.write("SET NOCOUNT ON;\n")
         f.write("GO\n\n")
-        
-        f.write("BEGIN TRANSACTION;\n")
-        f.write("GO\n\n")
-        
-        f.write("PRINT 'Iniciando inserção de dados...';\n")
-        f.write("GO\n\n")
-        
-        # Gerar INSERTs em lotes de 1000 (limite do SQL Server)
-        batch_size = 1000
-        batch_count = 0
-        
-        for i in range(0, total_records, batch_size):
-            batch = df.iloc[i:i+batch_size]
-            batch_count += 1
-            
+
+        for batch_count, i in enumerate(range(0, len(values), BATCH_SIZE), start=1):
+            batch = values[i:i + BATCH_SIZE]
             f.write(f"-- Lote {batch_count} ({len(batch)} registros)\n")
             f.write("INSERT INTO supply_chain.produtos_estoque\n")
             f.write("    (codigo, abc, tipo, saldo_manut, provid_compras, recebimento_esperado,\n")
@@ -55,61 +73,87 @@ def generate_insert_statements(csv_path='dados_hackathon.csv', output_path='data
             f.write("     pecas_teste_kit, pecas_teste, fornecedor_reparo, laboratorio,\n")
             f.write("     wr, wrcr, stage_wr, cmm, coef_perda)\n")
             f.write("VALUES\n")
-            
-            values = []
-            for idx, row in batch.iterrows():
-                value_str = (
-                    f"    ('{escape_sql_string(row['codigo'])}', "
-                    f"'{row['abc']}', "
-                    f"{int(row['tipo'])}, "
-                    f"{int(row['saldo_manut'])}, "
-                    f"{int(row['provid_compras'])}, "
-                    f"{int(row['recebimento_esperado'])}, "
-                    f"{int(row['transito_manut'])}, "
-                    f"{int(row['stage_manut'])}, "
-                    f"{int(row['recepcao_manut'])}, "
-                    f"{int(row['pendente_ri'])}, "
-                    f"{int(row['pecas_teste_kit'])}, "
-                    f"{int(row['pecas_teste'])}, "
-                    f"{int(row['fornecedor_reparo'])}, "
-                    f"{int(row['laboratorio'])}, "
-                    f"{int(row['wr'])}, "
-                    f"{int(row['wrcr'])}, "
-                    f"{int(row['stage_wr'])}, "
-                    f"{row['cmm']}, "
-                    f"{row['coef_perda']})"
-                )
-                values.append(value_str)
-            
-            f.write(",\n".join(values))
+            f.write(",\n".join(batch))
             f.write(";\n")
             f.write("GO\n\n")
-            
+
             # Adicionar checkpoint a cada 10 lotes
             if batch_count % 10 == 0:
-                f.write(f"PRINT 'Processados {i + len(batch)} de {total_records} registros...';\n")
+                f.write(f"PRINT 'Shard {shard_number}: processados {i + len(batch)} de {len(df)} registros...';\n")
                 f.write("GO\n\n")
-        
-        # Rodapé
-        f.write("\nPRINT 'Verificando inserção...';\n")
-        f.write("GO\n\n")
-        
-        f.write("SELECT COUNT(*) AS total_registros FROM supply_chain.produtos_estoque;\n")
-        f.write("GO\n\n")
-        
-        f.write("COMMIT TRANSACTION;\n")
-        f.write("GO\n\n")
-        
-        f.write("PRINT '✅ Inserção concluída com sucesso!';\n")
+
+        f.write(f"PRINT '✅ Shard {shard_number} concluído!';\n")
         f.write("GO\n")
-    
-    print(f"✅ Script SQL gerado: {output_path}")
-    print(f"📊 Total de lotes: {batch_count}")
+    return output_path
+
+def write_bcp_shard(df, output_path, shard_number, total_shards, first_record):
+    """Escreve um shard de dados em modo caractere (tab entre campos, LF entre linhas)"""
+    typed = df[COLUMNS].astype(COLUMN_TYPES)
+    typed.to_csv(output_path, sep='\t', header=False, index=False, lineterminator='\n', encoding='utf-8')
+    return output_path
+
+def write_bcp_format(format_path):
+    """Arquivo de formato (não-XML) mapeando os campos do .dat para as colunas da tabela"""
+    with open(format_path, 'w', encoding='utf-8', newline='\r\n') as f:
+        f.write("14.0\n")
+        f.write(f"{len(COLUMNS)}\n")
+        for i, col in enumerate(COLUMNS, start=1):
+            terminator = '\\n' if i == len(COLUMNS) else '\\t'
+            collation = 'SQL_Latin1_General_CP1_CI_AS' if col in STRING_COLUMNS else '""'
+            # A coluna 1 da tabela é o id (IDENTITY): os campos começam na coluna 2
+            f.write(f'{i:<4}SQLCHAR{0:>6}{100:>6}     "{terminator}"{i + 1:>6}     {col:<24}{collation}\n')
+    return format_path
+
+def generate_insert_statements(csv_path='dados_hackathon.csv', output_path='database/insert_data.sql',
+                               shards=None, output_format='sql'):
+    """
+    Gera os arquivos de carga (INSERTs ou bcp) para todos os registros do CSV
+    """
+    print("🔄 Carregando dados do CSV...")
+    df = load_csv(csv_path)
+
+    total_records = len(df)
+    print(f"✅ {total_records} registros carregados")
+
+    parts = split_shards(df, shards or os.cpu_count() or 1)
+    extension = '.sql' if output_format == 'sql' else '.dat'
+    paths = shard_paths(output_path, len(parts), extension)
+    writer = write_sql_shard if output_format == 'sql' else write_bcp_shard
+
+    print(f"\n📝 Gerando {len(parts)} arquivo(s) {extension} em paralelo...")
+    first_records = [0]
+    for part in parts[:-1]:
+        first_records.append(first_records[-1] + len(part))
+    with ProcessPoolExecutor(max_workers=len(parts)) as executor:
+        list(executor.map(writer, parts, paths, range(1, len(parts) + 1), [len(parts)] * len(parts), first_records))
+
+    for path in paths:
+        print(f"✅ Arquivo gerado: {path}")
     print(f"📊 Total de registros: {total_records}")
-    print(f"\n💡 Para executar no Azure SQL Database:")
-    print(f"   1. Abra o Azure Data Studio ou SQL Server Management Studio")
-    print(f"   2. Conecte-se ao seu banco de dados")
-    print(f"   3. Abra e execute o arquivo: {output_path}")
+
+    if output_format == 'sql':
+        print(f"\n💡 Para executar no Azure SQL Database:")
+        print(f"   1. Abra o Azure Data Studio ou SQL Server Management Studio")
+        print(f"   2. Conecte-se ao seu banco de dados")
+        print(f"   3. Execute os arquivos (podem rodar em sessões paralelas): {', '.join(paths)}")
+    else:
+        format_path = write_bcp_format(os.path.splitext(output_path)[0] + '.fmt')
+        print(f"✅ Arquivo de formato: {format_path}")
+        print(f"\n💡 Para carregar no Azure SQL Database (um comando por arquivo, podem rodar em paralelo):")
+        print(f"   bcp supply_chain.produtos_estoque in {paths[0]} -f {format_path} "
+              f"-S <servidor> -d <banco> -U <usuario> -C 65001 -b 50000 -h TABLOCK")
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera arquivos de carga para supply_chain.produtos_estoque.")
+    parser.add_argument("csv", nargs="?", default="dados_hackathon.csv", help="Arquivo CSV de origem.")
+    parser.add_argument("--saida", default="database/insert_data.sql",
+                        help="Caminho base dos arquivos gerados (padrão: database/insert_data.sql).")
+    parser.add_argument("--shards", type=int, default=None, help="Quantidade de arquivos (padrão: núcleos da CPU).")
+    parser.add_argument("--formato", choices=("sql", "bcp"), default="sql",
+                        help="sql: comandos INSERT | bcp: dados delimitados + arquivo de formato.")
+    args = parser.parse_args()
+    generate_insert_statements(args.csv, args.saida, args.shards, args.formato)
 
 if __name__ == "__main__":
-    generate_insert_statements()
+    main()
@@ -5,11 +5,23 @@ Data: 2025-10-15
 """
 
 import pandas as pd
-import pyodbc
 from datetime import datetime
 import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+try:
+    import pyodbc
+except ImportError:
+    # Sem driver ODBC ainda é possível carregar no SQLite local (--sqlite)
+    pyodbc = None
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -42,6 +54,8 @@ def get_connection_string():
 def connect_to_database():
     """Estabelece conexão com o banco de dados"""
     try:
+        if pyodbc is None:
+            raise RuntimeError("pyodbc não está disponível (instale pyodbc e o ODBC Driver 18 for SQL Server)")
         conn_str = get_connection_string()
         conn = pyodbc.connect(conn_str)
         print("✅ Conexão estabelecida com sucesso!")
@@ -53,81 +67,245 @@ def connect_to_database():
 def load_csv_data(csv_path='dados_hackathon.csv'):
     """Carrega dados do CSV"""
     try:
-        df = pd.read_csv(csv_path, delimiter=';')
+        df = pd.read_csv(csv_path, delimiter=';', dtype={'codigo': str, 'abc': str})
         print(f"✅ CSV carregado: {len(df)} registros encontrados")
         return df
     except Exception as e:
         print(f"❌ Erro ao carregar CSV: {e}")
         raise
 
-def insert_data_batch(conn, df, batch_size=1000):
+# ============================================================================
+# CARGA EM MASSA
+# ============================================================================
+# Colunas na ordem do INSERT (mesmo formato do CSV e da tabela)
+COLUMNS = [
+    'codigo', 'abc', 'tipo', 'saldo_manut', 'provid_compras', 'recebimento_esperado',
+    'transito_manut', 'stage_manut', 'recepcao_manut', 'pendente_ri',
+    'pecas_teste_kit', 'pecas_teste', 'fornecedor_reparo', 'laboratorio',
+    'wr', 'wrcr', 'stage_wr', 'cmm', 'coef_perda'
+]
+COLUMN_TYPES = {'codigo': str, 'abc': str, 'cmm': float, 'coef_perda': float}
+COLUMN_TYPES.update({col: int for col in COLUMNS if col not in COLUMN_TYPES})
+
+STAGING_TABLE = 'produtos_estoque_staging'
+MANIFEST_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'importacao')
+_COLUMN_LIST = ", ".join(COLUMNS)
+_UPDATE_COLUMNS = [col for col in COLUMNS if col != 'codigo']
+
+# SQL de staging e merge por dialeto: a carga vai para uma tabela temporária da
+# conexão e entra na tabela final em um único comando set-based por partição
+SQL_DIALECTS = {
+    'mssql': {
+        'create_staging': f"SELECT TOP 0 {_COLUMN_LIST} INTO #{STAGING_TABLE} FROM supply_chain.produtos_estoque",
+        'insert_staging': f"INSERT INTO #{STAGING_TABLE} ({_COLUMN_LIST}) VALUES ({', '.join('?' * len(COLUMNS))})",
+        'merge': (
+            f"MERGE supply_chain.produtos_estoque WITH (HOLDLOCK) AS destino "
+            f"USING #{STAGING_TABLE} AS origem ON destino.codigo = origem.codigo "
+            f"WHEN MATCHED THEN UPDATE SET "
+            + ", ".join(f"{col} = origem.{col}" for col in _UPDATE_COLUMNS)
+            + ", data_atualizacao = GETDATE(), usuario_atualizacao = SYSTEM_USER "
+            f"WHEN NOT MATCHED THEN INSERT ({_COLUMN_LIST}) "
+            f"VALUES ({', '.join(f'origem.{col}' for col in COLUMNS)});"
+        ),
+        'drop_staging': f"DROP TABLE #{STAGING_TABLE}",
+    },
+    'sqlite': {
+        'create_staging': (
+            f"CREATE TEMP TABLE {STAGING_TABLE} AS "
+            f"SELECT {_COLUMN_LIST} FROM supply_chain.produtos_estoque WHERE 0"
+        ),
+        'insert_staging': f"INSERT INTO temp.{STAGING_TABLE} ({_COLUMN_LIST}) VALUES ({', '.join('?' * len(COLUMNS))})",
+        'merge': (
+            f"INSERT INTO supply_chain.produtos_estoque ({_COLUMN_LIST}) "
+            f"SELECT {_COLUMN_LIST} FROM temp.{STAGING_TABLE} WHERE true "
+            f"ON CONFLICT(codigo) DO UPDATE SET "
+            + ", ".join(f"{col} = excluded.{col}" for col in _UPDATE_COLUMNS)
+            + ", data_atualizacao = CURRENT_TIMESTAMP"
+        ),
+        'drop_staging': f"DROP TABLE temp.{STAGING_TABLE}",
+    },
+}
+
+# Mesma forma de supply_chain.produtos_estoque (create_table.sql), para testes locais
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS supply_chain.produtos_estoque (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    codigo TEXT NOT NULL UNIQUE,
+    abc TEXT NOT NULL CHECK (abc IN ('A', 'B', 'C')),
+    tipo INTEGER NOT NULL CHECK (tipo IN (10, 19, 20)),
+    saldo_manut INTEGER NOT NULL DEFAULT 0 CHECK (saldo_manut >= 0),
+    provid_compras INTEGER NOT NULL DEFAULT 0,
+    recebimento_esperado INTEGER NOT NULL DEFAULT 0,
+    transito_manut INTEGER NOT NULL DEFAULT 0,
+    stage_manut INTEGER NOT NULL DEFAULT 0,
+    recepcao_manut INTEGER NOT NULL DEFAULT 0,
+    pendente_ri INTEGER NOT NULL DEFAULT 0,
+    pecas_teste_kit INTEGER NOT NULL DEFAULT 0,
+    pecas_teste INTEGER NOT NULL DEFAULT 0,
+    fornecedor_reparo INTEGER NOT NULL DEFAULT 0,
+    laboratorio INTEGER NOT NULL DEFAULT 0,
+    wr INTEGER NOT NULL DEFAULT 0,
+    wrcr INTEGER NOT NULL DEFAULT 0,
+    stage_wr INTEGER NOT NULL DEFAULT 0,
+    cmm REAL NOT NULL DEFAULT 0 CHECK (cmm >= 0),
+    coef_perda REAL NOT NULL DEFAULT 0 CHECK (coef_perda >= 0),
+    data_criacao TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    data_atualizacao TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    usuario_criacao TEXT,
+    usuario_atualizacao TEXT,
+    ativo INTEGER NOT NULL DEFAULT 1
+)
+"""
+
+def connect_to_sqlite(path='supply_chain.db'):
+    """Conexão SQLite com o arquivo anexado como schema supply_chain (substituto local do Azure SQL)"""
+    conn = sqlite3.connect(':memory:', timeout=60, check_same_thread=False)
+    conn.execute("ATTACH DATABASE ? AS supply_chain", (path,))
+    conn.execute(SQLITE_SCHEMA)
+    conn.commit()
+    return conn
+
+def _dialect(conn):
+    return 'sqlite' if isinstance(conn, sqlite3.Connection) else 'mssql'
+
+def build_parameters(df):
+    """Monta as tuplas de parâmetros coluna a coluna (conversões vetorizadas, tipos nativos do Python)"""
+    columns = [df[col].astype(COLUMN_TYPES[col]).tolist() for col in COLUMNS]
+    return list(zip(*columns))
+
+def upsert_batch(conn, batch):
     """
-    Insere dados em lotes para melhor performance
+    Grava um lote como upsert idempotente por codigo: tabela de staging, MERGE e commit
     """
+    sql = SQL_DIALECTS[_dialect(conn)]
     cursor = conn.cursor()
-    total_inserted = 0
-    total_records = len(df)
-    
-    # Query de inserção
-    insert_query = """
-    INSERT INTO supply_chain.produtos_estoque (
-        codigo, abc, tipo, saldo_manut, provid_compras, recebimento_esperado,
-        transito_manut, stage_manut, recepcao_manut, pendente_ri,
-        pecas_teste_kit, pecas_teste, fornecedor_reparo, laboratorio,
-        wr, wrcr, stage_wr, cmm, coef_perda
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """
-    
+    if hasattr(cursor, 'fast_executemany'):
+        # Array binding do pyodbc: um round-trip por lote em vez de um por linha
+        cursor.fast_executemany = True
+
     try:
-        print(f"\n📤 Iniciando inserção de {total_records} registros...")
-        print(f"   Tamanho do lote: {batch_size}")
-        
-        # Processar em lotes
-        for i in range(0, total_records, batch_size):
-            batch = df.iloc[i:i+batch_size]
-            batch_data = []
-            
-            for _, row in batch.iterrows():
-                batch_data.append((
-                    row['codigo'],
-                    row['abc'],
-                    int(row['tipo']),
-                    int(row['saldo_manut']),
-                    int(row['provid_compras']),
-                    int(row['recebimento_esperado']),
-                    int(row['transito_manut']),
-                    int(row['stage_manut']),
-                    int(row['recepcao_manut']),
-                    int(row['pendente_ri']),
-                    int(row['pecas_teste_kit']),
-                    int(row['pecas_teste']),
-                    int(row['fornecedor_reparo']),
-                    int(row['laboratorio']),
-                    int(row['wr']),
-                    int(row['wrcr']),
-                    int(row['stage_wr']),
-                    float(row['cmm']),
-                    float(row['coef_perda'])
-                ))
-            
-            # Executar batch insert
-            cursor.executemany(insert_query, batch_data)
-            conn.commit()
-            
-            total_inserted += len(batch_data)
-            progress = (total_inserted / total_records) * 100
-            print(f"   Progresso: {total_inserted}/{total_records} ({progress:.1f}%)")
-        
-        print(f"\n✅ Inserção concluída! Total: {total_inserted} registros")
-        return total_inserted
-        
-    except Exception as e:
-        print(f"\n❌ Erro durante inserção: {e}")
+        cursor.execute(sql['create_staging'])
+        cursor.executemany(sql['insert_staging'], build_parameters(batch))
+        cursor.execute(sql['merge'])
+        cursor.execute(sql['drop_staging'])
+        conn.commit()
+        return len(batch)
+    except Exception:
         conn.rollback()
         raise
     finally:
         cursor.close()
 
+def insert_data_batch(conn, df, batch_size=50_000, offsets=None, manifest=None):
+    """
+    Carrega os lotes do DataFrame (todos, ou apenas `offsets`) em uma conexão.
+    Com `manifest`, cada lote confirmado é registrado para uma eventual retomada.
+    """
+    total_inserted = 0
+    for offset in (range(0, len(df), batch_size) if offsets is None else offsets):
+        total_inserted += upsert_batch(conn, df.iloc[offset:offset + batch_size])
+        if manifest is not None:
+            manifest.mark(offset)
+    return total_inserted
+
+class ImportManifest:
+    """
+    Manifesto local de uma importação: hash do CSV de origem, destino, tamanho
+    do lote e offsets dos lotes já confirmados. Gravado a cada lote (atomicamente),
+    permite retomar a carga sem refazer o que já foi concluído. Removido quando
+    a carga termina: a próxima execução do mesmo arquivo grava tudo de novo,
+    mesmo que a tabela tenha mudado nesse meio tempo.
+    """
+
+    def __init__(self, path, source_hash, target, batch_size):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data = {'source_hash': source_hash, 'target': target, 'batch_size': batch_size, 'completed': []}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            saved = None
+        # Só reaproveita o progresso se o arquivo, o destino e o tamanho do lote forem os mesmos
+        if saved and all(saved.get(key) == self.data[key] for key in ('source_hash', 'target', 'batch_size')):
+            self.data = saved
+        self.completed = set(self.data['completed'])
+
+    def pending(self, total_records):
+        return [offset for offset in range(0, total_records, self.data['batch_size']) if offset not in self.completed]
+
+    def mark(self, offset):
+        with self._lock:
+            self.completed.add(offset)
+            self.data['completed'] = sorted(self.completed)
+            self.data['updated_at'] = datetime.now().isoformat(timespec='seconds')
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f)
+            os.replace(temp_path, self.path)
+
+    def clear(self):
+        """Descarta o progresso (carga concluída)"""
+        with self._lock:
+            self.completed.clear()
+            self.data['completed'] = []
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+def file_hash(path):
+    """SHA-256 do arquivo de origem"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def default_manifest_path(csv_path, target):
+    """Manifesto em .cache/importacao, um por arquivo de origem e destino"""
+    target_id = hashlib.sha256(target.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(MANIFEST_DIR, f"{os.path.basename(csv_path)}-{target_id}.json")
+
+def bulk_load(df, connect=connect_to_database, workers=4, batch_size=50_000, manifest=None):
+    """
+    Divide os lotes pendentes em partições e carrega cada uma em paralelo, em conexões separadas.
+    Retorna estatísticas da carga (registros, segundos, registros/s).
+    """
+    offsets = manifest.pending(len(df)) if manifest is not None else list(range(0, len(df), batch_size))
+    skipped = len(df) - sum(len(df.iloc[offset:offset + batch_size]) for offset in offsets)
+    size = max(1, -(-len(offsets) // workers))
+    partitions = [offsets[i:i + size] for i in range(0, len(offsets), size)]
+
+    def load_partition(partition):
+        conn = connect()
+        try:
+            return insert_data_batch(conn, df, batch_size, partition, manifest)
+        finally:
+            conn.close()
+
+    print(f"\n📤 Iniciando carga de {len(df) - skipped} registros...")
+    if skipped:
+        print(f"   Retomando: {skipped} registros já confirmados em execuções anteriores")
+    print(f"   Partições: {len(partitions)} | Tamanho do lote: {batch_size}")
+    start = time.perf_counter()
+    total_inserted = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for inserted in executor.map(load_partition, partitions):
+            total_inserted += inserted
+            done = total_inserted + skipped
+            print(f"   Progresso: {done}/{len(df)} ({done / len(df) * 100:.1f}%)")
+    seconds = time.perf_counter() - start
+    if manifest is not None and not manifest.pending(len(df)):
+        # Todos os lotes passaram pelo MERGE: o manifesto não serve mais para retomar
+        manifest.clear()
+        print(f"   Manifesto concluído e removido: {manifest.path}")
+
+    rows_per_sec = total_inserted / seconds if seconds else 0.0
+    print(f"\n✅ Carga concluída! Total: {total_inserted} registros em {seconds:.2f} s ({rows_per_sec:,.0f} registros/s)")
+    return {'rows': total_inserted, 'skipped': skipped, 'seconds': seconds, 'rows_per_sec': rows_per_sec}
+
 def verify_insertion(conn):
     """Verifica se os dados foram inseridos corretamente"""
     cursor = conn.cursor()
@@ -153,9 +331,9 @@ def verify_insertion(conn):
         """)
         
         print("\n📊 Estatísticas por classificação ABC:")
-        for row in cursor.fetchall():
-            print(f"   Classe {row.abc}: {row.quantidade} produtos | "
-                  f"Estoque: {row.estoque_total} | CMM médio: {row.cmm_medio:.2f}")
+        for abc, quantidade, estoque_total, cmm_medio in cursor.fetchall():
+            print(f"   Classe {abc}: {quantidade} produtos | "
+                  f"Estoque: {estoque_total} | CMM médio: {cmm_medio:.2f}")
         
         # Produtos críticos
         cursor.execute("""
@@ -189,28 +367,44 @@ def clear_table(conn):
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Importa o CSV de estoque para supply_chain.produtos_estoque.")
+    parser.add_argument("csv", nargs="?", default="dados_hackathon.csv", help="Arquivo CSV de origem.")
+    parser.add_argument("--workers", type=int, default=4, help="Partições carregadas em paralelo (uma conexão cada).")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Linhas por executemany na tabela de staging.")
+    parser.add_argument("--sqlite", metavar="ARQUIVO", default=None,
+                        help="Carrega em um SQLite local com a mesma tabela, em vez do Azure SQL.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Registra os lotes confirmados em um manifesto e retoma de onde a última execução parou.")
+    parser.add_argument("--manifest", default=None, help="Caminho do manifesto (padrão: .cache/importacao/).")
+    args = parser.parse_args()
+
     print("=" * 80)
     print("🚀 IMPORTAÇÃO DE DADOS - NEXUM SUPPLY CHAIN")
     print("=" * 80)
     print(f"Data/Hora: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
+
+    if args.sqlite:
+        connect = lambda: connect_to_sqlite(args.sqlite)
+        target = f"sqlite:{os.path.abspath(args.sqlite)}"
+    else:
+        connect = connect_to_database
+        target = f"mssql:{AZURE_SQL_CONFIG['server']}/{AZURE_SQL_CONFIG['database']}"
+
     try:
         # 1. Carregar CSV
-        df = load_csv_data('dados_hackathon.csv')
-        
-        # 2. Conectar ao banco
-        conn = connect_to_database()
-        
-        # 3. Limpar tabela (opcional - descomente se quiser limpar antes)
-        # clear_table(conn)
-        
-        # 4. Inserir dados
-        total_inserted = insert_data_batch(conn, df, batch_size=1000)
-        
-        # 5. Verificar inserção
+        df = load_csv_data(args.csv)
+
+        # 2. Carregar as partições em paralelo (upsert por codigo)
+        manifest = None
+        if args.resume:
+            manifest_path = args.manifest or default_manifest_path(args.csv, target)
+            manifest = ImportManifest(manifest_path, file_hash(args.csv), target, args.batch_size)
+            print(f"📒 Manifesto: {manifest_path}")
+        bulk_load(df, connect, workers=args.workers, batch_size=args.batch_size, manifest=manifest)
+
+        # 3. Verificar inserção
+        conn = connect()
         verify_insertion(conn)
-        
-        # 6. Fechar conexão
         conn.close()
         
         print("\n" + "=" * 80)
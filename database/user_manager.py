@@ -5,13 +5,26 @@ Data: 2025-10-15
 """
 
 import pyodbc
-import bcrypt
 import re
+import sys
 from datetime import datetime, date
 from typing import Optional, Dict, List
 import os
 from dotenv import load_dotenv
 
+try:
+    from pool_conexoes import pool_compartilhado
+    from servico_senhas import servico_senhas, precisa_rehash
+    from tentativas_login import rastreador_logins
+    from cache_usuarios import invalidar_usuario
+except ImportError:
+    # Executado como script (python database/user_manager.py): raiz do projeto fora do sys.path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from pool_conexoes import pool_compartilhado
+    from servico_senhas import servico_senhas, precisa_rehash
+    from tentativas_login import rastreador_logins
+    from cache_usuarios import invalidar_usuario
+
 load_dotenv()
 
 # ============================================================================
@@ -39,6 +52,10 @@ def get_connection():
     )
     return pyodbc.connect(conn_str)
 
+def pool_usuarios():
+    """Pool de conexões compartilhado por todos os GerenciadorUsuarios do processo"""
+    return pool_compartilhado('usuarios', get_connection)
+
 # ============================================================================
 # FUNÇÕES DE VALIDAÇÃO
 # ============================================================================
@@ -115,13 +132,12 @@ def limpar_cpf(cpf: str) -> str:
 # ============================================================================
 
 def hash_senha(senha: str) -> str:
-    """Gera hash bcrypt da senha"""
-    salt = bcrypt.gensalt(rounds=12)
-    return bcrypt.hashpw(senha.encode('utf-8'), salt).decode('utf-8')
+    """Gera hash bcrypt da senha (no pool de processos do serviço de senhas)"""
+    return servico_senhas().gerar_hash(senha)
 
 def verificar_senha(senha: str, hash_armazenado: str) -> bool:
-    """Verifica se a senha corresponde ao hash"""
-    return bcrypt.checkpw(senha.encode('utf-8'), hash_armazenado.encode('utf-8'))
+    """Verifica se a senha corresponde ao hash (no pool de processos do serviço de senhas)"""
+    return servico_senhas().verificar(senha, hash_armazenado)
 
 # ============================================================================
 # CLASS: GerenciadorUsuarios
@@ -136,13 +152,15 @@ class GerenciadorUsuarios:
         self.conn = None
     
     def conectar(self):
-        """Estabelece conexão com o banco"""
-        self.conn = get_connection()
+        """Obtém uma conexão do pool"""
+        if not self.conn:
+            self.conn = pool_usuarios().obter()
     
     def desconectar(self):
-        """Fecha conexão com o banco"""
+        """Devolve a conexão ao pool"""
         if self.conn:
-            self.conn.close()
+            pool_usuarios().devolver(self.conn)
+            self.conn = None
     
     def criar_usuario(
         self,
@@ -253,11 +271,17 @@ class GerenciadorUsuarios:
             'data_criacao': row.data_criacao
         }
     
-    def autenticar(self, email: str, senha: str) -> Optional[Dict]:
+    def autenticar(self, email: str, senha: str, ip: Optional[str] = None) -> Optional[Dict]:
         """
         Autentica usuário
         Retorna dados do usuário se autenticado, None caso contrário
         """
+        # Email ou IP com falhas demais na janela: recusar antes do banco e do bcrypt
+        rastreador = rastreador_logins()
+        bloqueio = rastreador.bloqueado(email, ip)
+        if bloqueio:
+            raise Exception(f"Muitas tentativas de login, tente novamente em {int(bloqueio // 60) + 1} minuto(s)")
+        
         cursor = self.conn.cursor()
         
         # Buscar usuário com senha
@@ -273,6 +297,7 @@ class GerenciadorUsuarios:
         
         if not row:
             cursor.close()
+            rastreador.registrar_falha(email, ip, usuario_existe=False)
             return None
         
         # Verificar se usuário está ativo
@@ -287,15 +312,23 @@ class GerenciadorUsuarios:
         
         # Verificar senha
         if not verificar_senha(senha, row.hashed_senha):
-            # Registrar login falho
-            cursor.execute("EXEC supply_chain.sp_registrar_login_falho @email = ?", email.lower())
-            self.conn.commit()
+            # Registrar login falho (gravado em lote, em segundo plano, pelo rastreador)
+            rastreador.registrar_falha(email, ip)
             cursor.close()
             raise Exception("Senha incorreta")
         
+        # Regerar hash com custo diferente da política (BCRYPT_ROUNDS)
+        if precisa_rehash(row.hashed_senha):
+            cursor.execute("""
+                EXEC supply_chain.sp_alterar_senha 
+                    @usuario_id = ?,
+                    @nova_senha_hash = ?
+            """, row.id, hash_senha(senha))
+        
         # Atualizar último acesso
         cursor.execute("EXEC supply_chain.sp_atualizar_ultimo_acesso @usuario_id = ?", row.id)
         self.conn.commit()
+        rastreador.registrar_sucesso(email)
         
         cursor.close()
         
@@ -348,6 +381,7 @@ class GerenciadorUsuarios:
         
         self.conn.commit()
         cursor.close()
+        invalidar_usuario(usuario_id)
         
         return {
             'sucesso': True,
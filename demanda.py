@@ -0,0 +1,135 @@
+"""
+Motor de Demanda - Nexum Supply Chain
+Recalcula o CMM (consumo médio mensal) de cada produto a partir dos eventos de
+venda, de forma incremental: cada produto tem um buffer circular com um bucket
+por mês da janela (CMM_JANELA_MESES), e cada venda custa O(1).
+
+    cmm = soma das quantidades nos últimos `janela_meses` meses / janela_meses
+
+A janela inclui o mês corrente. Só produtos que já tiveram venda são
+recalculados; os demais mantêm o cmm carregado do CSV. O cmm é publicado no
+armazenamento de produtos configurado (ArmazenamentoEstoque.atualizar_cmm).
+
+Enquanto o produto não tem `janela_meses` meses de histórico, os meses ainda
+não observados entram com o cmm que o produto tinha antes da primeira venda
+(a "base", guardada em supply_chain.vendas_cmm_base); sem base, a soma é dividida
+só pelos meses observados. Assim a primeira venda não derruba um cmm de 474
+para 1/12.
+"""
+
+import os
+from datetime import date
+from typing import Dict, Iterable, Optional
+
+from vendas_agregadas import mes_do_ordinal
+
+CMM_JANELA_MESES = int(os.getenv('CMM_JANELA_MESES', '12'))
+
+class _Janela:
+    """Buffer circular de buckets mensais de um produto."""
+
+    __slots__ = ('buckets', 'mes_topo', 'mes_inicio', 'total')
+
+    def __init__(self, janela: int, mes: int):
+        self.buckets = [0.0] * janela
+        self.mes_topo = mes
+        self.mes_inicio = mes  # Primeiro mês com venda (início do histórico observado)
+        self.total = 0.0
+
+    def avancar(self, mes: int):
+        """Move o topo da janela até `mes`, zerando os meses que saem (no máximo `janela` buckets)."""
+        janela = len(self.buckets)
+        if mes <= self.mes_topo:
+            return
+        for m in range(max(self.mes_topo + 1, mes - janela + 1), mes + 1):
+            posicao = m % janela
+            self.total -= self.buckets[posicao]
+            self.buckets[posicao] = 0.0
+        self.mes_topo = mes
+
+    def somar(self, mes: int, quantidade: float) -> bool:
+        """Soma no bucket do mês; False se o mês já saiu da janela."""
+        self.avancar(mes)
+        if mes <= self.mes_topo - len(self.buckets):
+            return False
+        self.buckets[mes % len(self.buckets)] += quantidade
+        self.total += quantidade
+        self.mes_inicio = min(self.mes_inicio, mes)
+        return True
+
+class MotorDemanda:
+    """CMM incremental por produto, publicado no cadastro de produtos."""
+
+    def __init__(self, janela_meses: int = CMM_JANELA_MESES, bases: Optional[Dict[str, Optional[float]]] = None):
+        self.janela_meses = janela_meses
+        self.bases: Dict[str, Optional[float]] = dict(bases or {})  # codigo -> cmm antes da primeira venda
+        self._janelas: Dict[str, _Janela] = {}
+        self._alterados = set()
+        self._mes_publicado: Optional[int] = None
+
+    @classmethod
+    def de_vendas(cls, vendas: Iterable[Dict], janela_meses: int = CMM_JANELA_MESES,
+                  bases: Optional[Dict[str, Optional[float]]] = None) -> "MotorDemanda":
+        """Reconstrói o estado a partir do histórico (vendas com 'codigo' e 'data_ordinal') e das bases gravadas."""
+        motor = cls(janela_meses, bases)
+        for venda in vendas:
+            if venda.get('codigo') and venda.get('data_ordinal') is not None:
+                motor.registrar(venda['codigo'], venda.get('quantidade', 1), venda['data_ordinal'])
+        return motor
+
+    def registrar(self, codigo: str, quantidade: float, ordinal: int):
+        """Consome um evento de venda (quantidade negativa desfaz uma venda removida)."""
+        mes = mes_do_ordinal(ordinal)
+        janela = self._janelas.get(codigo)
+        if janela is None:
+            janela = self._janelas[codigo] = _Janela(self.janela_meses, mes)
+        if janela.somar(mes, quantidade):
+            self._alterados.add(codigo)
+
+    def cmm(self, codigo: str, mes_atual: Optional[int] = None) -> Optional[float]:
+        """CMM do produto na janela que termina em `mes_atual` (padrão: mês corrente)."""
+        janela = self._janelas.get(codigo)
+        if janela is None:
+            return None
+        mes_atual = mes_atual if mes_atual is not None else mes_do_ordinal(date.today().toordinal())
+        janela.avancar(mes_atual)
+        total = max(janela.total, 0.0)
+        observados = min(max(mes_atual - janela.mes_inicio + 1, 1), self.janela_meses)
+        base = self.bases.get(codigo)
+        if observados < self.janela_meses:
+            if base is not None:
+                # Meses sem histórico ainda contam com o cmm de antes das vendas
+                return round((base * (self.janela_meses - observados) + total) / self.janela_meses, 4)
+            return round(total / observados, 4)
+        return round(total / self.janela_meses, 4)
+
+    def publicar(self, armazenamento, mes_atual: Optional[int] = None) -> Dict[str, Optional[float]]:
+        """
+        Grava {codigo: cmm} dos produtos com venda nova no armazenamento de
+        produtos (ArmazenamentoEstoque.atualizar_cmm). Na virada do mês todos
+        os produtos acompanhados são republicados, pois o mês mais antigo sai
+        da janela. Na primeira publicação de um produto o cmm que ele tem no
+        armazenamento (cmm_por_codigo) vira a sua base; retorna as bases novas
+        para serem gravadas junto com as vendas. Se a gravação falhar, os
+        produtos continuam pendentes.
+        """
+        mes_atual = mes_atual if mes_atual is not None else mes_do_ordinal(date.today().toordinal())
+        if mes_atual != self._mes_publicado:
+            self._alterados.update(self._janelas)
+            self._mes_publicado = mes_atual
+        if not self._alterados:
+            return {}
+
+        alterados, self._alterados = self._alterados, set()
+        sem_base = [codigo for codigo in alterados if codigo not in self.bases]
+        novas = {}
+        try:
+            novas = armazenamento.cmm_por_codigo(sem_base) if sem_base else {}
+            self.bases.update(novas)
+            armazenamento.atualizar_cmm({codigo: self.cmm(codigo, mes_atual) for codigo in alterados})
+        except Exception:
+            for codigo in novas:
+                del self.bases[codigo]
+            self._alterados |= alterados
+            raise
+        return novas
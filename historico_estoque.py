@@ -0,0 +1,288 @@
+"""
+Histórico de Estoque - Nexum Supply Chain
+Armazena snapshots do estoque (saldo_manut, cmm, provid_compras por codigo) ao
+longo do tempo, em formato colunar e append-only, particionado por data:
+
+    historico/
+        codigos.txt                  dicionário global (linha N = id N do codigo)
+        2025-10-01/
+            parte-0000/              um snapshot: um .npy por coluna, ordenado por codigo
+                codigo.npy  abc.npy  saldo_manut.npy  cmm.npy  provid_compras.npy  nulos.npy
+
+As consultas listam apenas as pastas de data do intervalo e abrem só as colunas
+necessárias (em mmap), então o custo não cresce com o histórico fora do intervalo.
+Quando há mais de um snapshot no mesmo dia, vale o mais recente. Métricas vazias
+no CSV ficam marcadas em nulos.npy (bit i = COLUNAS_METRICAS[i]): a série as
+devolve como NaN e a contagem de rupturas as ignora.
+
+Uso:
+    python historico_estoque.py registrar dados_hackathon.csv --data 2025-10-01
+    python historico_estoque.py serie ROXR-033849 --dias 90
+    python historico_estoque.py rupturas --inicio 2025-07-01 --fim 2025-10-01
+"""
+
+import os
+import time
+import argparse
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+HISTORICO_DIR = os.getenv(
+    "NEXUM_HISTORICO_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'historico')
+)
+
+ARQUIVO_DICIONARIO = 'codigos.txt'
+# Quanto um processo espera a trava do dicionário antes de considerá-la abandonada
+HISTORICO_TRAVA_ESPERA = float(os.getenv('NEXUM_HISTORICO_TRAVA_ESPERA', '30'))
+CLASSES_ABC = ('A', 'B', 'C')
+
+# Colunas gravadas em cada snapshot e seus tipos em disco
+COLUNAS_SNAPSHOT = {
+    'codigo': np.int32,
+    'abc': np.int8,
+    'saldo_manut': np.int64,
+    'cmm': np.float64,
+    'provid_compras': np.int64,
+    'nulos': np.uint8,
+}
+COLUNAS_METRICAS = ('saldo_manut', 'cmm', 'provid_compras')
+
+def _formatar_data(data: Union[str, date, None]) -> str:
+    if data is None:
+        return date.today().isoformat()
+    if isinstance(data, date):
+        return data.isoformat()
+    return date.fromisoformat(data).isoformat()
+
+class HistoricoEstoque:
+    """Store colunar de snapshots do estoque, particionado por data."""
+
+    def __init__(self, diretorio: str = HISTORICO_DIR):
+        self.diretorio = diretorio
+        self._codigos: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._carregar_dicionario()
+
+    # --- Dicionário de códigos ---
+
+    def _carregar_dicionario(self):
+        caminho = os.path.join(self.diretorio, ARQUIVO_DICIONARIO)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                self._codigos = f.read().splitlines()
+        except FileNotFoundError:
+            self._codigos = []
+        self._ids = {codigo: i for i, codigo in enumerate(self._codigos)}
+
+    @contextmanager
+    def _travar_dicionario(self):
+        """Trava entre processos (criação exclusiva de arquivo) para reler e anexar ao dicionário."""
+        os.makedirs(self.diretorio, exist_ok=True)
+        trava = os.path.join(self.diretorio, f".{ARQUIVO_DICIONARIO}.trava")
+        limite = time.monotonic() + HISTORICO_TRAVA_ESPERA
+        while True:
+            try:
+                descritor = os.open(trava, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                if time.monotonic() >= limite:
+                    # Trava abandonada (processo que morreu escrevendo): assume o dicionário
+                    descritor = None
+                    break
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            if descritor is not None:
+                os.close(descritor)
+            try:
+                os.remove(trava)
+            except OSError:
+                pass
+
+    def _codificar(self, codigos: Iterable[str]) -> np.ndarray:
+        """Traduz códigos para ids, anexando ao dicionário os que ainda não existem."""
+        inversos, categorias = pd.factorize(pd.Index(codigos).astype(str))
+        if any(c not in self._ids for c in categorias):
+            with self._travar_dicionario():
+                # Outro processo pode ter anexado códigos desde a última leitura: os ids
+                # só são atribuídos depois de reler o arquivo, com a trava
+                self._carregar_dicionario()
+                novos = [c for c in categorias if c not in self._ids]
+                if novos:
+                    with open(os.path.join(self.diretorio, ARQUIVO_DICIONARIO), 'a', encoding='utf-8') as f:
+                        f.write(''.join(f"{c}\n" for c in novos))
+                    for c in novos:
+                        self._ids[c] = len(self._codigos)
+                        self._codigos.append(c)
+        ids_categorias = np.fromiter((self._ids[c] for c in categorias), dtype=np.int32, count=len(categorias))
+        return ids_categorias[inversos]
+
+    def id_do_codigo(self, codigo: str) -> Optional[int]:
+        return self._ids.get(codigo)
+
+    # --- Escrita ---
+
+    def registrar_snapshot(self, df: pd.DataFrame, data: Union[str, date, None] = None) -> str:
+        """Grava o estado atual (colunas codigo, abc e métricas) como novo snapshot da data."""
+        data = _formatar_data(data)
+        ids = self._codificar(df['codigo'])
+        ordem = np.argsort(ids, kind='stable')
+
+        abc = pd.Categorical(df['abc'], categories=CLASSES_ABC).codes.astype(np.int8)
+        colunas = {'codigo': ids, 'abc': abc}
+        nulos = np.zeros(len(df), dtype=np.uint8)
+        for bit, nome in enumerate(COLUNAS_METRICAS):
+            valores = pd.to_numeric(df[nome], errors='coerce')
+            ausentes = valores.isna().to_numpy()
+            nulos |= ausentes.astype(np.uint8) << bit
+            # Sem o 0 no lugar do vazio, o cast para int64 gravaria INT64_MIN
+            colunas[nome] = valores.fillna(0).to_numpy()
+        colunas['nulos'] = nulos
+
+        pasta_data = os.path.join(self.diretorio, data)
+        os.makedirs(pasta_data, exist_ok=True)
+        temporaria = os.path.join(pasta_data, f".parte-{os.getpid()}.tmp")
+        os.makedirs(temporaria, exist_ok=True)
+        for nome, dtype in COLUNAS_SNAPSHOT.items():
+            np.save(os.path.join(temporaria, f"{nome}.npy"), np.asarray(colunas[nome], dtype=dtype)[ordem])
+
+        # A parte só fica visível para as consultas depois do rename (atômico)
+        while True:
+            destino = os.path.join(pasta_data, f"parte-{len(self._partes_do_dia(pasta_data)):04d}")
+            try:
+                os.rename(temporaria, destino)
+                return destino
+            except OSError:
+                if not os.path.exists(destino):
+                    raise
+
+    def registrar_csv(self, csv_path: str, data: Union[str, date, None] = None) -> str:
+        colunas = ['codigo', 'abc', *COLUNAS_METRICAS]
+        df = pd.read_csv(csv_path, delimiter=';', usecols=colunas, encoding='utf-8-sig',
+                         dtype={'codigo': str, 'abc': str})
+        return self.registrar_snapshot(df, data)
+
+    # --- Leitura ---
+
+    @staticmethod
+    def _partes_do_dia(pasta_data: str) -> List[str]:
+        try:
+            return sorted(p for p in os.listdir(pasta_data) if p.startswith('parte-'))
+        except FileNotFoundError:
+            return []
+
+    def datas(self, inicio: Union[str, date, None] = None, fim: Union[str, date, None] = None) -> List[str]:
+        """Datas com snapshot no intervalo [inicio, fim], em ordem."""
+        try:
+            nomes = os.listdir(self.diretorio)
+        except FileNotFoundError:
+            return []
+        inicio = _formatar_data(inicio) if inicio else '0000-00-00'
+        fim = _formatar_data(fim) if fim else '9999-99-99'
+        # Nomes ISO ordenam como datas: o filtro não abre nenhuma pasta fora do intervalo
+        return sorted(n for n in nomes if len(n) == 10 and n[4] == '-' and inicio <= n <= fim)
+
+    def _particoes(self, inicio, fim) -> List[Tuple[str, str]]:
+        """(data, pasta do snapshot mais recente da data) para cada dia do intervalo."""
+        particoes = []
+        for data in self.datas(inicio, fim):
+            pasta_data = os.path.join(self.diretorio, data)
+            partes = self._partes_do_dia(pasta_data)
+            if partes:
+                particoes.append((data, os.path.join(pasta_data, partes[-1])))
+        return particoes
+
+    @staticmethod
+    def _coluna(pasta: str, nome: str) -> np.ndarray:
+        return np.load(os.path.join(pasta, f"{nome}.npy"), mmap_mode='r')
+
+    @classmethod
+    def _validos(cls, pasta: str, nomes: Iterable[str], posicoes=slice(None)) -> Union[np.ndarray, bool]:
+        """Máscara das linhas com todas as métricas `nomes` preenchidas (snapshots antigos: todas)."""
+        try:
+            nulos = cls._coluna(pasta, 'nulos')[posicoes]
+        except FileNotFoundError:
+            return True
+        bits = sum(1 << COLUNAS_METRICAS.index(nome) for nome in nomes if nome in COLUNAS_METRICAS)
+        return (nulos & bits) == 0
+
+    def serie_sku(self, codigo: str, inicio=None, fim=None, colunas: Iterable[str] = COLUNAS_METRICAS) -> pd.DataFrame:
+        """Série de um SKU no intervalo, uma linha por data em que ele aparece."""
+        colunas = list(colunas)
+        id_codigo = self.id_do_codigo(codigo)
+        linhas, datas = [], []
+        if id_codigo is not None:
+            for data, pasta in self._particoes(inicio, fim):
+                # Snapshot ordenado por codigo: busca binária e leitura de uma única posição
+                ids = self._coluna(pasta, 'codigo')
+                pos = int(np.searchsorted(ids, id_codigo))
+                if pos < len(ids) and ids[pos] == id_codigo:
+                    datas.append(data)
+                    linhas.append([self._coluna(pasta, nome)[pos].item() if self._validos(pasta, [nome], pos)
+                                   else np.nan for nome in colunas])
+        return pd.DataFrame(linhas, columns=colunas, index=pd.Index(pd.to_datetime(datas), name='data'))
+
+    def rupturas_por_dia(self, inicio=None, fim=None) -> pd.DataFrame:
+        """Quantidade de SKUs em ruptura (sem saldo e com consumo) por dia e classe ABC."""
+        contagens, datas = [], []
+        for data, pasta in self._particoes(inicio, fim):
+            ruptura = ((self._coluna(pasta, 'saldo_manut') <= 0) & (self._coluna(pasta, 'cmm') > 0)
+                       & self._validos(pasta, ('saldo_manut', 'cmm')))
+            abc = self._coluna(pasta, 'abc')[ruptura]
+            # Códigos -1 (classe desconhecida) vão para a última posição
+            contagens.append(np.bincount(abc.astype(np.int64) % (len(CLASSES_ABC) + 1), minlength=len(CLASSES_ABC) + 1))
+            datas.append(data)
+        resultado = pd.DataFrame(contagens, columns=list(CLASSES_ABC) + ['?'],
+                                 index=pd.Index(pd.to_datetime(datas), name='data'), dtype=np.int64)
+        if not resultado['?'].any():
+            resultado = resultado.drop(columns='?')
+        return resultado
+
+def main():
+    parser = argparse.ArgumentParser(description="Histórico colunar de snapshots do estoque.")
+    parser.add_argument("--diretorio", default=HISTORICO_DIR, help="Pasta do histórico.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_registrar = sub.add_parser("registrar", help="Grava um CSV como snapshot de uma data.")
+    p_registrar.add_argument("csv", help="Arquivo no formato de dados_hackathon.csv.")
+    p_registrar.add_argument("--data", default=None, help="Data do snapshot (AAAA-MM-DD, padrão: hoje).")
+
+    p_serie = sub.add_parser("serie", help="Série de saldo/CMM/compras de um SKU.")
+    p_serie.add_argument("codigo")
+    p_serie.add_argument("--dias", type=int, default=90, help="Janela até --fim (padrão: 90).")
+    p_serie.add_argument("--fim", default=None, help="Último dia da janela (padrão: hoje).")
+
+    p_rupturas = sub.add_parser("rupturas", help="Rupturas por dia e classe ABC.")
+    p_rupturas.add_argument("--inicio", default=None)
+    p_rupturas.add_argument("--fim", default=None)
+
+    args = parser.parse_args()
+    historico = HistoricoEstoque(args.diretorio)
+
+    if args.comando == "registrar":
+        destino = historico.registrar_csv(args.csv, args.data)
+        print(f"✅ Snapshot gravado em {destino}")
+    elif args.comando == "serie":
+        fim = date.fromisoformat(_formatar_data(args.fim))
+        serie = historico.serie_sku(args.codigo, fim - timedelta(days=args.dias), fim)
+        if serie.empty:
+            print(f"❌ Nenhum registro de {args.codigo} no período.")
+        else:
+            print(f"📈 {args.codigo}: {len(serie)} dias")
+            print(serie.to_string())
+    elif args.comando == "rupturas":
+        rupturas = historico.rupturas_por_dia(args.inicio, args.fim)
+        if rupturas.empty:
+            print("❌ Nenhum snapshot no período.")
+        else:
+            print("🚨 Rupturas por dia e classe ABC:")
+            print(rupturas.to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Importação de Usuários em Lote - Nexum Supply Chain
+Cadastra centenas de usuários de uma vez (ex.: abertura de um novo depósito)
+a partir de um CSV ou JSON com os campos:
+    nome, sobrenome, data_nascimento, cpf, funcao, email, senha
+
+1. Valida todos os registros antes de tocar no banco e reporta todos os erros
+   de cada linha (não só o primeiro).
+2. Descarta CPFs/emails já cadastrados (consulta em lotes).
+3. Gera os hashes bcrypt em paralelo, um processo por núcleo.
+4. Insere em lotes sobre uma única conexão do pool.
+
+Uso:
+    python importar_usuarios.py usuarios.csv
+    python importar_usuarios.py usuarios.json --validar
+    python importar_usuarios.py usuarios.csv --criado-por 1 --relatorio relatorio.json
+"""
+
+import os
+import csv
+import json
+import time
+import argparse
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from servico_senhas import BCRYPT_ROUNDS, gerar_hashes
+from validacao_usuarios import FUNCOES_VALIDAS, validar_cpf, validar_email, erros_senha, limpar_cpf
+
+CAMPOS = ['nome', 'sobrenome', 'data_nascimento', 'cpf', 'funcao', 'email', 'senha']
+FORMATOS_DATA = ('%Y-%m-%d', '%d/%m/%Y')
+
+def ler_usuarios(caminho: str) -> List[Dict]:
+    """Lê os registros do arquivo; cada um recebe a 'linha' de origem para o relatório."""
+    if caminho.lower().endswith('.json'):
+        with open(caminho, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        registros = dados.get('users', []) if isinstance(dados, dict) else dados
+        return [dict(registro, linha=i) for i, registro in enumerate(registros, start=1)]
+
+    with open(caminho, 'r', encoding='utf-8-sig', newline='') as f:
+        amostra = f.read(4096)
+        f.seek(0)
+        delimitador = ';' if amostra.count(';') >= amostra.count(',') else ','
+        # Linha 1 é o cabeçalho
+        return [dict(registro, linha=i) for i, registro in enumerate(csv.DictReader(f, delimiter=delimitador), start=2)]
+
+def converter_data(valor) -> Optional[date]:
+    if isinstance(valor, date):
+        return valor
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(str(valor).strip(), formato).date()
+        except ValueError:
+            continue
+    return None
+
+def validar_usuarios(registros: List[Dict]) -> Tuple[List[Dict], Dict[int, List[str]]]:
+    """
+    Valida todos os registros. Retorna os válidos (normalizados) e {linha: [erros]}.
+    Também acusa CPF/email repetidos dentro do próprio arquivo.
+    """
+    hoje = date.today()
+    validos, erros = [], {}
+    cpfs_vistos, emails_vistos = {}, {}
+
+    for registro in registros:
+        linha = registro['linha']
+        problemas = [f"Campo obrigatório ausente: {campo}." for campo in CAMPOS if not str(registro.get(campo) or '').strip()]
+
+        cpf = limpar_cpf(str(registro.get('cpf') or ''))
+        email = str(registro.get('email') or '').strip().lower()
+        funcao = str(registro.get('funcao') or '').strip().lower()
+        senha = str(registro.get('senha') or '')
+        nascimento = converter_data(registro.get('data_nascimento'))
+
+        if cpf and not validar_cpf(cpf):
+            problemas.append("CPF inválido.")
+        if email and not validar_email(email):
+            problemas.append("Email inválido.")
+        if funcao and funcao not in FUNCOES_VALIDAS:
+            problemas.append(f"Função inválida. Use: {', '.join(FUNCOES_VALIDAS)}.")
+        if senha:
+            problemas.extend(erros_senha(senha))
+        if registro.get('data_nascimento') and (nascimento is None or nascimento >= hoje):
+            problemas.append("Data de nascimento inválida (use AAAA-MM-DD ou DD/MM/AAAA, anterior a hoje).")
+
+        if cpf and cpf in cpfs_vistos:
+            problemas.append(f"CPF repetido no arquivo (linha {cpfs_vistos[cpf]}).")
+        if email and email in emails_vistos:
+            problemas.append(f"Email repetido no arquivo (linha {emails_vistos[email]}).")
+        if cpf:
+            cpfs_vistos.setdefault(cpf, linha)
+        if email:
+            emails_vistos.setdefault(email, linha)
+
+        if problemas:
+            erros[linha] = problemas
+            continue
+        validos.append({
+            'linha': linha,
+            'nome': str(registro['nome']).strip(),
+            'sobrenome': str(registro['sobrenome']).strip(),
+            'data_nascimento': nascimento,
+            'cpf': cpf,
+            'funcao': funcao,
+            'email': email,
+            'senha': senha,
+        })
+    return validos, erros
+
+def importar(caminho: str, criado_por: Optional[int] = None, somente_validar: bool = False,
+             rounds: int = BCRYPT_ROUNDS, processos: Optional[int] = None, tamanho_lote: int = 200) -> Dict:
+    """Executa a importação completa e retorna o relatório."""
+    tempos = {}
+    inicio = time.perf_counter()
+    registros = ler_usuarios(caminho)
+    validos, erros = validar_usuarios(registros)
+    tempos['validacao_s'] = time.perf_counter() - inicio
+    print(f"🔎 {len(registros)} registros lidos: {len(validos)} válidos, {len(erros)} com erro")
+
+    inseridos = 0
+    if not somente_validar and validos:
+        # Importado só aqui: --validar roda sem o driver ODBC (pyodbc)
+        from user_manager import GerenciadorUsuarios
+        gerenciador = GerenciadorUsuarios()
+
+        etapa = time.perf_counter()
+        cpfs_existentes, emails_existentes = gerenciador.cadastros_existentes(
+            [u['cpf'] for u in validos], [u['email'] for u in validos])
+        novos = []
+        for usuario in validos:
+            problemas = []
+            if usuario['cpf'] in cpfs_existentes:
+                problemas.append("CPF já cadastrado no sistema.")
+            if usuario['email'] in emails_existentes:
+                problemas.append("Email já cadastrado no sistema.")
+            if problemas:
+                erros[usuario['linha']] = problemas
+            else:
+                novos.append(usuario)
+        tempos['consulta_existentes_s'] = time.perf_counter() - etapa
+
+        etapa = time.perf_counter()
+        print(f"🔐 Gerando {len(novos)} hashes bcrypt (custo {rounds}) em paralelo...")
+        hashes = gerar_hashes([u['senha'] for u in novos], rounds=rounds, processos=processos)
+        tempos['hash_s'] = time.perf_counter() - etapa
+
+        etapa = time.perf_counter()
+        print(f"💾 Inserindo em lotes de {tamanho_lote}...")
+        linhas = [(u['nome'], u['sobrenome'], u['data_nascimento'], u['cpf'], u['funcao'], u['email'], h, criado_por)
+                  for u, h in zip(novos, hashes)]
+        falhas = gerenciador.inserir_usuarios_em_lote(linhas, tamanho_lote)
+        for indice, mensagem in falhas:
+            erros[novos[indice]['linha']] = [f"Erro ao inserir: {mensagem}"]
+        inseridos = len(novos) - len(falhas)
+        tempos['insercao_s'] = time.perf_counter() - etapa
+
+    tempos['total_s'] = time.perf_counter() - inicio
+    emails = {r['linha']: r.get('email') for r in registros}
+    return {
+        'arquivo': os.path.basename(caminho),
+        'total': len(registros),
+        'validos': len(validos),
+        'inseridos': inseridos,
+        'rejeitados': len(erros),
+        'erros': [{'linha': linha, 'email': emails.get(linha), 'erros': erros[linha]} for linha in sorted(erros)],
+        'tempos': {etapa: round(segundos, 3) for etapa, segundos in tempos.items()},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa usuários em lote a partir de CSV ou JSON.")
+    parser.add_argument("arquivo", help="CSV (; ou ,) ou JSON (lista ou {\"users\": [...]}).")
+    parser.add_argument("--validar", action="store_true", help="Só valida o arquivo, sem gravar no banco.")
+    parser.add_argument("--criado-por", type=int, default=None, help="Id do usuário administrador responsável.")
+    parser.add_argument("--processos", type=int, default=None, help="Processos para o bcrypt (padrão: núcleos da CPU).")
+    parser.add_argument("--lote", type=int, default=200, help="Usuários por lote de inserção (padrão: 200).")
+    parser.add_argument("--relatorio", default=None, help="Salva o relatório completo em JSON.")
+    args = parser.parse_args()
+
+    relatorio = importar(args.arquivo, args.criado_por, args.validar, processos=args.processos, tamanho_lote=args.lote)
+
+    for erro in relatorio['erros'][:20]:
+        print(f"   ❌ Linha {erro['linha']} ({erro['email']}): {' '.join(erro['erros'])}")
+    if len(relatorio['erros']) > 20:
+        print(f"   ... e mais {len(relatorio['erros']) - 20} linha(s) com erro")
+    print(f"\n✅ {relatorio['inseridos']} usuário(s) inserido(s), {relatorio['rejeitados']} rejeitado(s) "
+          f"em {relatorio['tempos']['total_s']:.1f}s")
+
+    if args.relatorio:
+        with open(args.relatorio, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"📄 Relatório salvo em {args.relatorio}")
+
+if __name__ == "__main__":
+    main()
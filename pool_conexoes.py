@@ -0,0 +1,210 @@
+"""
+Pool de Conexões - Nexum Supply Chain
+Pool thread-safe e limitado de conexões DB-API (pyodbc, sqlite3, ...), para não
+pagar um handshake TLS com o Azure SQL a cada operação.
+
+- Limite de conexões abertas; quem excede espera até `timeout_espera`.
+- Teste de saúde (`SELECT 1`) ao emprestar conexões que ficaram ociosas.
+- Reciclagem de conexões com mais de `vida_maxima` segundos.
+- Métricas de uso e de espera (metricas()).
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+POOL_TAMANHO_MAX = int(os.getenv('POOL_TAMANHO_MAX', '10'))
+POOL_TIMEOUT_ESPERA = float(os.getenv('POOL_TIMEOUT_ESPERA', '30'))
+POOL_VIDA_MAXIMA = float(os.getenv('POOL_VIDA_MAXIMA', '1800'))
+POOL_OCIOSIDADE_TESTE = float(os.getenv('POOL_OCIOSIDADE_TESTE', '30'))
+
+class PoolEsgotado(TimeoutError):
+    """Nenhuma conexão ficou livre dentro do tempo de espera."""
+
+class PoolConexoes:
+    """Pool limitado de conexões criadas por `fabrica`."""
+
+    def __init__(self, fabrica: Callable, tamanho_max: int = POOL_TAMANHO_MAX,
+                 timeout_espera: float = POOL_TIMEOUT_ESPERA, vida_maxima: float = POOL_VIDA_MAXIMA,
+                 ociosidade_teste: float = POOL_OCIOSIDADE_TESTE, consulta_saude: str = "SELECT 1"):
+        self.fabrica = fabrica
+        self.tamanho_max = tamanho_max
+        self.timeout_espera = timeout_espera
+        self.vida_maxima = vida_maxima
+        self.ociosidade_teste = ociosidade_teste
+        self.consulta_saude = consulta_saude
+
+        self._condicao = threading.Condition()
+        self._ociosas = deque()  # (conexão, criada_em, devolvida_em)
+        self._em_uso: Dict[int, tuple] = {}  # id(conexão) -> (criada_em, emprestada_em)
+        self._abertas = 0
+        self._fechado = False
+        self._metricas = {
+            'emprestimos': 0, 'criadas': 0, 'recicladas': 0, 'descartadas': 0, 'timeouts': 0,
+            'esperas': 0, 'espera_total_ms': 0.0, 'espera_max_ms': 0.0, 'uso_total_ms': 0.0,
+        }
+
+    # --- Empréstimo e devolução ---
+
+    def obter(self, timeout: Optional[float] = None):
+        """Empresta uma conexão saudável, criando uma nova se houver vaga."""
+        timeout = self.timeout_espera if timeout is None else timeout
+        inicio = time.monotonic()
+        limite = inicio + timeout
+        esperou = False
+
+        with self._condicao:
+            while True:
+                if self._fechado:
+                    raise RuntimeError("Pool de conexões fechado.")
+                if self._ociosas:
+                    conn, criada_em, devolvida_em = self._ociosas.pop()
+                    break
+                if self._abertas < self.tamanho_max:
+                    # Reserva a vaga; a conexão é aberta fora do lock
+                    self._abertas += 1
+                    conn = None
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self._metricas['timeouts'] += 1
+                    raise PoolEsgotado(f"Nenhuma conexão livre após {timeout:.1f}s (máximo: {self.tamanho_max}).")
+                esperou = True
+                self._condicao.wait(restante)
+
+        agora = time.monotonic()
+        if conn is not None:
+            if agora - criada_em > self.vida_maxima:
+                self._fechar(conn)
+                conn = None
+                self._contar('recicladas')
+            elif agora - devolvida_em > self.ociosidade_teste and not self._saudavel(conn):
+                self._fechar(conn)
+                conn = None
+                self._contar('descartadas')
+
+        if conn is None:
+            try:
+                conn = self.fabrica()
+            except Exception:
+                self._liberar_vaga()
+                raise
+            criada_em = time.monotonic()
+            self._contar('criadas')
+
+        espera_ms = (time.monotonic() - inicio) * 1000
+        with self._condicao:
+            self._em_uso[id(conn)] = (criada_em, time.monotonic())
+            self._metricas['emprestimos'] += 1
+            if esperou:
+                self._metricas['esperas'] += 1
+            self._metricas['espera_total_ms'] += espera_ms
+            self._metricas['espera_max_ms'] = max(self._metricas['espera_max_ms'], espera_ms)
+        return conn
+
+    def devolver(self, conn, descartar: bool = False):
+        """Devolve a conexão ao pool (descarta se pedido ou se não for possível limpá-la)."""
+        with self._condicao:
+            criada_em, emprestada_em = self._em_uso.pop(id(conn))
+            self._metricas['uso_total_ms'] += (time.monotonic() - emprestada_em) * 1000
+
+        if not descartar:
+            try:
+                # Desfaz transação pendente para a próxima requisição começar limpa
+                conn.rollback()
+            except Exception:
+                descartar = True
+
+        if descartar or self._fechado:
+            self._fechar(conn)
+            self._liberar_vaga()
+            if descartar:
+                self._contar('descartadas')
+            return
+
+        with self._condicao:
+            self._ociosas.append((conn, criada_em, time.monotonic()))
+            self._condicao.notify()
+
+    @contextmanager
+    def conexao(self, timeout: Optional[float] = None):
+        """Empresta uma conexão durante o bloco `with`."""
+        conn = self.obter(timeout)
+        try:
+            yield conn
+        except Exception:
+            self.devolver(conn, descartar=not self._saudavel(conn))
+            raise
+        else:
+            self.devolver(conn)
+
+    # --- Manutenção ---
+
+    def fechar(self):
+        """Fecha as conexões ociosas; as emprestadas são fechadas ao serem devolvidas."""
+        with self._condicao:
+            self._fechado = True
+            ociosas = list(self._ociosas)
+            self._ociosas.clear()
+            self._abertas -= len(ociosas)
+            self._condicao.notify_all()
+        for conn, _, _ in ociosas:
+            self._fechar(conn)
+
+    def metricas(self) -> Dict:
+        with self._condicao:
+            metricas = dict(self._metricas)
+            metricas.update(
+                tamanho_max=self.tamanho_max,
+                abertas=self._abertas,
+                em_uso=len(self._em_uso),
+                ociosas=len(self._ociosas),
+            )
+        emprestimos = metricas['emprestimos'] or 1
+        metricas['espera_media_ms'] = round(metricas['espera_total_ms'] / emprestimos, 3)
+        metricas['uso_medio_ms'] = round(metricas['uso_total_ms'] / emprestimos, 3)
+        return metricas
+
+    def _saudavel(self, conn) -> bool:
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.consulta_saude)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _fechar(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _liberar_vaga(self):
+        with self._condicao:
+            self._abertas -= 1
+            self._condicao.notify()
+
+    def _contar(self, chave: str):
+        with self._condicao:
+            self._metricas[chave] += 1
+
+# --- Pools compartilhados ---
+
+_pools: Dict[str, PoolConexoes] = {}
+_pools_lock = threading.Lock()
+
+def pool_compartilhado(nome: str, fabrica: Callable, **opcoes) -> PoolConexoes:
+    """Pool único por nome no processo (criado na primeira chamada)."""
+    with _pools_lock:
+        pool = _pools.get(nome)
+        if pool is None:
+            pool = _pools[nome] = PoolConexoes(fabrica, **opcoes)
+        return pool
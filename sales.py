@@ -1,5 +1,133 @@
-from datetime import datetime
-from database import fetch_all, fetch_one, execute_query
+import math
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from armazenamento_estoque import armazenamento_estoque
+from pool_conexoes import pool_compartilhado
+from vendas_agregadas import AgregadoVendas, data_para_ordinal, ordinal_para_data
+from vendas_lote import ler_vendas, validar_vendas, gravar_vendas_sql
+from demanda import MotorDemanda
+
+# Arquivo SQLite local no lugar do Azure SQL (desenvolvimento/benchmarks); vazio usa a conexão AZURE_SQL_* do user_manager
+VENDAS_SQLITE = os.getenv('VENDAS_SQLITE', '')
+
+# Mesma forma de database/create_sales_table.sql
+SQLITE_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS supply_chain.vendas ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " nome_venda TEXT NOT NULL,"
+    " valor_venda REAL NOT NULL CHECK (valor_venda >= 0),"
+    " data_venda TEXT NOT NULL,"
+    " codigo TEXT NULL,"
+    " quantidade REAL NULL CHECK (quantidade IS NULL OR quantidade > 0))",
+    "CREATE INDEX IF NOT EXISTS supply_chain.IX_vendas_data ON vendas(data_venda)",
+    "CREATE INDEX IF NOT EXISTS supply_chain.IX_vendas_codigo ON vendas(codigo, data_venda) WHERE codigo IS NOT NULL",
+    "CREATE TABLE IF NOT EXISTS supply_chain.vendas_versao ("
+    " id INTEGER NOT NULL PRIMARY KEY CHECK (id = 1),"
+    " versao INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO supply_chain.vendas_versao (id, versao) VALUES (1, 0)",
+    "CREATE TABLE IF NOT EXISTS supply_chain.vendas_cmm_base ("
+    " codigo TEXT NOT NULL PRIMARY KEY,"
+    " cmm_base REAL NULL)",
+]
+
+_SELECT_VENDA = "SELECT id, nome_venda, valor_venda, data_venda, codigo, quantidade FROM supply_chain.vendas"
+
+# Agregados diários/mensais e motor de demanda (cmm) em memória, montados por GROUP BY em
+# supply_chain.vendas e mantidos por diferença; reconstruídos só se vendas_versao mudar por fora
+_agregado = None
+_motor = None
+_versao_db = None
+_lock = threading.RLock()
+
+def _conectar():
+    if not VENDAS_SQLITE:
+        # Importado aqui: o driver ODBC só é exigido quando as vendas ficam no Azure SQL
+        from user_manager import get_connection
+        return get_connection()
+    conn = sqlite3.connect(':memory:', timeout=60, check_same_thread=False)
+    conn.execute("ATTACH DATABASE ? AS supply_chain", (os.path.abspath(VENDAS_SQLITE),))
+    for comando in SQLITE_SCHEMA:
+        conn.execute(comando)
+    conn.commit()
+    return conn
+
+def pool_vendas():
+    """Pool de conexões de supply_chain.vendas compartilhado pelo processo."""
+    return pool_compartilhado(f'vendas:{VENDAS_SQLITE}', _conectar)
+
+# Consultas diretas em supply_chain.vendas, sobre o pool de vendas
+def fetch_all(query, params=()):
+    with pool_vendas().conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            colunas = [coluna[0] for coluna in cursor.description]
+            return [dict(zip(colunas, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+def fetch_one(query, params=()):
+    rows = fetch_all(query, params)
+    return rows[0] if rows else None
+
+def _incrementar_versao(cursor):
+    """Incrementa supply_chain.vendas_versao na transação do cursor e retorna o novo valor."""
+    cursor.execute("UPDATE supply_chain.vendas_versao SET versao = versao + 1")
+    cursor.execute("SELECT versao FROM supply_chain.vendas_versao")
+    return int(cursor.fetchone()[0])
+
+def execute_query(query, params=(), muitos=False, versionar=True):
+    """
+    Executa um comando (executemany com muitos=True) e, com versionar, incrementa
+    vendas_versao na mesma transação. Retorna (linhas afetadas, versão após a
+    escrita); sem linhas afetadas nada é confirmado e a versão é None.
+    """
+    with pool_vendas().conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            if muitos:
+                if hasattr(cursor, 'fast_executemany'):
+                    cursor.fast_executemany = True
+                cursor.executemany(query, params)
+                afetadas = len(params)
+            else:
+                cursor.execute(query, params)
+                afetadas = cursor.rowcount
+            if afetadas <= 0:
+                conn.rollback()
+                return 0, None
+            versao = _incrementar_versao(cursor) if versionar else None
+            conn.commit()
+            return afetadas, versao
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+def _inserir_venda(valores):
+    """INSERT de uma venda; retorna (id, versão após a escrita)."""
+    colunas = "nome_venda, valor_venda, data_venda, codigo, quantidade"
+    with pool_vendas().conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            if isinstance(conn, sqlite3.Connection):
+                cursor.execute(f"INSERT INTO supply_chain.vendas ({colunas}) VALUES (?, ?, ?, ?, ?)", valores)
+                sale_id = cursor.lastrowid
+            else:
+                cursor.execute(f"INSERT INTO supply_chain.vendas ({colunas}) OUTPUT INSERTED.id "
+                               "VALUES (?, ?, ?, ?, ?)", valores)
+                sale_id = int(cursor.fetchone()[0])
+            versao = _incrementar_versao(cursor)
+            conn.commit()
+            return sale_id, versao
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
 
 def validate_date_format(date_str):
     try:
@@ -8,47 +136,248 @@ def validate_date_format(date_str):
     except ValueError:
         return False
 
+def _validar_valor(sale_value):
+    """valor_venda como float; mesmo critério da importação em lote (vendas_lote.validar_vendas): finito e >= 0."""
+    try:
+        sale_value = float(sale_value)
+    except (ValueError, TypeError):
+        return None, "Valor de venda inválido!"
+    if not math.isfinite(sale_value):
+        return None, "Valor de venda inválido!"
+    if sale_value < 0:
+        return None, "Valor de venda negativo."
+    return sale_value, None
+
+def _data_sql(data_str):
+    """'DD/MM/AAAA' -> 'AAAA-MM-DD' (formato sem ambiguidade para a coluna DATE)."""
+    return datetime.strptime(data_str, "%d/%m/%Y").date().isoformat()
+
+def _ordinal_sql(valor):
+    """data_venda lida do banco (date no pyodbc, texto AAAA-MM-DD no SQLite) -> ordinal do dia."""
+    if hasattr(valor, 'toordinal'):
+        return valor.toordinal()
+    return date.fromisoformat(str(valor)[:10]).toordinal()
+
+def _venda(row):
+    """Linha de supply_chain.vendas no formato da API (data DD/MM/AAAA, DECIMAL como float)."""
+    if row is None:
+        return None
+    sale = dict(row)
+    sale['data_venda'] = ordinal_para_data(_ordinal_sql(sale['data_venda']))
+    sale['valor_venda'] = float(sale['valor_venda'])
+    if sale.get('quantidade') is not None:
+        sale['quantidade'] = float(sale['quantidade'])
+    return sale
+
+def _versao_banco():
+    row = fetch_one("SELECT versao FROM supply_chain.vendas_versao")
+    return int(row['versao']) if row else None
+
+def _sincronizar():
+    """Remonta agregados e motor de demanda por GROUP BY só se vendas_versao mudou desde a última escrita deste processo."""
+    global _agregado, _motor, _versao_db
+    with _lock:
+        # A versão é lida antes dos dados: uma escrita concorrente no meio só provoca nova remontagem depois
+        versao = _versao_banco()
+        if _agregado is None or versao != _versao_db:
+            dias = fetch_all("SELECT data_venda, COUNT(*) AS quantidade, SUM(valor_venda) AS soma "
+                             "FROM supply_chain.vendas GROUP BY data_venda")
+            _agregado = AgregadoVendas.de_dias(
+                (_ordinal_sql(d['data_venda']), d['quantidade'], float(d['soma'])) for d in dias)
+            demanda = fetch_all("SELECT codigo, data_venda, SUM(COALESCE(quantidade, 1)) AS quantidade "
+                                "FROM supply_chain.vendas WHERE codigo IS NOT NULL GROUP BY codigo, data_venda")
+            bases = {b['codigo']: float(b['cmm_base']) if b['cmm_base'] is not None else None
+                     for b in fetch_all("SELECT codigo, cmm_base FROM supply_chain.vendas_cmm_base")}
+            _motor = MotorDemanda.de_vendas(
+                ({'codigo': d['codigo'], 'quantidade': float(d['quantidade']),
+                  'data_ordinal': _ordinal_sql(d['data_venda'])} for d in demanda),
+                bases=bases)
+            _versao_db = versao
+        return _agregado, _motor
+
+def agregado_vendas():
+    """Agregados de vendas atualizados."""
+    return _sincronizar()[0]
+
+def motor_demanda():
+    """Motor de demanda (cmm por produto) atualizado."""
+    return _sincronizar()[1]
+
+def _evento_demanda(codigo, quantidade, ordinal, sinal=1):
+    """(codigo, quantidade, ordinal) da venda para o motor de demanda, ou None se não tiver produto."""
+    if not codigo or ordinal is None:
+        return None
+    return codigo, sinal * (quantidade or 1), ordinal
+
+def _aplicar_escrita(versao, remover=None, adicionar=None, adicionar_lote=None, eventos=(), escritas=1):
+    """
+    Aplica a diferença (ordinal, valor) aos agregados e os eventos ao motor de
+    demanda se as `escritas` transações (uma por lote na importação) foram as
+    únicas desde a última sincronização (versão anterior + escritas); senão o
+    estado em memória é descartado e remontado na próxima leitura. Depois
+    publica o cmm dos produtos afetados.
+    """
+    global _agregado, _versao_db
+    with _lock:
+        if _agregado is None or _versao_db is None or versao != _versao_db + escritas:
+            _agregado = None
+        else:
+            if remover and remover[0] is not None:
+                _agregado.remover(*remover)
+            if adicionar:
+                _agregado.adicionar(*adicionar)
+            if adicionar_lote is not None:
+                _agregado.adicionar_lote(*adicionar_lote)
+            for evento in eventos:
+                if evento:
+                    _motor.registrar(*evento)
+            _versao_db = versao
+        _publicar_cmm()
+
+def _publicar_cmm():
+    """Grava o cmm dos produtos com venda nova no armazenamento de estoque (ESTOQUE_BACKEND) e as bases novas."""
+    novas = motor_demanda().publicar(armazenamento_estoque())
+    if novas:
+        # cmm de antes da primeira venda de cada produto: completa a janela até ela ter um ano de histórico
+        execute_query("INSERT INTO supply_chain.vendas_cmm_base (codigo, cmm_base) SELECT ?, ? "
+                      "WHERE NOT EXISTS (SELECT 1 FROM supply_chain.vendas_cmm_base WHERE codigo = ?)",
+                      [(codigo, cmm, codigo) for codigo, cmm in novas.items()], muitos=True, versionar=False)
+
 def service_get_all_sales():
-    return fetch_all("SELECT * FROM supply_chain.vendas")
+    return [_venda(row) for row in fetch_all(f"{_SELECT_VENDA} ORDER BY id")]
 
 def service_get_sale(sale_id):
-    return fetch_one("SELECT * FROM supply_chain.vendas WHERE id = ?", (sale_id,))
+    try:
+        sale_id = int(sale_id)
+    except (ValueError, TypeError):
+        return None
+    return _venda(fetch_one(f"{_SELECT_VENDA} WHERE id = ?", (sale_id,)))
 
-def service_create_sale(name, sale_value, sale_date):
+def service_create_sale(name, sale_value, sale_date, product_code=None, quantity=1):
     if not sale_date or not validate_date_format(sale_date):
         return None, "Data inválida! Formato DD/MM/AAAA."
-    
-    query = 'INSERT INTO supply_chain.vendas (nome_venda, valor_venda, data_venda) VALUES (?, ?, ?)'
-    
-    success, result_or_error = execute_query(
-        query,
-        (name, sale_value, sale_date)
-    )
-    
-    if success:
-        return 'ID_INSERIDO', "Venda registrada com sucesso!"
-    else:
-        return None, f"Falha ao registrar venda: {result_or_error}"
+    sale_value, erro = _validar_valor(sale_value)
+    if erro:
+        return None, erro
+    try:
+        quantity = float(quantity)
+    except (ValueError, TypeError):
+        return None, "Quantidade inválida."
+    if not quantity > 0:
+        # Mesmo critério da importação em lote (vendas_lote.py): só quantidades positivas
+        return None, "Quantidade inválida."
+    # Venda ligada a um produto: alimenta o cmm calculado pelo motor de demanda
+    codigo, quantidade = (product_code, quantity) if product_code else (None, None)
+
+    with _lock:
+        _sincronizar()
+        try:
+            new_id, versao = _inserir_venda((name, sale_value, _data_sql(sale_date), codigo, quantidade))
+        except Exception as e:
+            return None, f"Falha ao registrar venda: {e}"
+        ordinal = data_para_ordinal(sale_date)
+        _aplicar_escrita(versao, adicionar=(ordinal, sale_value),
+                         eventos=[_evento_demanda(codigo, quantidade, ordinal)])
+    return new_id, "Venda registrada com sucesso!"
+
+def service_create_sales_bulk(content, filename=''):
+    """
+    Registra muitas vendas de uma vez (lista de dicts ou conteúdo CSV/JSON).
+    Linhas inválidas são rejeitadas com o número da linha; as válidas entram em
+    supply_chain.vendas por gravar_vendas_sql (lotes de 10.000 linhas em uma
+    conexão do pool, cada lote incrementando vendas_versao).
+    """
+    validas, erros = validar_vendas(ler_vendas(content, filename))
+    if len(validas):
+        versoes = []
+        with _lock:
+            _sincronizar()
+            with pool_vendas().conexao() as conn:
+                gravar_vendas_sql(conn, validas, antes_do_commit=lambda cursor: versoes.append(_incrementar_versao(cursor)))
+            ordinais = validas['data_ordinal'].tolist()
+            _aplicar_escrita(versoes[-1], escritas=len(versoes),
+                             adicionar_lote=(validas['data_ordinal'].to_numpy(), validas['valor_venda'].to_numpy()),
+                             eventos=[_evento_demanda(codigo, quantidade, ordinal) for codigo, quantidade, ordinal
+                                      in zip(validas['codigo'].tolist(), validas['quantidade'].tolist(), ordinais)])
+    return {
+        "inseridas": len(validas),
+        "rejeitadas": len(erros),
+        "erros": erros,
+    }
 
 def service_update_sale(sale_id, name, sale_value, sale_date):
-    current_sale = service_get_sale(sale_id)
-    if not current_sale: return False, "Venda não encontrada!"
     if sale_date and not validate_date_format(sale_date): return False, "Data de venda inválida! Formato DD/MM/AAAA."
-        
-    new_name = name if name is not None else current_sale.get('nome_venda')
-    new_value = sale_value if sale_value is not None else current_sale.get('valor_venda')
-    new_date = sale_date if sale_date is not None else current_sale.get('data_venda')
-    
-    query = 'UPDATE supply_chain.vendas SET nome_venda = ?, valor_venda = ?, data_venda = ? WHERE id = ?'
-    
-    success, updated_count = execute_query(
-        query,
-        (new_name, new_value, new_date, sale_id)
-    )
-    
-    return success and updated_count > 0, "Venda atualizada com sucesso!" if success and updated_count > 0 else "Venda não encontrada ou falha na atualização."
+    try:
+        sale_id = int(sale_id)
+    except (ValueError, TypeError):
+        return False, "Venda não encontrada ou falha na atualização."
+    if sale_value is not None:
+        sale_value, erro = _validar_valor(sale_value)
+        if erro:
+            return False, erro
+
+    with _lock:
+        _sincronizar()
+        current_sale = service_get_sale(sale_id)
+        if not current_sale: return False, "Venda não encontrada!"
+
+        new_name = name if name is not None else current_sale['nome_venda']
+        new_value = sale_value if sale_value is not None else current_sale['valor_venda']
+        new_date = sale_date if sale_date is not None else current_sale['data_venda']
+        updated_count, versao = execute_query(
+            'UPDATE supply_chain.vendas SET nome_venda = ?, valor_venda = ?, data_venda = ? WHERE id = ?',
+            (new_name, new_value, _data_sql(new_date), sale_id))
+        if not updated_count:
+            return False, "Venda não encontrada ou falha na atualização."
+
+        antes, depois = data_para_ordinal(current_sale['data_venda']), data_para_ordinal(new_date)
+        codigo, quantidade = current_sale.get('codigo'), current_sale.get('quantidade')
+        _aplicar_escrita(versao, remover=(antes, current_sale['valor_venda']), adicionar=(depois, new_value),
+                         eventos=[_evento_demanda(codigo, quantidade, antes, -1),
+                                  _evento_demanda(codigo, quantidade, depois)])
+    return True, "Venda atualizada com sucesso!"
 
 def service_remove_sale(sale_id):
-    query = 'DELETE FROM supply_chain.vendas WHERE id = ?'
-    success, deleted_count = execute_query(query, (sale_id,))
-    return success and deleted_count > 0
\ No newline at end of file
+    try:
+        sale_id = int(sale_id)
+    except (ValueError, TypeError):
+        return False
+    with _lock:
+        _sincronizar()
+        sale = service_get_sale(sale_id)
+        if not sale:
+            return False
+        deleted_count, versao = execute_query('DELETE FROM supply_chain.vendas WHERE id = ?', (sale_id,))
+        if not deleted_count:
+            return False
+        ordinal = data_para_ordinal(sale['data_venda'])
+        _aplicar_escrita(versao, remover=(ordinal, sale['valor_venda']),
+                         eventos=[_evento_demanda(sale.get('codigo'), sale.get('quantidade'), ordinal, -1)])
+    return True
+
+# --- Análises por período (agregados pré-calculados, O(buckets do intervalo)) ---
+
+def _intervalo(start_date=None, end_date=None, days=None):
+    """Converte DD/MM/AAAA (ou 'últimos N dias' até hoje/end_date) em ordinais; ValueError se inválido."""
+    fim = data_para_ordinal(end_date) if end_date else None
+    if days is not None:
+        fim = fim if fim is not None else datetime.now().toordinal()
+        return fim - int(days) + 1, fim
+    inicio = data_para_ordinal(start_date) if start_date else None
+    return inicio, fim
+
+def service_sales_total(start_date=None, end_date=None, days=None):
+    inicio, fim = _intervalo(start_date, end_date, days)
+    return agregado_vendas().total(inicio, fim)
+
+def service_sales_daily(start_date=None, end_date=None, days=None):
+    inicio, fim = _intervalo(start_date, end_date, days)
+    return agregado_vendas().serie_diaria(inicio, fim)
+
+def service_sales_monthly(start_date=None, end_date=None, days=None):
+    inicio, fim = _intervalo(start_date, end_date, days)
+    return agregado_vendas().serie_mensal(inicio, fim)
+
+def service_get_demand(product_code):
+    """CMM atual do produto calculado a partir das vendas (None se nunca vendido)."""
+    return motor_demanda().cmm(product_code)
@@ -0,0 +1,182 @@
+"""
+Serviço de Senhas - Nexum Supply Chain
+Hash e verificação bcrypt fora da thread da requisição: o trabalho roda em um
+pool de processos do tamanho dos núcleos, atrás de uma fila limitada.
+
+- Fila cheia: a chamada espera no máximo `espera_fila` e falha com
+  ServicoSenhasOcupado (backpressure), em vez de acumular logins.
+- Cada operação tem timeout; quem desiste não bloqueia a fila por mais tempo
+  do que o necessário (tarefas ainda não iniciadas são canceladas).
+
+O custo do bcrypt vem de BCRYPT_ROUNDS; para escolhê-lo pelo hardware:
+    python servico_senhas.py --alvo-ms 250
+"""
+
+import os
+import time
+import argparse
+import statistics
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturoTimeout
+from typing import Dict, List, Optional, Tuple
+
+import bcrypt
+
+SENHAS_PROCESSOS = int(os.getenv('SENHAS_PROCESSOS', str(os.cpu_count() or 1)))
+SENHAS_FILA_MAX = int(os.getenv('SENHAS_FILA_MAX', str(SENHAS_PROCESSOS * 4)))
+SENHAS_TIMEOUT = float(os.getenv('SENHAS_TIMEOUT', '5'))
+SENHAS_ESPERA_FILA = float(os.getenv('SENHAS_ESPERA_FILA', '1'))
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+BCRYPT_ALVO_MS = float(os.getenv('BCRYPT_ALVO_MS', '250'))
+
+class ServicoSenhasOcupado(RuntimeError):
+    """A fila de hash/verificação está cheia."""
+
+# --- Funções executadas nos processos do pool ---
+
+def _verificar(senha: bytes, hash_armazenado: bytes) -> bool:
+    return bcrypt.checkpw(senha, hash_armazenado)
+
+def _gerar_hash(senha: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(senha, bcrypt.gensalt(rounds=rounds))
+
+class ServicoSenhas:
+    """Pool de processos bcrypt com fila limitada, timeouts e métricas."""
+
+    def __init__(self, processos: int = SENHAS_PROCESSOS, fila_max: int = SENHAS_FILA_MAX,
+                 timeout: float = SENHAS_TIMEOUT, espera_fila: float = SENHAS_ESPERA_FILA):
+        self.processos = processos
+        self.fila_max = fila_max
+        self.timeout = timeout
+        self.espera_fila = espera_fila
+        # spawn: o servidor web é multithread, e fork com threads ativas não é seguro
+        self._executor = ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn'))
+        self._vagas = threading.BoundedSemaphore(fila_max)
+        self._lock = threading.Lock()
+        self._metricas = {'concluidas': 0, 'rejeitadas': 0, 'timeouts': 0, 'em_andamento': 0}
+
+    def _executar(self, funcao, *args, timeout: Optional[float] = None):
+        if not self._vagas.acquire(timeout=self.espera_fila):
+            self._contar('rejeitadas')
+            raise ServicoSenhasOcupado("Serviço de autenticação sobrecarregado, tente novamente.")
+        self._contar('em_andamento')
+        try:
+            futuro = self._executor.submit(funcao, *args)
+        except Exception:
+            self._finalizar()
+            raise
+        # A vaga só é liberada quando o processo termina (ou a tarefa é cancelada)
+        futuro.add_done_callback(lambda _: self._finalizar())
+        try:
+            resultado = futuro.result(timeout=self.timeout if timeout is None else timeout)
+        except FuturoTimeout:
+            futuro.cancel()
+            self._contar('timeouts')
+            raise TimeoutError("Tempo esgotado na verificação de senha.")
+        self._contar('concluidas')
+        return resultado
+
+    def verificar(self, senha: str, hash_armazenado: str, timeout: Optional[float] = None) -> bool:
+        """Equivalente a bcrypt.checkpw, executado no pool."""
+        return self._executar(_verificar, senha.encode('utf-8'), hash_armazenado.encode('utf-8'), timeout=timeout)
+
+    def gerar_hash(self, senha: str, rounds: int = BCRYPT_ROUNDS, timeout: Optional[float] = None) -> str:
+        """Equivalente a bcrypt.hashpw com um salt novo, executado no pool."""
+        return self._executar(_gerar_hash, senha.encode('utf-8'), rounds, timeout=timeout).decode('utf-8')
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            return dict(self._metricas, processos=self.processos, fila_max=self.fila_max)
+
+    def encerrar(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _finalizar(self):
+        self._vagas.release()
+        with self._lock:
+            self._metricas['em_andamento'] -= 1
+
+    def _contar(self, chave: str):
+        with self._lock:
+            self._metricas[chave] += 1
+
+# --- Hash em lote ---
+
+def gerar_hashes(senhas: List[str], rounds: int = BCRYPT_ROUNDS, processos: Optional[int] = None) -> List[str]:
+    """
+    Gera hashes de muitas senhas em paralelo, em um pool próprio (usado em
+    importações em lote, para não ocupar a fila dos logins).
+    """
+    if not senhas:
+        return []
+    processos = min(processos or SENHAS_PROCESSOS, len(senhas))
+    codificadas = [senha.encode('utf-8') for senha in senhas]
+    with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn')) as executor:
+        hashes = executor.map(_gerar_hash, codificadas, [rounds] * len(senhas),
+                              chunksize=max(1, len(senhas) // (processos * 4)))
+        return [h.decode('utf-8') for h in hashes]
+
+# --- Custo do bcrypt ---
+
+def custo_hash(hash_armazenado: str) -> int:
+    """Custo (rounds) gravado em um hash bcrypt ("$2b$12$...")."""
+    return int(hash_armazenado.split('$')[2])
+
+def precisa_rehash(hash_armazenado: str, rounds: int = BCRYPT_ROUNDS) -> bool:
+    """True se o hash foi gerado com um custo diferente da política atual."""
+    return custo_hash(hash_armazenado) != rounds
+
+def calibrar(alvo_ms: float = BCRYPT_ALVO_MS, minimo: int = 10, maximo: int = 16,
+             amostras: int = 3) -> Tuple[int, Dict[int, float]]:
+    """
+    Mede o bcrypt neste host e retorna o maior custo cuja mediana de tempo fica
+    dentro de `alvo_ms` (nunca abaixo de `minimo`), junto com os tempos medidos.
+    """
+    senha = b'calibracao-Nexum@1'
+    tempos = {}
+    escolhido = minimo
+    for rounds in range(minimo, maximo + 1):
+        salt = bcrypt.gensalt(rounds=rounds)
+        medidas = []
+        for _ in range(amostras):
+            inicio = time.perf_counter()
+            bcrypt.hashpw(senha, salt)
+            medidas.append((time.perf_counter() - inicio) * 1000)
+        tempos[rounds] = statistics.median(medidas)
+        if tempos[rounds] > alvo_ms:
+            # Cada custo a mais dobra o tempo: não adianta medir os seguintes
+            break
+        escolhido = rounds
+    return escolhido, tempos
+
+_servico: Optional[ServicoSenhas] = None
+_servico_lock = threading.Lock()
+
+def servico_senhas() -> ServicoSenhas:
+    """Instância compartilhada do serviço (criada no primeiro uso)."""
+    global _servico
+    with _servico_lock:
+        if _servico is None:
+            _servico = ServicoSenhas()
+        return _servico
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibra o custo do bcrypt para a latência alvo deste host.")
+    parser.add_argument("--alvo-ms", type=float, default=BCRYPT_ALVO_MS, help="Tempo máximo por hash (padrão: 250 ms).")
+    parser.add_argument("--minimo", type=int, default=10, help="Custo mínimo aceito (padrão: 10).")
+    parser.add_argument("--maximo", type=int, default=16, help="Custo máximo testado (padrão: 16).")
+    args = parser.parse_args()
+
+    print(f"⏱️  Calibrando bcrypt (alvo: {args.alvo_ms:.0f} ms por hash)...")
+    escolhido, tempos = calibrar(args.alvo_ms, args.minimo, args.maximo)
+    for rounds, ms in tempos.items():
+        marca = "✅" if ms <= args.alvo_ms else "❌"
+        print(f"   {marca} custo {rounds:>2}: {ms:8.1f} ms")
+    if tempos[escolhido] > args.alvo_ms:
+        print(f"⚠️  Nem o custo mínimo ({args.minimo}) cabe no alvo neste host.")
+    print(f"\n💡 Adicione ao .env: BCRYPT_ROUNDS={escolhido}")
+    print("   Hashes com outro custo são regerados no próximo login bem-sucedido.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Sessões - Nexum Supply Chain
+Tokens de sessão assinados (itsdangerous) emitidos no login. Cada token carrega
+o id do usuário e a função; a validação é feita em memória (HMAC + validade),
+sem consultar o banco nem rodar bcrypt a cada requisição.
+
+Revogação: uma lista pequena de ids de usuários inativos ou bloqueados é
+recarregada do banco a cada `intervalo_revogacao` segundos (em segundo plano),
+então sp_inativar_usuario ou um bloqueio por tentativas passam a valer em no
+máximo esse intervalo. revogar() tem efeito imediato no processo.
+"""
+
+import os
+import time
+import secrets
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+SESSAO_SEGREDO = os.getenv('SESSAO_SEGREDO')
+SESSAO_VALIDADE = int(os.getenv('SESSAO_VALIDADE', '900'))
+SESSAO_REVOGACAO_INTERVALO = float(os.getenv('SESSAO_REVOGACAO_INTERVALO', '30'))
+
+def _revogados_no_banco() -> Iterable[int]:
+    """Fonte padrão da lista de revogação (importa o gerenciador só quando usada)."""
+    from user_manager import GerenciadorUsuarios
+    return GerenciadorUsuarios().usuarios_revogados()
+
+class GerenciadorSessoes:
+    """Emite e valida tokens de sessão com lista de revogação em memória."""
+
+    def __init__(self, segredo: Optional[str] = SESSAO_SEGREDO, validade: int = SESSAO_VALIDADE,
+                 fonte_revogacao: Optional[Callable[[], Iterable[int]]] = _revogados_no_banco,
+                 intervalo_revogacao: float = SESSAO_REVOGACAO_INTERVALO):
+        if not segredo:
+            # Sem segredo configurado os tokens só valem até o processo reiniciar
+            print("⚠️  SESSAO_SEGREDO não definido: usando um segredo aleatório para este processo.")
+            segredo = secrets.token_hex(32)
+        self.validade = validade
+        self.fonte_revogacao = fonte_revogacao
+        self.intervalo_revogacao = intervalo_revogacao
+        self._serializador = URLSafeTimedSerializer(segredo, salt='nexum-sessao')
+
+        self._revogados = frozenset()
+        self._revogados_locais = set()
+        self._proxima_atualizacao = 0.0
+        self._atualizando = threading.Lock()
+
+    # --- Emissão e validação ---
+
+    def emitir(self, usuario_id: int, funcao: str) -> str:
+        """Gera um token para o usuário autenticado."""
+        return self._serializador.dumps({'id': usuario_id, 'funcao': funcao})
+
+    def validar(self, token: str) -> Optional[Dict]:
+        """Retorna {'id', 'funcao'} se o token for autêntico, dentro da validade e não revogado."""
+        try:
+            dados = self._serializador.loads(token, max_age=self.validade)
+        except (SignatureExpired, BadSignature):
+            return None
+        self._atualizar_revogacao()
+        usuario_id = dados['id']
+        if usuario_id in self._revogados or usuario_id in self._revogados_locais:
+            return None
+        return dados
+
+    # --- Revogação ---
+
+    def revogar(self, usuario_id: int):
+        """Invalida imediatamente os tokens do usuário neste processo."""
+        self._revogados_locais.add(usuario_id)
+
+    def restaurar(self, usuario_id: int):
+        """Remove uma revogação local (ex.: usuário reativado)."""
+        self._revogados_locais.discard(usuario_id)
+
+    def atualizar_revogacao(self):
+        """Recarrega a lista de revogação da fonte (bloqueante)."""
+        if self.fonte_revogacao is None:
+            return
+        try:
+            self._revogados = frozenset(self.fonte_revogacao())
+        except Exception as e:
+            # Mantém a lista anterior; nova tentativa no próximo intervalo
+            print(f"⚠️  Falha ao atualizar lista de revogação: {e}")
+        finally:
+            self._proxima_atualizacao = time.monotonic() + self.intervalo_revogacao
+
+    def _atualizar_revogacao(self):
+        # Caminho rápido: uma comparação; a recarga roda fora da requisição
+        if time.monotonic() < self._proxima_atualizacao or self.fonte_revogacao is None:
+            return
+        if not self._atualizando.acquire(blocking=False):
+            return
+
+        def recarregar():
+            try:
+                self.atualizar_revogacao()
+            finally:
+                self._atualizando.release()
+
+        threading.Thread(target=recarregar, name='sessao-revogacao', daemon=True).start()
+
+_sessoes: Optional[GerenciadorSessoes] = None
+_sessoes_lock = threading.Lock()
+
+def gerenciador_sessoes() -> GerenciadorSessoes:
+    """Instância compartilhada do gerenciador (criada no primeiro uso)."""
+    global _sessoes
+    with _sessoes_lock:
+        if _sessoes is None:
+            _sessoes = GerenciadorSessoes()
+        return _sessoes
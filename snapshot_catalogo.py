@@ -0,0 +1,209 @@
+"""
+Snapshot Compartilhado do Catálogo - Nexum Supply Chain
+Publica o catálogo colunar (catalogo.py) como um snapshot imutável e
+versionado em disco, que todos os processos da API mapeiam sem cópia: as
+páginas ficam no cache de páginas do sistema operacional uma única vez, em vez
+de uma cópia do catálogo por worker.
+
+Layout (CATALOGO_SNAPSHOT_DIR, padrão .cache/catalogo):
+
+    v<mtime_ns>-<tamanho>-<impressão>/   um diretório por versão (.npy + meta.json)
+    ATUAL                               nome da versão publicada
+
+O nome junta a assinatura do database.json de onde a versão saiu (mtime_ns,
+tamanho) e a impressão do conteúdo do catálogo (Catalogo.impressao): duas
+gravações do mesmo tamanho no mesmo tick de um sistema de arquivos com mtime
+grosseiro geram versões distintas. Quem escreve grava a versão nova em um
+diretório temporário, renomeia para o nome final e troca o ponteiro ATUAL com
+os.replace (atômico). A cada requisição o leitor faz um stat do database.json e
+lê ATUAL: se ATUAL aponta para outra versão com a mesma assinatura do arquivo,
+remapeia; se a assinatura não bate, o arquivo foi gravado sem publicar e a
+versão é gerada. Uma versão já mapeada nunca é alterada. Versões antigas além de
+CATALOGO_SNAPSHOT_VERSOES são removidas (no Windows, as ainda mapeadas ficam
+para a próxima limpeza).
+"""
+
+import os
+import shutil
+import threading
+import time
+from typing import Optional, Tuple
+
+from catalogo import Catalogo
+
+CATALOGO_SNAPSHOT_DIR = os.getenv(
+    'CATALOGO_SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'catalogo'))
+CATALOGO_SNAPSHOT_VERSOES = int(os.getenv('CATALOGO_SNAPSHOT_VERSOES', '3'))
+# Quanto um processo espera outro terminar de gerar a mesma versão antes de gerá-la ele mesmo
+CATALOGO_SNAPSHOT_ESPERA = float(os.getenv('CATALOGO_SNAPSHOT_ESPERA', '60'))
+PONTEIRO = 'ATUAL'
+
+def nome_versao(assinatura: Tuple[int, int], impressao: str) -> str:
+    """Nome do diretório da versão: assinatura (mtime_ns, tamanho) do database.json e impressão do catálogo."""
+    return f"v{assinatura[0]}-{assinatura[1]}-{impressao}"
+
+def assinatura_da_versao(versao: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Assinatura do database.json de onde a versão saiu (None para nomes de outro formato)."""
+    partes = (versao or '').lstrip('v').split('-')
+    if len(partes) != 3 or not versao.startswith('v'):
+        return None
+    try:
+        return int(partes[0]), int(partes[1])
+    except ValueError:
+        return None
+
+def versao_publicada(pasta: str = CATALOGO_SNAPSHOT_DIR) -> Optional[str]:
+    try:
+        with open(os.path.join(pasta, PONTEIRO), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def publicar(catalogo: Catalogo, assinatura: Tuple[int, int], pasta: str = CATALOGO_SNAPSHOT_DIR) -> str:
+    """Grava a versão (se ainda não existir) e aponta ATUAL para ela. Retorna o nome da versão."""
+    versao = nome_versao(assinatura, catalogo.impressao())
+    destino = os.path.join(pasta, versao)
+    os.makedirs(pasta, exist_ok=True)
+    if not os.path.isdir(destino):
+        temporario = os.path.join(pasta, f".{versao}.{os.getpid()}.{threading.get_ident()}.tmp")
+        catalogo.gravar(temporario)
+        try:
+            os.rename(temporario, destino)
+        except OSError:
+            # Outro processo publicou a mesma versão (mesmo conteúdo) primeiro: a dele vale
+            shutil.rmtree(temporario, ignore_errors=True)
+            if not os.path.isdir(destino):
+                raise
+
+    trocar_ponteiro(versao, pasta)
+    limpar_versoes_antigas(pasta, manter=versao)
+    return versao
+
+def trocar_ponteiro(versao: str, pasta: str = CATALOGO_SNAPSHOT_DIR):
+    """Aponta ATUAL para `versao` (arquivo temporário + os.replace: leitores veem o antigo ou o novo)."""
+    temporario = os.path.join(pasta, f".{PONTEIRO}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(versao)
+    os.replace(temporario, os.path.join(pasta, PONTEIRO))
+
+def limpar_versoes_antigas(pasta: str = CATALOGO_SNAPSHOT_DIR, manter: Optional[str] = None,
+                           versoes: int = CATALOGO_SNAPSHOT_VERSOES):
+    """Remove as versões mais antigas (por data de criação), preservando `manter` e as `versoes` mais novas."""
+    try:
+        nomes = [n for n in os.listdir(pasta) if n.startswith('v') and os.path.isdir(os.path.join(pasta, n))]
+    except FileNotFoundError:
+        return
+    nomes.sort(key=lambda n: os.stat(os.path.join(pasta, n)).st_mtime_ns, reverse=True)
+    for nome in nomes[versoes:]:
+        if nome != manter:
+            # No POSIX os arquivos somem só depois do último munmap; no Windows falha e fica para depois
+            shutil.rmtree(os.path.join(pasta, nome), ignore_errors=True)
+
+def abrir(versao: str, pasta: str = CATALOGO_SNAPSHOT_DIR) -> Catalogo:
+    return Catalogo.mapear(os.path.join(pasta, versao))
+
+class LeitorSnapshot:
+    """
+    Catálogo atual de um database.json para um processo: mapeia a versão
+    publicada e, se ela não corresponder ao arquivo (escrita feita por outro
+    caminho, como o cmm gravado por sales.py), gera e publica uma nova.
+    """
+
+    def __init__(self, caminho_db: str, pasta: str = CATALOGO_SNAPSHOT_DIR):
+        self.caminho_db = caminho_db
+        self.pasta = pasta
+        self._versao: Optional[str] = None
+        self._catalogo: Optional[Catalogo] = None
+        self._lock = threading.Lock()
+
+    def _assinatura_db(self) -> Optional[Tuple[int, int]]:
+        try:
+            estado = os.stat(self.caminho_db)
+            return estado.st_mtime_ns, estado.st_size
+        except FileNotFoundError:
+            return None
+
+    def catalogo(self, carregar_produtos) -> Catalogo:
+        """`carregar_produtos()` só é chamado quando este processo precisa gerar a versão."""
+        with self._lock:
+            assinatura = self._assinatura_db()
+            if assinatura is None:
+                # Sem database.json não há o que compartilhar
+                self._versao, self._catalogo = None, Catalogo(carregar_produtos())
+                return self._catalogo
+
+            versao = versao_publicada(self.pasta)
+            if assinatura_da_versao(versao) == assinatura and versao == self._versao:
+                return self._catalogo
+            if assinatura_da_versao(versao) != assinatura:
+                # ATUAL não corresponde ao arquivo (gravado sem publicar): gera a versão ou espera quem gera
+                versao = self._aguardar_ou_gerar(assinatura, carregar_produtos)
+                if versao is None:
+                    # Não foi possível publicar (disco cheio, sem permissão...): cópia privada
+                    self._versao, self._catalogo = None, Catalogo(carregar_produtos())
+                    return self._catalogo
+            try:
+                self._catalogo = abrir(versao, self.pasta)
+            except FileNotFoundError:
+                # Versão removida pela limpeza de outro processo entre a publicação e o mapeamento
+                self._versao, self._catalogo = None, Catalogo(carregar_produtos())
+                return self._catalogo
+            self._versao = versao
+            return self._catalogo
+
+    def _aguardar_ou_gerar(self, assinatura: Tuple[int, int], carregar_produtos) -> Optional[str]:
+        """
+        Garante que ATUAL aponte para uma versão gerada do arquivo com esta
+        assinatura e retorna o nome dela (None se não foi possível gravar). Um
+        único processo a gera (trava por criação exclusiva de arquivo); os demais
+        esperam a publicação em vez de repetir o trabalho.
+        """
+        trava = os.path.join(self.pasta, f".v{assinatura[0]}-{assinatura[1]}.trava")
+        limite = time.monotonic() + CATALOGO_SNAPSHOT_ESPERA
+        while True:
+            versao = versao_publicada(self.pasta)
+            if assinatura_da_versao(versao) == assinatura and os.path.isdir(os.path.join(self.pasta, versao)):
+                return versao
+            try:
+                os.makedirs(self.pasta, exist_ok=True)
+                descritor = os.open(trava, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if time.monotonic() < limite:
+                    time.sleep(0.05)
+                    continue
+                # Trava abandonada (processo que morreu gerando): assume a geração
+                descritor = None
+            except OSError:
+                return None
+            try:
+                versao = versao_publicada(self.pasta)
+                if assinatura_da_versao(versao) == assinatura and os.path.isdir(os.path.join(self.pasta, versao)):
+                    return versao
+                return publicar(Catalogo(carregar_produtos()), assinatura, self.pasta)
+            except OSError:
+                return None
+            finally:
+                if descritor is not None:
+                    os.close(descritor)
+                try:
+                    os.remove(trava)
+                except OSError:
+                    pass
+
+    def publicar_atual(self, produtos) -> Catalogo:
+        """Chamado por quem acabou de gravar o database.json: publica a versão nova sem reler o arquivo."""
+        with self._lock:
+            assinatura = self._assinatura_db()
+            if assinatura is None:
+                self._versao, self._catalogo = None, Catalogo(produtos)
+                return self._catalogo
+            catalogo = Catalogo(produtos)
+            try:
+                versao = publicar(catalogo, assinatura, self.pasta)
+                self._catalogo = abrir(versao, self.pasta)
+            except OSError:
+                # O database.json já foi gravado: segue com a cópia privada, outro processo publica depois
+                self._versao, self._catalogo = None, catalogo
+                return catalogo
+            self._versao = versao
+            return self._catalogo
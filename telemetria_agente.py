@@ -0,0 +1,141 @@
+"""
+Telemetria do Agente de IA - Nexum Supply Chain
+Spans por fase (percepção, raciocínio, execução) e ledger de ciclos em JSONL.
+"""
+
+import os
+import json
+import math
+import time
+import uuid
+import argparse
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+LEDGER_PATH = os.getenv(
+    "AGENTE_LEDGER_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ledger_agente.jsonl')
+)
+
+FASES = ('percepcao', 'raciocinio', 'execucao')
+
+class RastroCiclo:
+    """Coleta spans de tempo e contadores de um ciclo do Agente."""
+
+    def __init__(self, modo: str = 'completo'):
+        self.id = uuid.uuid4().hex
+        self.modo = modo
+        self.inicio = datetime.now().isoformat(timespec='seconds')
+        self.fases: Dict[str, Dict] = {}
+        self.status = 'ok'
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def fase(self, nome: str):
+        """Mede a duração de uma fase; o dict entregue recebe contadores livres."""
+        dados: Dict = {}
+        t0 = time.perf_counter()
+        try:
+            yield dados
+        except Exception as e:
+            dados['erro'] = str(e)
+            self.status = 'erro'
+            raise
+        finally:
+            dados['duracao_ms'] = round((time.perf_counter() - t0) * 1000, 3)
+            self.fases[nome] = dados
+
+    def para_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'modo': self.modo,
+            'inicio': self.inicio,
+            'status': self.status,
+            'duracao_total_ms': round((time.perf_counter() - self._t0) * 1000, 3),
+            'fases': self.fases,
+        }
+
+    def registrar(self, caminho: str = LEDGER_PATH) -> Dict:
+        """Anexa o ciclo ao ledger (append-only, uma linha JSON por ciclo)."""
+        registro = self.para_dict()
+        with open(caminho, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        return registro
+
+def extrair_uso_tokens(response) -> Dict:
+    """Lê o uso de tokens da resposta do SDK, quando disponível."""
+    uso = getattr(response, 'usage_metadata', None)
+    if uso is None:
+        return {}
+    campos = {
+        'tokens_prompt': 'prompt_token_count',
+        'tokens_resposta': 'candidates_token_count',
+        'tokens_total': 'total_token_count',
+    }
+    return {chave: getattr(uso, attr) for chave, attr in campos.items() if getattr(uso, attr, None) is not None}
+
+# --- Leitura e Resumo do Ledger ---
+
+def carregar_ledger(caminho: str = LEDGER_PATH, ultimos: Optional[int] = None) -> List[Dict]:
+    """Lê os ciclos registrados, ignorando linhas corrompidas."""
+    registros = []
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    registros.append(json.loads(linha))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        return []
+    return registros[-ultimos:] if ultimos else registros
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por posição mais próxima (nearest-rank)."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, math.ceil(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+def resumir_ledger(registros: List[Dict]) -> Dict:
+    """Calcula p50/p95 de latência por fase e totais de tokens."""
+    resumo = {'ciclos': len(registros), 'erros': sum(1 for r in registros if r.get('status') != 'ok'), 'fases': {}}
+    nomes = list(FASES) + sorted({n for r in registros for n in r.get('fases', {})} - set(FASES))
+    for nome in nomes:
+        duracoes = [r['fases'][nome]['duracao_ms'] for r in registros if nome in r.get('fases', {})]
+        if duracoes:
+            resumo['fases'][nome] = {
+                'amostras': len(duracoes),
+                'p50_ms': percentil(duracoes, 50),
+                'p95_ms': percentil(duracoes, 95),
+            }
+    raciocinios = [r['fases']['raciocinio'] for r in registros if 'raciocinio' in r.get('fases', {})]
+    resumo['tokens_total'] = sum(f.get('tokens_total', 0) for f in raciocinios)
+    resumo['chamadas_modelo'] = len(raciocinios)
+    return resumo
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumo do ledger de ciclos do Agente de IA.")
+    parser.add_argument("--ledger", default=LEDGER_PATH, help="Caminho do arquivo JSONL.")
+    parser.add_argument("--ultimos", type=int, default=None, help="Considera apenas os N ciclos mais recentes.")
+    args = parser.parse_args()
+
+    resumo = resumir_ledger(carregar_ledger(args.ledger, args.ultimos))
+
+    print("=" * 60)
+    print("📈 LATÊNCIA DOS CICLOS DO AGENTE")
+    print("=" * 60)
+    print(f"   Ciclos: {resumo['ciclos']} | Com erro: {resumo['erros']}")
+    if not resumo['fases']:
+        print("   Nenhum ciclo registrado.")
+        return
+    print(f"\n   {'Fase':<14}{'Amostras':>10}{'p50 (ms)':>14}{'p95 (ms)':>14}")
+    for nome, fase in resumo['fases'].items():
+        print(f"   {nome:<14}{fase['amostras']:>10}{fase['p50_ms']:>14.1f}{fase['p95_ms']:>14.1f}")
+    print(f"\n   Chamadas ao modelo: {resumo['chamadas_modelo']} | Tokens totais: {resumo['tokens_total']}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
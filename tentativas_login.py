@@ -0,0 +1,171 @@
+"""
+Tentativas de Login - Nexum Supply Chain
+Contagem de logins falhos em memória, por email e por IP, em janela deslizante.
+Contas e IPs que estouram o limite são recusados antes do bcrypt e do banco.
+
+As falhas são gravadas em segundo plano (write-behind): a cada
+`intervalo_flush` segundos, uma chamada de sp_registrar_login_falho por email
+com a quantidade acumulada, em uma única transação. O banco passa a ver
+O(contas) escritas por intervalo em vez de O(tentativas).
+"""
+
+import os
+import time
+import atexit
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+LOGIN_JANELA = float(os.getenv('LOGIN_JANELA', '900'))
+LOGIN_MAX_FALHAS_EMAIL = int(os.getenv('LOGIN_MAX_FALHAS_EMAIL', '5'))
+LOGIN_MAX_FALHAS_IP = int(os.getenv('LOGIN_MAX_FALHAS_IP', '20'))
+LOGIN_BLOQUEIO = float(os.getenv('LOGIN_BLOQUEIO', '1800'))
+LOGIN_FLUSH_INTERVALO = float(os.getenv('LOGIN_FLUSH_INTERVALO', '5'))
+
+def _registrar_no_banco(pendentes: Iterable[Tuple[str, int]]):
+    """Destino padrão das falhas (importa o gerenciador só quando usado)."""
+    from user_manager import GerenciadorUsuarios
+    GerenciadorUsuarios().registrar_falhas_login(pendentes)
+
+class RastreadorLogins:
+    """Janela deslizante de falhas por email/IP com gravação agrupada em segundo plano."""
+
+    def __init__(self, janela: float = LOGIN_JANELA, max_falhas_email: int = LOGIN_MAX_FALHAS_EMAIL,
+                 max_falhas_ip: int = LOGIN_MAX_FALHAS_IP, bloqueio: float = LOGIN_BLOQUEIO,
+                 intervalo_flush: float = LOGIN_FLUSH_INTERVALO,
+                 persistir: Optional[Callable[[Iterable[Tuple[str, int]]], None]] = _registrar_no_banco):
+        self.janela = janela
+        self.limites = {'email': max_falhas_email, 'ip': max_falhas_ip}
+        self.bloqueio = bloqueio
+        self.intervalo_flush = intervalo_flush
+        self.persistir = persistir
+
+        self._lock = threading.Lock()
+        # Só importa saber se houve `limite` falhas na janela: deque(maxlen=limite) por chave
+        self._falhas: Dict[Tuple[str, str], deque] = {}
+        self._bloqueados: Dict[Tuple[str, str], float] = {}
+        self._pendentes: Dict[str, int] = {}
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._metricas = {'falhas': 0, 'recusadas': 0, 'bloqueios': 0, 'descargas': 0, 'escritas': 0, 'erros_descarga': 0}
+
+    # --- Consulta e registro ---
+
+    def bloqueado(self, email: Optional[str], ip: Optional[str] = None) -> Optional[float]:
+        """Segundos restantes de bloqueio do email ou do IP (None se liberado)."""
+        agora = time.monotonic()
+        with self._lock:
+            restante = 0.0
+            for chave in self._chaves(email, ip):
+                ate = self._bloqueados.get(chave)
+                if ate is not None:
+                    if ate > agora:
+                        restante = max(restante, ate - agora)
+                    else:
+                        del self._bloqueados[chave]
+            if restante:
+                self._metricas['recusadas'] += 1
+                return restante
+        return None
+
+    def registrar_falha(self, email: Optional[str], ip: Optional[str] = None, usuario_existe: bool = True):
+        """Conta uma falha (senha errada ou usuário inexistente) e agenda a gravação no banco."""
+        agora = time.monotonic()
+        with self._lock:
+            self._metricas['falhas'] += 1
+            for chave in self._chaves(email, ip):
+                falhas = self._falhas.get(chave)
+                if falhas is None:
+                    falhas = self._falhas[chave] = deque(maxlen=self.limites[chave[0]])
+                falhas.append(agora)
+                if len(falhas) == falhas.maxlen and agora - falhas[0] <= self.janela:
+                    self._bloqueados[chave] = agora + self.bloqueio
+                    self._metricas['bloqueios'] += 1
+                    falhas.clear()
+            if email and usuario_existe and self.persistir is not None:
+                email = email.lower()
+                self._pendentes[email] = self._pendentes.get(email, 0) + 1
+        self._iniciar()
+
+    def registrar_sucesso(self, email: str):
+        """Login bem-sucedido: zera a janela do email (sp_atualizar_ultimo_acesso zera o contador no banco)."""
+        email = email.lower()
+        with self._lock:
+            self._falhas.pop(('email', email), None)
+            self._pendentes.pop(email, None)
+
+    # --- Write-behind ---
+
+    def descarregar(self) -> int:
+        """Grava as falhas acumuladas (uma linha por email); retorna quantas contas foram gravadas."""
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, {}
+            self._podar(time.monotonic())
+        if not pendentes:
+            return 0
+        try:
+            self.persistir(list(pendentes.items()))
+        except Exception as e:
+            # Devolve ao acumulado: entram na próxima descarga
+            with self._lock:
+                for email, quantidade in pendentes.items():
+                    self._pendentes[email] = self._pendentes.get(email, 0) + quantidade
+                self._metricas['erros_descarga'] += 1
+            print(f"⚠️  Falha ao gravar tentativas de login: {e}")
+            return 0
+        with self._lock:
+            self._metricas['descargas'] += 1
+            self._metricas['escritas'] += len(pendentes)
+        return len(pendentes)
+
+    def encerrar(self):
+        """Para a thread de gravação e descarrega o que restou."""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.descarregar()
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            return dict(self._metricas, chaves=len(self._falhas), bloqueados=len(self._bloqueados),
+                        pendentes=len(self._pendentes))
+
+    def _iniciar(self):
+        if self._thread is not None or self.persistir is None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._laco, name='tentativas-login', daemon=True)
+                self._thread.start()
+                atexit.register(self.encerrar)
+
+    def _laco(self):
+        while not self._parar.wait(self.intervalo_flush):
+            self.descarregar()
+
+    def _podar(self, agora: float):
+        # Remove janelas e bloqueios vencidos para a memória acompanhar só quem está ativo
+        for chave in [c for c, falhas in self._falhas.items() if not falhas or agora - falhas[-1] > self.janela]:
+            del self._falhas[chave]
+        for chave in [c for c, ate in self._bloqueados.items() if ate <= agora]:
+            del self._bloqueados[chave]
+
+    @staticmethod
+    def _chaves(email: Optional[str], ip: Optional[str]):
+        chaves = []
+        if email:
+            chaves.append(('email', email.lower()))
+        if ip:
+            chaves.append(('ip', ip))
+        return chaves
+
+_rastreador: Optional[RastreadorLogins] = None
+_rastreador_lock = threading.Lock()
+
+def rastreador_logins() -> RastreadorLogins:
+    """Instância compartilhada do rastreador (criada no primeiro uso)."""
+    global _rastreador
+    with _rastreador_lock:
+        if _rastreador is None:
+            _rastreador = RastreadorLogins()
+        return _rastreador
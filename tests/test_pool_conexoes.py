@@ -0,0 +1,165 @@
+"""
+Testes do pool de conexões (pool_conexoes.py), com SQLite em memória no lugar
+do Azure SQL: a API DB-API usada pelo pool (cursor, rollback, close) é a mesma.
+
+Uso: python -m pytest -q tests
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import threading
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from pool_conexoes import PoolConexoes, PoolEsgotado, pool_compartilhado
+
+def fabrica_sqlite():
+    return sqlite3.connect(':memory:', check_same_thread=False)
+
+def fechada(conn):
+    try:
+        conn.cursor()
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+def test_emprestimos_concorrentes_respeitam_o_limite():
+    pool = PoolConexoes(fabrica_sqlite, tamanho_max=3, timeout_espera=5)
+    em_uso, pico = set(), [0]
+    lock = threading.Lock()
+    erros = []
+
+    def trabalhador():
+        try:
+            for _ in range(20):
+                with pool.conexao() as conn:
+                    with lock:
+                        assert id(conn) not in em_uso, "conexão emprestada a duas threads"
+                        em_uso.add(id(conn))
+                        pico[0] = max(pico[0], len(em_uso))
+                    conn.execute("SELECT 1").fetchall()
+                    time.sleep(0.001)
+                    with lock:
+                        em_uso.discard(id(conn))
+        except Exception as e:
+            erros.append(e)
+
+    threads = [threading.Thread(target=trabalhador) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not erros
+    assert 1 <= pico[0] <= 3
+    metricas = pool.metricas()
+    assert metricas['emprestimos'] == 160
+    assert metricas['criadas'] <= 3
+    assert metricas['abertas'] <= 3
+    assert metricas['em_uso'] == 0
+    pool.fechar()
+
+def test_pool_esgotado_apos_o_timeout():
+    pool = PoolConexoes(fabrica_sqlite, tamanho_max=1, timeout_espera=5)
+    conn = pool.obter()
+    inicio = time.monotonic()
+    with pytest.raises(PoolEsgotado):
+        pool.obter(timeout=0.1)
+    assert time.monotonic() - inicio >= 0.1
+    assert pool.metricas()['timeouts'] == 1
+
+    # A vaga volta quando a conexão é devolvida
+    pool.devolver(conn)
+    assert pool.obter(timeout=0.1) is conn
+
+def test_espera_termina_quando_outra_thread_devolve():
+    pool = PoolConexoes(fabrica_sqlite, tamanho_max=1, timeout_espera=5)
+    conn = pool.obter()
+    threading.Timer(0.05, pool.devolver, args=(conn,)).start()
+    assert pool.obter(timeout=2) is conn
+    assert pool.metricas()['esperas'] == 1
+
+def test_conexao_velha_e_reciclada():
+    pool = PoolConexoes(fabrica_sqlite, tamanho_max=1, vida_maxima=0.05)
+    antiga = pool.obter()
+    pool.devolver(antiga)
+    time.sleep(0.1)
+
+    nova = pool.obter()
+    assert nova is not antiga
+    assert fechada(antiga)
+    metricas = pool.metricas()
+    assert metricas['recicladas'] == 1
+    assert metricas['abertas'] == 1
+
+def test_descartar_fecha_e_libera_a_vaga():
+    pool = PoolConexoes(fabrica_sqlite, tamanho_max=1)
+    conn = pool.obter()
+    pool.devolver(conn, descartar=True)
+    assert fechada(conn)
+    assert pool.metricas()['descartadas'] == 1
+    assert pool.metricas()['abertas'] == 0
+    assert pool.obter(timeout=0.1) is not conn
+
+def test_conexao_quebrada_durante_o_uso_e_descartada():
+    pool = PoolConexoes(fabrica_sqlite, tamanho_max=1)
+    with pytest.raises(sqlite3.ProgrammingError):
+        with pool.conexao() as conn:
+            conn.close()  # Simula a queda da conexão no meio da operação
+            conn.execute("SELECT 1")
+    metricas = pool.metricas()
+    assert metricas['descartadas'] == 1
+    assert metricas['abertas'] == 0
+    with pool.conexao(timeout=0.1) as outra:
+        assert outra is not conn
+
+def test_erro_de_consulta_mantem_conexao_saudavel():
+    pool = PoolConexoes(fabrica_sqlite, tamanho_max=1)
+    with pytest.raises(sqlite3.OperationalError):
+        with pool.conexao() as conn:
+            conn.execute("SELECT * FROM tabela_inexistente")
+    assert pool.metricas()['descartadas'] == 0
+    assert pool.obter(timeout=0.1) is conn
+
+def test_conexao_ociosa_que_caiu_e_trocada_no_emprestimo():
+    pool = PoolConexoes(fabrica_sqlite, tamanho_max=1, ociosidade_teste=0)
+    conn = pool.obter()
+    pool.devolver(conn)
+    conn.close()  # Servidor derrubou a conexão enquanto estava ociosa
+    time.sleep(0.01)
+
+    nova = pool.obter()
+    assert nova is not conn
+    assert nova.execute("SELECT 1").fetchone() == (1,)
+    assert pool.metricas()['descartadas'] == 1
+
+def test_devolver_desfaz_transacao_pendente():
+    pool = PoolConexoes(fabrica_sqlite, tamanho_max=1)
+    with pool.conexao() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pool.conexao() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (0,)
+
+def test_pool_fechado_recusa_emprestimos():
+    pool = PoolConexoes(fabrica_sqlite, tamanho_max=2)
+    ociosa, emprestada = pool.obter(), pool.obter()
+    pool.devolver(ociosa)
+    pool.fechar()
+    assert fechada(ociosa)
+    with pytest.raises(RuntimeError):
+        pool.obter(timeout=0.1)
+    pool.devolver(emprestada)
+    assert fechada(emprestada)
+    assert pool.metricas()['abertas'] == 0
+
+def test_pool_compartilhado_por_nome():
+    primeiro = pool_compartilhado('teste_pool_conexoes', fabrica_sqlite, tamanho_max=2)
+    assert pool_compartilhado('teste_pool_conexoes', fabrica_sqlite) is primeiro
+    assert pool_compartilhado('teste_pool_conexoes_2', fabrica_sqlite) is not primeiro
@@ -5,13 +5,18 @@ Data: 2025-10-15
 """
 
 import pyodbc
-import bcrypt
-import re
 from datetime import datetime, date
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, Iterable, List, Tuple
 import os
 from dotenv import load_dotenv
 
+from pool_conexoes import pool_compartilhado
+from servico_senhas import servico_senhas, precisa_rehash
+from tentativas_login import rastreador_logins
+# Validações puras (sem pyodbc), reexportadas aqui para quem já as importa deste módulo
+from validacao_usuarios import (FUNCOES_VALIDAS, RE_NAO_DIGITO, RE_EMAIL, REQUISITOS_SENHA, validar_cpf,
+                                validar_email, erros_senha, validar_senha, limpar_cpf)
+
 load_dotenv()
 
 # --- Configuração de Conexão ---
@@ -37,77 +42,39 @@ def get_connection():
     )
     return pyodbc.connect(conn_str)
 
-# --- Funções de Validação ---
-
-def validar_cpf(cpf: str) -> bool:
-    """Valida CPF (apenas números)."""
-    cpf = re.sub(r'[^0-9]', '', cpf)
-    if len(cpf) != 11 or cpf == cpf[0] * 11:
-        return False
-    
-    def calcular_digito(cpf_parcial):
-        soma = sum(int(cpf_parcial[i]) * (len(cpf_parcial) + 1 - i) for i in range(len(cpf_parcial)))
-        resto = soma % 11
-        return 0 if resto < 2 else 11 - resto
-
-    if int(cpf[9]) != calcular_digito(cpf[:9]) or int(cpf[10]) != calcular_digito(cpf[:10]):
-        return False
-    
-    return True
-
-def validar_email(email: str) -> bool:
-    """Valida formato de email."""
-    padrao = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(padrao, email))
-
-def validar_senha(senha: str) -> Tuple[bool, str]:
-    """Valida força da senha."""
-    if len(senha) < 8:
-        return False, "A senha deve ter no mínimo 8 caracteres."
-    if not re.search(r'[A-Z]', senha):
-        return False, "A senha deve conter pelo menos uma letra maiúscula."
-    if not re.search(r'[a-z]', senha):
-        return False, "A senha deve conter pelo menos uma letra minúscula."
-    if not re.search(r'[0-9]', senha):
-        return False, "A senha deve conter pelo menos um número."
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', senha):
-        return False, "A senha deve conter pelo menos um caractere especial."
-    return True, "Senha válida."
-
-def limpar_cpf(cpf: str) -> str:
-    """Remove formatação do CPF."""
-    return re.sub(r'[^0-9]', '', cpf)
+def pool_usuarios():
+    """Pool de conexões compartilhado por todos os GerenciadorUsuarios do processo."""
+    return pool_compartilhado('usuarios', get_connection)
 
 # --- Funções de Hash de Senha ---
 
 def hash_senha(senha: str) -> str:
-    """Gera hash bcrypt da senha."""
-    salt = bcrypt.gensalt(rounds=12)
-    return bcrypt.hashpw(senha.encode('utf-8'), salt).decode('utf-8')
+    """Gera hash bcrypt da senha (no pool de processos do serviço de senhas)."""
+    return servico_senhas().gerar_hash(senha)
 
 def verificar_senha(senha: str, hash_armazenado: str) -> bool:
-    """Verifica se a senha corresponde ao hash."""
-    return bcrypt.checkpw(senha.encode('utf-8'), hash_armazenado.encode('utf-8'))
+    """Verifica se a senha corresponde ao hash (no pool de processos do serviço de senhas)."""
+    return servico_senhas().verificar(senha, hash_armazenado)
 
 # --- Classe GerenciadorUsuarios ---
 
 class GerenciadorUsuarios:
     """Gerencia operações de usuários no banco de dados."""
     
-    FUNCOES_VALIDAS = ['admin', 'analista', 'operador', 'gerente', 'visualizador']
+    FUNCOES_VALIDAS = FUNCOES_VALIDAS
     
     def __init__(self):
         self.conn = None
 
     def conectar(self):
-        """Estabelece conexão com o banco."""
+        """Obtém uma conexão do pool."""
         if not self.conn:
-            self.conn = get_connection()
+            self.conn = pool_usuarios().obter()
     
     def desconectar(self):
-        """Fecha conexão com o banco."""
+        """Devolve a conexão ao pool."""
         if self.conn:
-            self.conn.close()
+            pool_usuarios().devolver(self.conn)
             self.conn = None
 
     def criar_usuario(self, nome: str, sobrenome: str, data_nascimento: date, cpf: str, funcao: str, email: str, senha: str, criado_por: Optional[int] = None) -> Tuple[bool, str]:
@@ -139,8 +106,19 @@ class GerenciadorUsuarios:
             cursor.close()
             self.desconectar()
 
-    def autenticar(self, email: str, senha: str) -> Tuple[bool, str, Optional[str]]:
+    def autenticar(self, email: str, senha: str, ip: Optional[str] = None) -> Tuple[bool, str, Optional[str]]:
         """Autentica um usuário e retorna seu nível de acesso."""
+        sucesso, mensagem, usuario = self.autenticar_usuario(email, senha, ip)
+        return sucesso, mensagem, usuario['funcao'] if usuario else None
+
+    def autenticar_usuario(self, email: str, senha: str, ip: Optional[str] = None) -> Tuple[bool, str, Optional[Dict]]:
+        """Autentica um usuário e retorna {'id', 'funcao'} (usado para emitir o token de sessão)."""
+        # Email ou IP com falhas demais na janela: recusa antes do banco e do bcrypt
+        rastreador = rastreador_logins()
+        bloqueio = rastreador.bloqueado(email, ip)
+        if bloqueio:
+            return False, f"Muitas tentativas de login. Tente novamente em {int(bloqueio // 60) + 1} minuto(s).", None
+
         self.conectar()
         cursor = self.conn.cursor()
         try:
@@ -148,6 +126,7 @@ class GerenciadorUsuarios:
             user = cursor.fetchone()
 
             if not user:
+                rastreador.registrar_falha(email, ip, usuario_existe=False)
                 return False, "Usuário não encontrado.", None
             
             if not user.ativo:
@@ -157,15 +136,99 @@ class GerenciadorUsuarios:
                  return False, f"Usuário bloqueado até {user.bloqueado_ate}.", None
 
             if verificar_senha(senha, user.hashed_senha):
+                if precisa_rehash(user.hashed_senha):
+                    # Custo diferente da política (BCRYPT_ROUNDS): regrava o hash com a senha em mãos
+                    cursor.execute("{CALL supply_chain.sp_alterar_senha(?, ?)}", user.id, hash_senha(senha))
                 cursor.execute("{CALL supply_chain.sp_atualizar_ultimo_acesso(?)}", user.id)
                 self.conn.commit()
-                return True, "Autenticação bem-sucedida!", user.funcao
+                rastreador.registrar_sucesso(email)
+                return True, "Autenticação bem-sucedida!", {'id': user.id, 'funcao': user.funcao}
             else:
-                cursor.execute("{CALL supply_chain.sp_registrar_login_falho(?)}", email)
-                self.conn.commit()
+                # Gravado em lote pelo rastreador (sp_registrar_login_falho em segundo plano)
+                rastreador.registrar_falha(email, ip)
                 return False, "Senha incorreta.", None
         except Exception as e:
             return False, f"Erro de autenticação: {e}", None
         finally:
             cursor.close()
-            self.desconectar()
\ No newline at end of file
+            self.desconectar()
+
+    def registrar_falhas_login(self, falhas: Iterable[Tuple[str, int]]):
+        """Grava falhas de login acumuladas: uma chamada de sp_registrar_login_falho por email, em uma transação."""
+        self.conectar()
+        cursor = self.conn.cursor()
+        try:
+            cursor.executemany("{CALL supply_chain.sp_registrar_login_falho(?, ?)}", list(falhas))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            self.desconectar()
+
+    def cadastros_existentes(self, cpfs: List[str], emails: List[str], tamanho_lote: int = 500) -> Tuple[set, set]:
+        """CPFs e emails (minúsculos) já cadastrados, consultados em lotes."""
+        self.conectar()
+        cursor = self.conn.cursor()
+        cpfs_existentes, emails_existentes = set(), set()
+        try:
+            for coluna, valores, encontrados in (('cpf', cpfs, cpfs_existentes), ('email', emails, emails_existentes)):
+                for i in range(0, len(valores), tamanho_lote):
+                    lote = valores[i:i + tamanho_lote]
+                    marcadores = ", ".join("?" * len(lote))
+                    cursor.execute(f"SELECT {coluna} FROM supply_chain.usuarios WHERE {coluna} IN ({marcadores})", lote)
+                    encontrados.update(str(row[0]).strip().lower() for row in cursor.fetchall())
+            return cpfs_existentes, emails_existentes
+        finally:
+            cursor.close()
+            self.desconectar()
+
+    def inserir_usuarios_em_lote(self, usuarios: List[Tuple], tamanho_lote: int = 200) -> List[Tuple[int, str]]:
+        """
+        Insere usuários já validados e com senha em hash, (nome, sobrenome, data_nascimento,
+        cpf, funcao, email, hashed_senha, criado_por), em lotes sobre uma única conexão do pool.
+        Um lote que falha é refeito linha a linha via sp_criar_usuario para apontar os culpados.
+        Retorna [(índice, erro)] das linhas não inseridas.
+        """
+        self.conectar()
+        cursor = self.conn.cursor()
+        if hasattr(cursor, 'fast_executemany'):
+            cursor.fast_executemany = True
+        erros = []
+        try:
+            for i in range(0, len(usuarios), tamanho_lote):
+                lote = usuarios[i:i + tamanho_lote]
+                try:
+                    cursor.executemany(
+                        "INSERT INTO supply_chain.usuarios (nome, sobrenome, data_nascimento, cpf, funcao, "
+                        "email, hashed_senha, criado_por, atualizado_por) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [linha + (linha[-1],) for linha in lote]
+                    )
+                    self.conn.commit()
+                    continue
+                except Exception:
+                    self.conn.rollback()
+                for j, linha in enumerate(lote, start=i):
+                    try:
+                        cursor.execute("{CALL supply_chain.sp_criar_usuario(?, ?, ?, ?, ?, ?, ?, ?, ?)}",
+                                       *linha, pyodbc.SQL_PARAM_OUTPUT)
+                        self.conn.commit()
+                    except Exception as e:
+                        self.conn.rollback()
+                        erros.append((j, str(e)))
+            return erros
+        finally:
+            cursor.close()
+            self.desconectar()
+
+    def usuarios_revogados(self) -> List[int]:
+        """Ids de usuários inativos ou bloqueados (lista de revogação das sessões)."""
+        self.conectar()
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT id FROM supply_chain.usuarios WHERE ativo = 0 OR bloqueado_ate > GETDATE()")
+            return [row.id for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            self.desconectar()
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Validação de Usuários - Nexum Supply Chain
+Regras de cadastro (CPF, email, força da senha, funções) sem dependência do
+driver ODBC: usadas pelo GerenciadorUsuarios e pela validação da importação em
+lote (importar_usuarios.py --validar), que roda sem acesso ao banco.
+"""
+
+import re
+from typing import List, Tuple
+
+FUNCOES_VALIDAS = ['admin', 'analista', 'operador', 'gerente', 'visualizador']
+
+# Expressões compiladas uma vez (a importação em lote valida milhares de registros)
+RE_NAO_DIGITO = re.compile(r'[^0-9]')
+RE_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+REQUISITOS_SENHA = [
+    (re.compile(r'[A-Z]'), "A senha deve conter pelo menos uma letra maiúscula."),
+    (re.compile(r'[a-z]'), "A senha deve conter pelo menos uma letra minúscula."),
+    (re.compile(r'[0-9]'), "A senha deve conter pelo menos um número."),
+    (re.compile(r'[!@#$%^&*(),.?":{}|<>]'), "A senha deve conter pelo menos um caractere especial."),
+]
+
+def validar_cpf(cpf: str) -> bool:
+    """Valida CPF (apenas números)."""
+    cpf = RE_NAO_DIGITO.sub('', cpf)
+    if len(cpf) != 11 or cpf == cpf[0] * 11:
+        return False
+    
+    def calcular_digito(cpf_parcial):
+        soma = sum(int(cpf_parcial[i]) * (len(cpf_parcial) + 1 - i) for i in range(len(cpf_parcial)))
+        resto = soma % 11
+        return 0 if resto < 2 else 11 - resto
+
+    if int(cpf[9]) != calcular_digito(cpf[:9]) or int(cpf[10]) != calcular_digito(cpf[:10]):
+        return False
+    
+    return True
+
+def validar_email(email: str) -> bool:
+    """Valida formato de email."""
+    return bool(RE_EMAIL.match(email))
+
+def erros_senha(senha: str) -> List[str]:
+    """Todos os requisitos de força que a senha não atende."""
+    erros = [] if len(senha) >= 8 else ["A senha deve ter no mínimo 8 caracteres."]
+    erros.extend(mensagem for padrao, mensagem in REQUISITOS_SENHA if not padrao.search(senha))
+    return erros
+
+def validar_senha(senha: str) -> Tuple[bool, str]:
+    """Valida força da senha."""
+    erros = erros_senha(senha)
+    if erros:
+        return False, erros[0]
+    return True, "Senha válida."
+
+def limpar_cpf(cpf: str) -> str:
+    """Remove formatação do CPF."""
+    return RE_NAO_DIGITO.sub('', cpf)
@@ -0,0 +1,138 @@
+"""
+Agregados de Vendas - Nexum Supply Chain
+Datas de venda normalizadas para o ordinal do dia (date.toordinal()) e
+agregados pré-calculados por dia e por mês (quantidade e soma de valor_venda),
+mantidos a cada criação, alteração e remoção de venda.
+
+Consultas por período (total dos últimos 90 dias, série mensal...) percorrem
+só os buckets do intervalo: os dias com venda ficam em uma lista ordenada
+(índice de datas) e o intervalo é localizado por busca binária.
+"""
+
+import bisect
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+FORMATO_DATA = "%d/%m/%Y"
+
+def data_para_ordinal(data_str: str) -> int:
+    """'DD/MM/AAAA' -> ordinal do dia (ValueError se inválida)."""
+    return datetime.strptime(data_str, FORMATO_DATA).toordinal()
+
+def ordinal_para_data(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime(FORMATO_DATA)
+
+def mes_do_ordinal(ordinal: int) -> int:
+    """Índice do mês (ano * 12 + mês - 1), contínuo entre anos."""
+    dia = date.fromordinal(ordinal)
+    return dia.year * 12 + dia.month - 1
+
+def rotulo_mes(indice_mes: int) -> str:
+    return f"{indice_mes // 12:04d}-{indice_mes % 12 + 1:02d}"
+
+class AgregadoVendas:
+    """Buckets diários e mensais (quantidade, soma) com índice ordenado de dias."""
+
+    def __init__(self):
+        self.dias: Dict[int, List] = {}    # ordinal -> [quantidade, soma]
+        self.meses: Dict[int, List] = {}   # ano * 12 + mês - 1 -> [quantidade, soma]
+        self._indice_dias: List[int] = []  # ordinais com venda, ordenados
+        self._indice_meses: List[int] = []
+
+    @classmethod
+    def de_vendas(cls, vendas: Iterable[Dict]) -> "AgregadoVendas":
+        """Reconstrói os agregados a partir dos registros (usa data_ordinal ou data_venda)."""
+        agregado = cls()
+        for venda in vendas:
+            ordinal = ordinal_da_venda(venda)
+            if ordinal is not None:
+                agregado.adicionar(ordinal, venda.get('valor_venda') or 0)
+        return agregado
+
+    @classmethod
+    def de_dias(cls, dias: Iterable) -> "AgregadoVendas":
+        """Monta os agregados a partir de (ordinal, quantidade, soma) por dia, ex.: um GROUP BY data_venda."""
+        agregado = cls()
+        for ordinal, quantidade, soma in dias:
+            agregado._somar(agregado.dias, agregado._indice_dias, ordinal, quantidade, soma)
+            agregado._somar(agregado.meses, agregado._indice_meses, mes_do_ordinal(ordinal), quantidade, soma)
+        return agregado
+
+    # --- Manutenção ---
+
+    def adicionar(self, ordinal: int, valor: float):
+        self._somar(self.dias, self._indice_dias, ordinal, 1, valor)
+        self._somar(self.meses, self._indice_meses, mes_do_ordinal(ordinal), 1, valor)
+
+    def adicionar_lote(self, ordinais, valores):
+        """Soma muitas vendas de uma vez: agrupa por dia antes de tocar nos buckets."""
+        ordinais = np.asarray(ordinais, dtype=np.int64)
+        valores = np.asarray(valores, dtype=np.float64)
+        if not len(ordinais):
+            return
+        dias, posicoes = np.unique(ordinais, return_inverse=True)
+        quantidades = np.bincount(posicoes)
+        somas = np.bincount(posicoes, weights=valores)
+        for dia, quantidade, soma in zip(dias.tolist(), quantidades.tolist(), somas.tolist()):
+            self._somar(self.dias, self._indice_dias, dia, quantidade, soma)
+            self._somar(self.meses, self._indice_meses, mes_do_ordinal(dia), quantidade, soma)
+
+    def remover(self, ordinal: int, valor: float):
+        self._somar(self.dias, self._indice_dias, ordinal, -1, -valor)
+        self._somar(self.meses, self._indice_meses, mes_do_ordinal(ordinal), -1, -valor)
+
+    @staticmethod
+    def _somar(buckets: Dict[int, List], indice: List[int], chave: int, quantidade: int, valor: float):
+        bucket = buckets.get(chave)
+        if bucket is None:
+            bucket = buckets[chave] = [0, 0.0]
+            bisect.insort(indice, chave)
+        bucket[0] += quantidade
+        bucket[1] += valor
+        if bucket[0] <= 0:
+            # Bucket vazio sai do índice (evita arrastar resíduo de ponto flutuante)
+            del buckets[chave]
+            del indice[bisect.bisect_left(indice, chave)]
+
+    # --- Consultas ---
+
+    def total(self, inicio: Optional[int] = None, fim: Optional[int] = None) -> Dict:
+        """Quantidade e soma das vendas entre os ordinais inicio e fim (inclusivos)."""
+        quantidade, soma = 0, 0.0
+        for ordinal in self._faixa(self._indice_dias, inicio, fim):
+            bucket = self.dias[ordinal]
+            quantidade += bucket[0]
+            soma += bucket[1]
+        return {'quantidade': quantidade, 'valor_total': round(soma, 2)}
+
+    def serie_diaria(self, inicio: Optional[int] = None, fim: Optional[int] = None) -> List[Dict]:
+        """Um item por dia com venda no intervalo."""
+        return [{'data': ordinal_para_data(ordinal), 'quantidade': self.dias[ordinal][0],
+                 'valor_total': round(self.dias[ordinal][1], 2)}
+                for ordinal in self._faixa(self._indice_dias, inicio, fim)]
+
+    def serie_mensal(self, inicio: Optional[int] = None, fim: Optional[int] = None) -> List[Dict]:
+        """Um item por mês com venda no intervalo (meses inteiros que contêm inicio e fim)."""
+        mes_inicio = mes_do_ordinal(inicio) if inicio is not None else None
+        mes_fim = mes_do_ordinal(fim) if fim is not None else None
+        return [{'mes': rotulo_mes(mes), 'quantidade': self.meses[mes][0],
+                 'valor_total': round(self.meses[mes][1], 2)}
+                for mes in self._faixa(self._indice_meses, mes_inicio, mes_fim)]
+
+    @staticmethod
+    def _faixa(indice: List[int], inicio: Optional[int], fim: Optional[int]) -> List[int]:
+        esquerda = 0 if inicio is None else bisect.bisect_left(indice, inicio)
+        direita = len(indice) if fim is None else bisect.bisect_right(indice, fim)
+        return indice[esquerda:direita]
+
+def ordinal_da_venda(venda: Dict) -> Optional[int]:
+    """Ordinal gravado na venda ou, em registros antigos, calculado a partir de data_venda."""
+    ordinal = venda.get('data_ordinal')
+    if ordinal is not None:
+        return ordinal
+    try:
+        return data_para_ordinal(venda.get('data_venda') or '')
+    except ValueError:
+        return None
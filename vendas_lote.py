@@ -0,0 +1,132 @@
+"""
+Ingestão de Vendas em Lote - Nexum Supply Chain
+Valida exportações de PDV (CSV ou JSON com dezenas de milhares de vendas) por
+coluna, com pandas, em vez de um strptime por venda, e devolve as linhas
+rejeitadas com o número da linha e todos os motivos.
+
+Campos: nome_venda, valor_venda, data_venda (DD/MM/AAAA) e, opcionalmente,
+codigo e quantidade do produto vendido (alimentam o cmm do motor de demanda).
+"""
+
+import io
+import json
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_VENDA = ['nome_venda', 'valor_venda', 'data_venda', 'codigo', 'quantidade']
+ORDINAL_EPOCH = date(1970, 1, 1).toordinal()
+
+def ler_vendas(conteudo, nome_arquivo: str = '') -> pd.DataFrame:
+    """
+    Carrega vendas de uma lista de dicts (JSON já decodificado) ou do conteúdo
+    de um arquivo (bytes/str) CSV (; ou ,) ou JSON. Tudo é lido como texto;
+    a coluna 'linha' guarda a posição de origem para o relatório.
+    """
+    if isinstance(conteudo, list):
+        df = pd.DataFrame.from_records(conteudo)
+        primeira_linha = 1
+    else:
+        if isinstance(conteudo, bytes):
+            conteudo = conteudo.decode('utf-8-sig')
+        if nome_arquivo.lower().endswith('.json') or conteudo.lstrip().startswith(('[', '{')):
+            dados = json.loads(conteudo)
+            registros = dados.get('sales', []) if isinstance(dados, dict) else dados
+            df = pd.DataFrame.from_records(registros)
+            primeira_linha = 1
+        else:
+            amostra = conteudo[:4096]
+            delimitador = ';' if amostra.count(';') >= amostra.count(',') else ','
+            df = pd.read_csv(io.StringIO(conteudo), sep=delimitador, dtype=str, keep_default_na=False)
+            primeira_linha = 2  # Linha 1 é o cabeçalho
+
+    for coluna in COLUNAS_VENDA:
+        if coluna not in df.columns:
+            df[coluna] = None
+    df = df[COLUNAS_VENDA].copy()
+    df['linha'] = np.arange(primeira_linha, primeira_linha + len(df))
+    return df
+
+def validar_vendas(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict]]:
+    """
+    Valida as colunas de uma vez. Retorna as vendas válidas (valor_venda float,
+    data_venda normalizada e data_ordinal) e [{'linha', 'erros'}] das rejeitadas.
+    """
+    nomes = df['nome_venda'].astype('string').str.strip()
+    textos_valor = df['valor_venda'].astype('string').str.strip()
+    # Aceita vírgula decimal das exportações em pt-BR ("1.234,56" e "1234,56")
+    com_virgula = textos_valor.str.contains(',', regex=False).fillna(False)
+    textos_valor = textos_valor.where(~com_virgula,
+                                      textos_valor.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    valores = pd.to_numeric(textos_valor, errors='coerce').astype('float64')
+    datas = pd.to_datetime(df['data_venda'].astype('string').str.strip(), format='%d/%m/%Y', errors='coerce')
+    codigos = df['codigo'].astype('string').str.strip().fillna('')
+    # Quantidade só é exigida em vendas com produto; vazia vale 1
+    textos_quantidade = df['quantidade'].astype('string').str.strip().replace('', pd.NA)
+    quantidades = pd.to_numeric(textos_quantidade, errors='coerce').astype('float64')
+    quantidade_invalida = (textos_quantidade.notna() & ~(quantidades > 0)).to_numpy(dtype=bool)
+
+    problemas = {
+        "Nome da venda ausente.": (nomes.isna() | (nomes == '')).to_numpy(dtype=bool),
+        "Valor de venda inválido.": ~np.isfinite(valores.to_numpy()),
+        "Valor de venda negativo.": (valores < 0).to_numpy(dtype=bool),
+        "Data inválida! Formato DD/MM/AAAA.": datas.isna().to_numpy(dtype=bool),
+        "Quantidade inválida.": quantidade_invalida,
+    }
+    invalidas = np.zeros(len(df), dtype=bool)
+    for mascara in problemas.values():
+        invalidas |= mascara
+
+    linhas = df['linha'].to_numpy()
+    erros = []
+    for i in np.flatnonzero(invalidas):
+        erros.append({'linha': int(linhas[i]), 'erros': [msg for msg, mascara in problemas.items() if mascara[i]]})
+
+    validas_mask = ~invalidas
+    datas_validas = datas[validas_mask]
+    validas = pd.DataFrame({
+        'nome_venda': nomes[validas_mask].to_numpy(dtype=object),
+        'valor_venda': valores[validas_mask].to_numpy(),
+        'data_venda': datas_validas.dt.strftime('%d/%m/%Y').to_numpy(dtype=object),
+        'data_ordinal': (datas_validas.to_numpy().astype('datetime64[D]').astype(np.int64) + ORDINAL_EPOCH),
+        'codigo': codigos[validas_mask].to_numpy(dtype=object),
+        'quantidade': quantidades[validas_mask].fillna(1.0).to_numpy(),
+        'linha': linhas[validas_mask],
+    })
+    return validas, erros
+
+def gravar_vendas_sql(conn, validas: pd.DataFrame, tamanho_lote: int = 10000,
+                      antes_do_commit: Optional[Callable] = None) -> int:
+    """
+    Insere as vendas válidas em supply_chain.vendas em transações de
+    `tamanho_lote` linhas (executemany por lote, um commit por lote).
+    data_venda vai como AAAA-MM-DD (coluna DATE); codigo vazio vira NULL e a
+    quantidade só é gravada nas vendas com produto. antes_do_commit(cursor)
+    roda dentro da transação de cada lote (ex.: incrementar vendas_versao).
+    """
+    cursor = conn.cursor()
+    if hasattr(cursor, 'fast_executemany'):
+        cursor.fast_executemany = True
+    datas = (validas['data_ordinal'].to_numpy(dtype=np.int64) - ORDINAL_EPOCH).astype('datetime64[D]').astype(str)
+    codigos = [codigo or None for codigo in validas['codigo'].tolist()]
+    quantidades = [quantidade if codigo else None for codigo, quantidade in zip(codigos, validas['quantidade'].tolist())]
+    linhas = list(zip(validas['nome_venda'].tolist(), validas['valor_venda'].tolist(), datas.tolist(),
+                      codigos, quantidades))
+    try:
+        for i in range(0, len(linhas), tamanho_lote):
+            cursor.executemany(
+                "INSERT INTO supply_chain.vendas (nome_venda, valor_venda, data_venda, codigo, quantidade) "
+                "VALUES (?, ?, ?, ?, ?)",
+                linhas[i:i + tamanho_lote]
+            )
+            if antes_do_commit is not None:
+                antes_do_commit(cursor)
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return len(linhas)
@@ -1,21 +1,61 @@
-from database.user_manager import GerenciadorUsuarios 
-from database import fetch_all, fetch_one, execute_query
+from user_manager import GerenciadorUsuarios, pool_usuarios
+from cache_usuarios import cache_perfis, invalidar_usuario
+from sessao import gerenciador_sessoes
 
 user_manager = GerenciadorUsuarios()
 
+# Consultas diretas em supply_chain.usuarios, sobre o mesmo pool do GerenciadorUsuarios
+def fetch_all(query, params=()):
+    with pool_usuarios().conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            colunas = [coluna[0] for coluna in cursor.description]
+            return [dict(zip(colunas, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+def fetch_one(query, params=()):
+    rows = fetch_all(query, params)
+    return rows[0] if rows else None
+
+def execute_query(query, params=()):
+    """Executa um comando e confirma. Retorna (sucesso, linhas afetadas)."""
+    with pool_usuarios().conexao() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            afetadas = cursor.rowcount
+            conn.commit()
+            return True, afetadas
+        except Exception:
+            conn.rollback()
+            return False, 0
+        finally:
+            cursor.close()
+
 def service_get_all_workers():
     # Esta função parece interagir com uma tabela 'users' que pode não existir.
     # O ideal é usar o user_manager para listar os usuários.
     query = "SELECT id, nome, email, funcao FROM supply_chain.usuarios" 
     return fetch_all(query)
 
-def service_get_worker(user_id):
+def _load_worker(user_id):
     query = "SELECT id, nome, email, funcao FROM supply_chain.usuarios WHERE id = ?"
     return fetch_one(query, (user_id,))
 
+def service_get_worker(user_id):
+    # Perfil em cache (TTL + LRU); ids inexistentes também ficam em cache por pouco tempo
+    return cache_perfis().obter(user_id, _load_worker)
+
+def service_get_worker_role(user_id):
+    """Função (nível de acesso) do usuário, a partir do perfil em cache."""
+    worker = service_get_worker(user_id)
+    return worker['funcao'] if worker else None
+
 def service_create_worker(data):
     # CORREÇÃO: Passando todos os argumentos necessários para criar_usuario
-    return user_manager.criar_usuario(
+    result = user_manager.criar_usuario(
         nome=data.get('nome'),
         sobrenome=data.get('sobrenome'),
         data_nascimento=data.get('data_nascimento'),
@@ -24,6 +64,9 @@ def service_create_worker(data):
         email=data.get('email'),
         senha=data.get('senha')
     )
+    # O id novo pode estar em cache como inexistente
+    invalidar_usuario()
+    return result
 
 def service_authenticate_user(usuario, senha):
     # CORREÇÃO: O método autenticar agora retorna uma tupla (sucesso, mensagem, nivel_acesso)
@@ -33,4 +76,17 @@ def service_authenticate_user(usuario, senha):
 def service_remove_worker(user_id):
     query = "DELETE FROM supply_chain.usuarios WHERE id = ?"
     success, deleted_count = execute_query(query, (user_id,))
-    return success and deleted_count > 0
\ No newline at end of file
+    invalidar_usuario(user_id)
+    return success and deleted_count > 0
+
+def service_deactivate_worker(user_id, admin_id):
+    query = "EXEC supply_chain.sp_inativar_usuario @usuario_id = ?, @admin_id = ?"
+    success, _ = execute_query(query, (user_id, admin_id))
+    invalidar_usuario(user_id)
+    # Tokens já emitidos deixam de valer neste processo sem esperar a lista de revogação
+    gerenciador_sessoes().revogar(user_id)
+    return success
+
+def service_get_cache_metrics():
+    """Acertos/faltas do cache de perfis (quanto tráfego deixou de ir ao banco)."""
+    return cache_perfis().metricas()
\ No newline at end of file